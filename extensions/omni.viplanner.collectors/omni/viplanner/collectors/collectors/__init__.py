@@ -4,15 +4,37 @@
 #
 # SPDX-License-Identifier: BSD-3-Clause
 
-from .carla_scene_cfg import CarlaSceneCfg
-from .exploration_cfg import ExplorationCfg
-from .matterport_scene_cfg import MatterportSceneCfg
-from .terrain_analysis import TerrainAnalysis
-from .terrain_analysis_cfg import TerrainAnalysisCfg
-from .trajectory_sampling import TrajectorySampling
-from .trajectory_sampling_cfg import TrajectorySamplingCfg
-from .viewpoint_sampling import ViewpointSampling
-from .viewpoint_sampling_cfg import ViewpointSamplingCfg
+"""Data collectors, the classes are imported from their modules on first access.
+
+Importing the package does not load the collectors (and the scene configurations with their importers and sensors),
+so scripts that only need a configuration do not pay for the others.
+"""
+
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .carla_scene_cfg import CarlaSceneCfg
+    from .exploration_cfg import ExplorationCfg
+    from .matterport_scene_cfg import MatterportSceneCfg
+    from .terrain_analysis import TerrainAnalysis
+    from .terrain_analysis_cfg import TerrainAnalysisCfg
+    from .trajectory_sampling import TrajectorySampling
+    from .trajectory_sampling_cfg import TrajectorySamplingCfg
+    from .viewpoint_sampling import ViewpointSampling
+    from .viewpoint_sampling_cfg import ViewpointSamplingCfg
+
+_LAZY_IMPORTS = {
+    "CarlaSceneCfg": ".carla_scene_cfg",
+    "ExplorationCfg": ".exploration_cfg",
+    "MatterportSceneCfg": ".matterport_scene_cfg",
+    "TerrainAnalysis": ".terrain_analysis",
+    "TerrainAnalysisCfg": ".terrain_analysis_cfg",
+    "TrajectorySampling": ".trajectory_sampling",
+    "TrajectorySamplingCfg": ".trajectory_sampling_cfg",
+    "ViewpointSampling": ".viewpoint_sampling",
+    "ViewpointSamplingCfg": ".viewpoint_sampling_cfg",
+}
 
 __all__ = [
     "TrajectorySampling",
@@ -25,3 +47,15 @@ __all__ = [
     "CarlaSceneCfg",
     "MatterportSceneCfg",
 ]
+
+
+def __getattr__(name: str):
+    if name in _LAZY_IMPORTS:
+        value = getattr(importlib.import_module(_LAZY_IMPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted(list(globals().keys()) + __all__)
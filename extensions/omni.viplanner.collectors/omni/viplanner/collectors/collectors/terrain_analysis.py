@@ -7,37 +7,43 @@
 from __future__ import annotations
 
 import builtins
+from typing import TYPE_CHECKING
 
-import carb
-import networkx as nx
 import numpy as np
-import omni.isaac.core.utils.prims as prims_utils
-import scipy.spatial.transform as tf
 import torch
-from omni.isaac.core.utils.semantics import get_semantics
-from omni.isaac.lab.scene import InteractiveScene
-from omni.isaac.lab.sensors import RayCaster, RayCasterCamera
-from omni.isaac.lab.sim import SimulationContext
 from omni.isaac.lab.utils.warp import raycast_mesh
-from omni.physx import get_physx_scene_query_interface
-from omni.viplanner.importer.sensors import (
-    MatterportRayCaster,
-    MatterportRayCasterCamera,
-)
-from omni.viplanner.importer.utils.prims import get_all_meshes
-from pxr import Gf, Usd, UsdGeom
-from scipy.spatial import KDTree
-from scipy.stats import qmc
-from skimage.draw import line
 
+from ..utils.path_sample_table import PathSampleTable, PathSampleTableWriter
+from ..utils.profiling import PROFILER
+from ..utils.task_progress import ProgressGenerator, run_to_completion
 from .terrain_analysis_cfg import TerrainAnalysisCfg
 
+if TYPE_CHECKING:
+    from omni.isaac.lab.scene import InteractiveScene
+    from omni.isaac.lab.sensors import RayCaster, RayCasterCamera
+    from omni.viplanner.importer.sensors import (
+        MatterportRayCaster,
+        MatterportRayCasterCamera,
+    )
+    from pxr import Gf, Usd, UsdGeom
+
 
 class TerrainAnalysis:
+    """Sample traversable points of a terrain and connect them to a graph of feasible paths.
+
+    The analysis ray casts either against the mesh of a ray caster sensor or against the USD stage. Isaac Sim modules
+    (USD, PhysX, debug draw) are only imported by the stage and the visualization code paths, so that the analysis can
+    run on the mesh of :class:`SyntheticScene` with only Isaac Lab installed, i.e. without launching Isaac Sim.
+    """
+
     def __init__(self, cfg: TerrainAnalysisCfg, scene: InteractiveScene):
         # save cfg and env
         self.cfg = cfg
         self.scene = scene
+        # semantic class of the collision prims hit by the USD stage raycasts
+        self._semantic_class_cache: dict[str, str] = {}
+        # shortest path samples, set by the analysis
+        self.samples: PathSampleTable
 
     @property
     def complete(self) -> bool:
@@ -48,21 +54,28 @@ class TerrainAnalysis:
     ###
 
     def analyse(self):
+        run_to_completion(self.analyse_iter())
+
+    def analyse_iter(self) -> ProgressGenerator:
+        """Terrain analysis as progress generator, yields ``(stage, done, total)`` at every batch boundary."""
         print("[INFO] Starting terrain analysis...")
-        # gte the points and sample the graph
-        self._sample_points()
-        self._construct_graph()
+        with PROFILER.run("terrain_analysis"):
+            # gte the points and sample the graph
+            with PROFILER.span("sample points"):
+                yield from self._sample_points()
+            with PROFILER.span("construct graph"):
+                yield from self._construct_graph()
 
     ###
     # Helper functions
     ###
 
-    def _sample_points(self):
+    def _sample_points(self) -> ProgressGenerator:
+        from scipy.stats import qmc
+
         # get the raycaster sensor that should be used to raycast against all the ground meshes
-        if isinstance(
-            self.scene.sensors[self.cfg.raycaster_sensor],
-            MatterportRayCaster | MatterportRayCasterCamera | RayCaster | RayCasterCamera,
-        ):
+        # NOTE: checked for the meshes instead of the type to also support the stand-in of the synthetic scenes
+        if hasattr(self.scene.sensors[self.cfg.raycaster_sensor], "meshes"):
             self._raycaster: MatterportRayCaster | MatterportRayCasterCamera | RayCaster | RayCasterCamera = (
                 self.scene.sensors[self.cfg.raycaster_sensor]
             )
@@ -92,79 +105,117 @@ class TerrainAnalysis:
             ray_origins = torch.from_numpy(np.hstack((points, heights))).type(torch.float32)
 
             # filter points that are outside the mesh or inside walls
-            ray_origins, z_depth, heights = self._point_filter_wall(ray_origins, torch.tensor(heights))
+            with PROFILER.span("point filter wall"):
+                ray_origins, z_depth, heights = self._point_filter_wall(ray_origins, torch.tensor(heights))
+                PROFILER.count("points rejected (wall)", self.cfg.sample_points - ray_origins.shape[0])
 
             # filter points that are too close to walls
-            ray_origins, heights = self._point_filter_wall_closeness(ray_origins, heights, z_depth)
+            with PROFILER.span("point filter wall closeness"):
+                nbr_points = ray_origins.shape[0]
+                ray_origins, heights = self._point_filter_wall_closeness(ray_origins, heights, z_depth)
+                PROFILER.count("points rejected (wall closeness)", nbr_points - ray_origins.shape[0])
 
             # filter points based on semantic cost
             if self.cfg.semantic_cost_mapping is not None:
-                ray_origins = self._point_filter_semantic_cost(ray_origins, heights)
+                with PROFILER.span("point filter semantic cost"):
+                    nbr_points = ray_origins.shape[0]
+                    ray_origins = self._point_filter_semantic_cost(ray_origins, heights)
+                    PROFILER.count("points rejected (semantic cost)", nbr_points - ray_origins.shape[0])
+
+            PROFILER.count("points accepted", ray_origins.shape[0])
 
             sampled_points.append(torch.clone(ray_origins))
             sampled_nb_points += ray_origins.shape[0]
+            yield "sample points", min(sampled_nb_points, self.cfg.sample_points), self.cfg.sample_points
 
         self.points = torch.vstack(sampled_points)
         self.points = self.points[: self.cfg.sample_points]
         return
 
-    def _construct_graph(self):
-        # construct kdtree to find nearest neighbors of points
-        kdtree = KDTree(self.points.cpu().numpy())
-        _, nearest_neighbors_idx = kdtree.query(self.points.cpu().numpy(), k=self.cfg.num_connections + 1, workers=-1)
+    def _construct_graph(self) -> ProgressGenerator:
+        import networkx as nx
+        from scipy.spatial import KDTree
+
+        # construct kdtree to find nearest neighbors of points, the points are queried in batches
+        points = self.points.cpu().numpy()
+        kdtree = KDTree(points)
+        nearest_neighbors_idx = np.zeros((points.shape[0], self.cfg.num_connections + 1), dtype=np.int64)
+        for start in range(0, points.shape[0], self.cfg.batch_size):
+            end = min(start + self.cfg.batch_size, points.shape[0])
+            nearest_neighbors_idx[start:end] = kdtree.query(
+                points[start:end], k=self.cfg.num_connections + 1, workers=-1
+            )[1]
+            yield "nearest neighbors", end, points.shape[0]
         # remove first neighbor as it is the point itself
-        nearest_neighbors_idx = torch.tensor(nearest_neighbors_idx[:, 1:], dtype=torch.int64)
+        nearest_neighbors_idx = torch.from_numpy(nearest_neighbors_idx[:, 1:])
 
         # filter connections that collide with the environment
-        idx_edge_start, idx_edge_end, distance = self._edge_filter_mesh_collisions(nearest_neighbors_idx)
-
-        (
-            idx_edge_start,
-            idx_edge_end,
-            distance,
-            idx_edge_start_filtered,
-            idx_edge_end_filtered,
-        ) = self._edge_filter_height_diff(idx_edge_start, idx_edge_end, distance)
+        with PROFILER.span("edge filter mesh collisions"):
+            idx_edge_start, idx_edge_end, distance = yield from self._edge_filter_mesh_collisions(nearest_neighbors_idx)
+            nbr_edges = self.cfg.sample_points * self.cfg.num_connections
+            PROFILER.count("edges rejected (mesh collision)", nbr_edges - len(idx_edge_start))
 
-        # filter edges based on semantic cost
-        if self.cfg.semantic_cost_mapping is not None:
+        with PROFILER.span("edge filter height difference"):
             (
                 idx_edge_start,
                 idx_edge_end,
                 distance,
-                idx_edge_start_filtered_sem,
-                idx_edge_end_filtered_sem,
-            ) = self._edge_filter_semantic_cost(idx_edge_start, idx_edge_end, distance)
+                idx_edge_start_filtered,
+                idx_edge_end_filtered,
+            ) = yield from self._edge_filter_height_diff(idx_edge_start, idx_edge_end, distance)
+            PROFILER.count("edges rejected (height difference)", len(idx_edge_start_filtered))
+
+        # filter edges based on semantic cost
+        if self.cfg.semantic_cost_mapping is not None:
+            with PROFILER.span("edge filter semantic cost"):
+                (
+                    idx_edge_start,
+                    idx_edge_end,
+                    distance,
+                    idx_edge_start_filtered_sem,
+                    idx_edge_end_filtered_sem,
+                ) = yield from self._edge_filter_semantic_cost(idx_edge_start, idx_edge_end, distance)
+                PROFILER.count("edges rejected (semantic cost)", len(idx_edge_start_filtered_sem))
+        PROFILER.count("edges accepted", len(idx_edge_start))
 
         # init graph
         print(f"[INFO] Constructing graph with {idx_edge_start.shape[0]} edges")
         self.graph = nx.Graph()
+        nbr_elements = points.shape[0] + idx_edge_start.shape[0]
         # add nodes with position attributes
-        self.graph.add_nodes_from(list(range(self.cfg.sample_points)))
-        pos_attr = {i: {"pos": self.points[i].cpu().numpy()} for i in range(self.cfg.sample_points)}
-        nx.set_node_attributes(self.graph, pos_attr)
+        for start in range(0, points.shape[0], self.cfg.batch_size):
+            end = min(start + self.cfg.batch_size, points.shape[0])
+            self.graph.add_nodes_from((i, {"pos": points[i]}) for i in range(start, end))
+            yield "construct graph", end, nbr_elements
         # add edges with distance attributes
         # NOTE: as the shortest path searching algorithm only stores integers
-        self.graph.add_edges_from(list(map(tuple, np.stack((idx_edge_start, idx_edge_end), axis=1))))
-        distance_attr = {
-            (i, j): {"distance": distance[idx]} for idx, (i, j) in enumerate(zip(idx_edge_start, idx_edge_end))
-        }
-        nx.set_edge_attributes(self.graph, distance_attr)
-
-        # get all shortest paths
-        odom_goal_distances = dict(
-            nx.all_pairs_dijkstra_path_length(self.graph, cutoff=self.cfg.max_path_length, weight="distance")
-        )
+        for start in range(0, idx_edge_start.shape[0], self.cfg.batch_size):
+            end = min(start + self.cfg.batch_size, idx_edge_start.shape[0])
+            self.graph.add_edges_from(
+                (i, j, {"distance": d})
+                for i, j, d in zip(
+                    idx_edge_start[start:end].tolist(), idx_edge_end[start:end].tolist(), distance[start:end].tolist()
+                )
+            )
+            yield "construct graph", points.shape[0] + end, nbr_elements
 
-        # summarize to samples
-        samples = []
-        for key, value in odom_goal_distances.items():
-            curr_samples = torch.zeros((len(value), 3))
-            curr_samples[:, 0] = key
-            curr_samples[:, 1] = torch.tensor(list(value.keys()))
-            curr_samples[:, 2] = torch.tensor(list(value.values()))
-            samples.append(curr_samples)
-        self.samples = torch.vstack(samples)
+        # get all shortest paths and summarize to samples
+        samples = PathSampleTableWriter(
+            self.cfg.sample_points, save_dir=self.cfg.sample_table_dir, length_dtype=self.cfg.sample_length_dtype
+        )
+        odom_goal_distances = nx.all_pairs_dijkstra_path_length(
+            self.graph, cutoff=self.cfg.max_path_length, weight="distance"
+        )
+        with PROFILER.span("shortest paths"):
+            for source_idx, (key, value) in enumerate(odom_goal_distances):
+                samples.append(
+                    key, np.fromiter(value.keys(), dtype=np.int32), np.fromiter(value.values(), dtype=np.float64)
+                )
+                if (source_idx + 1) % 100 == 0:
+                    yield "shortest paths", source_idx + 1, self.cfg.sample_points
+            self.samples = samples.close()
+            PROFILER.count("path samples", len(self.samples))
+        yield "shortest paths", self.cfg.sample_points, self.cfg.sample_points
 
         # debug visualization
         if self.cfg.viz_graph:
@@ -184,30 +235,21 @@ class TerrainAnalysis:
                     [(1.0, 0.5, 0, 1)] * self.cfg.sample_points,
                     [5] * self.cfg.sample_points,
                 )
-                for start_idx, goal_idx in zip(idx_edge_start, idx_edge_end):
-                    draw_interface.draw_lines(
-                        [self.points[start_idx].tolist()],
-                        [self.points[goal_idx].tolist()],
-                        [(0, 1, 0, 1)],
-                        [1],
-                    )
-                for start_idx, goal_idx in zip(idx_edge_start_filtered, idx_edge_end_filtered):
-                    draw_interface.draw_lines(
-                        [self.points[start_idx].tolist()],
-                        [self.points[goal_idx].tolist()],
-                        [(1, 0, 0, 1)],
-                        [1],
-                    )
+                # draw each edge type in a single bulk call
+                filtered_edges = [(idx_edge_start_filtered, idx_edge_end_filtered)]
                 if self.cfg.semantic_cost_mapping is not None:
-                    for start_idx, goal_idx in zip(idx_edge_start_filtered_sem, idx_edge_end_filtered_sem):
-                        draw_interface.draw_lines(
-                            [self.points[start_idx].tolist()],
-                            [self.points[goal_idx].tolist()],
-                            [(1, 0, 0, 1)],
-                            [1],
-                        )
+                    filtered_edges.append((idx_edge_start_filtered_sem, idx_edge_end_filtered_sem))
+                self._draw_edges(draw_interface, idx_edge_start, idx_edge_end, (0, 1, 0, 1))
+                self._draw_edges(
+                    draw_interface,
+                    np.concatenate([np.asarray(start) for start, _ in filtered_edges]),
+                    np.concatenate([np.asarray(end) for _, end in filtered_edges]),
+                    (1, 0, 0, 1),
+                )
 
                 if builtins.ISAAC_LAUNCHED_FROM_TERMINAL is False:
+                    from omni.isaac.lab.sim import SimulationContext
+
                     sim = SimulationContext.instance()
                     for _ in range(env_render_steps):
                         sim.render()
@@ -221,6 +263,25 @@ class TerrainAnalysis:
             except ImportError:
                 print("[WARNING] Graph Visualization is not available in headless mode.")
 
+    def _draw_edges(self, draw_interface, idx_edge_start: np.ndarray, idx_edge_end: np.ndarray, color: tuple):
+        """Draw the edges with a single call, decimated to at most :attr:`TerrainAnalysisCfg.viz_graph_max_edges`."""
+        idx_edge_start = np.asarray(idx_edge_start, dtype=np.int64)
+        idx_edge_end = np.asarray(idx_edge_end, dtype=np.int64)
+        if idx_edge_start.shape[0] == 0:
+            return
+        if self.cfg.viz_graph_max_edges is not None and idx_edge_start.shape[0] > self.cfg.viz_graph_max_edges:
+            print(f"[INFO] Drawing {self.cfg.viz_graph_max_edges} of {idx_edge_start.shape[0]} edges.")
+            keep = np.linspace(0, idx_edge_start.shape[0] - 1, self.cfg.viz_graph_max_edges).astype(np.int64)
+            idx_edge_start, idx_edge_end = idx_edge_start[keep], idx_edge_end[keep]
+
+        points = self.points.cpu().numpy()
+        draw_interface.draw_lines(
+            points[idx_edge_start].tolist(),
+            points[idx_edge_end].tolist(),
+            [color] * idx_edge_start.shape[0],
+            [1] * idx_edge_start.shape[0],
+        )
+
     ###
     # Mesh dimensions
     ###
@@ -240,6 +301,9 @@ class TerrainAnalysis:
         return x_max, y_max, x_min, y_min
 
     def _get_usd_stage_dimensions(self) -> tuple[float, float, float, float]:
+        from omni.viplanner.importer.utils.prims import get_all_meshes
+        from pxr import Usd, UsdGeom
+
         # get all mesh prims
         mesh_prims, mesh_prims_name = get_all_meshes(self.scene.terrain.cfg.prim_path)
 
@@ -293,6 +357,7 @@ class TerrainAnalysis:
         ray_directions = torch.zeros((self.cfg.sample_points, 3), dtype=torch.float32)
         ray_directions[:, 2] = -1.0
 
+        PROFILER.count("rays cast", ray_origins.shape[0])
         if self._raycaster is not None:
             z_depth = raycast_mesh(
                 ray_starts=ray_origins.unsqueeze(0),
@@ -322,6 +387,8 @@ class TerrainAnalysis:
     def _point_filter_wall_closeness(
         self, ray_origins: torch.Tensor, heights: torch.Tensor, z_depth: torch.Tensor
     ) -> tuple[torch.Tensor, torch.Tensor]:
+        import scipy.spatial.transform as tf
+
         # reduce ground height to check for closeness to walls and other objects
         ray_origins[:, 2] = heights[:, 0] - z_depth + self.cfg.robot_height
         # enforce a minimum distance to the walls
@@ -331,6 +398,7 @@ class TerrainAnalysis:
 
         for ray_direction in ray_directions:
             ray_direction_torch = torch.from_numpy(ray_direction).repeat(ray_origins.shape[0], 1).type(torch.float32)
+            PROFILER.count("rays cast", ray_origins.shape[0])
             if self._raycaster is not None:
                 distance = raycast_mesh(
                     ray_starts=ray_origins.unsqueeze(0),
@@ -360,8 +428,9 @@ class TerrainAnalysis:
         # raycast vertically down and get the corresponding face id
         ray_directions = torch.zeros((ray_origins.shape[0], 3), dtype=torch.float32)
         ray_directions[:, 2] = -1.0
+        PROFILER.count("rays cast", ray_origins.shape[0])
 
-        if isinstance(self._raycaster, MatterportRayCaster | MatterportRayCasterCamera):
+        if hasattr(self._raycaster, "face_id_category_mapping"):
             ray_face_ids = raycast_mesh(
                 ray_starts=ray_origins.unsqueeze(0),
                 ray_directions=ray_directions.unsqueeze(0),
@@ -414,8 +483,13 @@ class TerrainAnalysis:
 
     def _edge_filter_height_diff(
         self, idx_edge_start: np.ndarray, idx_edge_end: np.ndarray, distance: np.ndarray
-    ) -> tuple[np.ndarrayComputeWorldBound, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
-        """Filter edges based on height difference between points."""
+    ) -> ProgressGenerator:
+        """Filter edges based on height difference between points.
+
+        Returns:
+            The start, end and distance of the remaining edges and the start and end of the filtered edges."""
+        from skimage.draw import line
+
         # get dimensions and construct height grid with raycasting
         if self._raycaster is not None:
             x_max, y_max, x_min, y_min = self._get_mesh_dimensions()
@@ -429,21 +503,10 @@ class TerrainAnalysis:
         grid_points = torch.vstack((grid_x.flatten(), grid_y.flatten(), grid_z.flatten())).T
         direction = torch.zeros_like(grid_points)
         direction[:, 2] = -1.0
+        PROFILER.count("rays cast", grid_points.shape[0])
 
         # check for collision with raycasting
-        if self._raycaster is not None:
-            hit_point = raycast_mesh(
-                ray_starts=grid_points.unsqueeze(0),
-                ray_directions=direction.unsqueeze(0),
-                mesh=self._raycaster.meshes[self._raycaster.cfg.mesh_prim_paths[0]],
-                max_dist=15,
-            )[0].squeeze(0)
-        else:
-            hit_point = self._raycast_usd_stage(
-                ray_starts=grid_points,
-                ray_directions=direction,
-                max_dist=15,
-            )[0]
+        hit_point = (yield from self._raycast_iter("height grid", grid_points, direction, max_dist=15))[0]
 
         height_grid = hit_point[:, 2].reshape(
             int(np.ceil((x_max - x_min) / self.cfg.grid_resolution)),
@@ -482,6 +545,9 @@ class TerrainAnalysis:
             grid_idx_x, grid_idx_y = line(edge_start_idx[0], edge_start_idx[1], edge_end_idx[0], edge_end_idx[1])
 
             filter_idx[idx] = np.any(height_diff[grid_idx_x, grid_idx_y])
+            if (idx + 1) % self.cfg.batch_size == 0:
+                yield "filter edges (height difference)", idx + 1, filter_idx.shape[0]
+        yield "filter edges (height difference)", filter_idx.shape[0], filter_idx.shape[0]
 
         # set the indexes that should be removed in edge_idx to true
         edge_idx[edge_idx.clone()] = torch.tensor(filter_idx)
@@ -496,31 +562,27 @@ class TerrainAnalysis:
 
         return idx_edge_start, idx_edge_end, distance, idx_edge_start_filtered, idx_edge_end_filtered
 
-    def _edge_filter_mesh_collisions(
-        self, nearest_neighbors_idx: torch.Tensor
-    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
-        """Filter connections that collide with the environment."""
+    def _edge_filter_mesh_collisions(self, nearest_neighbors_idx: torch.Tensor) -> ProgressGenerator:
+        """Filter connections that collide with the environment.
+
+        Returns:
+            The start, end and distance of the remaining edges."""
         # define origin and neighbor points
         origin_point = torch.repeat_interleave(self.points, repeats=self.cfg.num_connections, axis=0)
         neighbor_points = self.points[nearest_neighbors_idx, :].reshape(-1, 3)
         min_distance = torch.norm(origin_point - neighbor_points, dim=1)
+        PROFILER.count("rays cast", origin_point.shape[0])
 
         # check for collision with raycasting
-        if self._raycaster is not None:
-            distance = raycast_mesh(
-                ray_starts=origin_point.unsqueeze(0),
-                ray_directions=(origin_point - neighbor_points).unsqueeze(0),
-                mesh=self._raycaster.meshes[self._raycaster.cfg.mesh_prim_paths[0]],
+        distance = (
+            yield from self._raycast_iter(
+                "filter edges (mesh collisions)",
+                origin_point,
+                origin_point - neighbor_points,
                 max_dist=self.cfg.max_path_length,
                 return_distance=True,
-            )[1]
-        else:
-            distance = self._raycast_usd_stage(
-                ray_starts=origin_point,
-                ray_directions=(origin_point - neighbor_points),
-                max_dist=self.cfg.max_path_length,
-                return_distance=True,
-            )[1]
+            )
+        )[1]
 
         distance[torch.isinf(distance)] = self.cfg.max_path_length
         # filter connections that collide with the environment
@@ -539,8 +601,13 @@ class TerrainAnalysis:
 
     def _edge_filter_semantic_cost(
         self, idx_edge_start: np.ndarray, idx_edge_end: np.ndarray, distance: np.ndarray
-    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
-        """Filter edges based on height difference between points."""
+    ) -> ProgressGenerator:
+        """Filter edges based on height difference between points.
+
+        Returns:
+            The start, end and distance of the remaining edges and the start and end of the filtered edges."""
+        from skimage.draw import line
+
         # get dimensions and construct height grid with raycasting
         if self._raycaster is not None:
             x_max, y_max, x_min, y_min = self._get_mesh_dimensions()
@@ -554,16 +621,15 @@ class TerrainAnalysis:
         grid_points = torch.vstack((grid_x.flatten(), grid_y.flatten(), grid_z.flatten())).T
         direction = torch.zeros_like(grid_points)
         direction[:, 2] = -1.0
+        PROFILER.count("rays cast", grid_points.shape[0])
 
-        if isinstance(self._raycaster, MatterportRayCaster | MatterportRayCasterCamera):
+        if hasattr(self._raycaster, "face_id_category_mapping"):
             # check for collision with raycasting
-            ray_face_ids = raycast_mesh(
-                ray_starts=grid_points.unsqueeze(0),
-                ray_directions=direction.unsqueeze(0),
-                mesh=self._raycaster.meshes[self._raycaster.cfg.mesh_prim_paths[0]],
-                max_dist=self.cfg.wall_height * 2,
-                return_face_id=True,
-            )[3].squeeze(0)
+            ray_face_ids = (
+                yield from self._raycast_iter(
+                    "semantic grid", grid_points, direction, max_dist=self.cfg.wall_height * 2, return_face_id=True
+                )
+            )[3]
 
             # assign each hit the semantic class
             class_id = self._raycaster.face_id_category_mapping[self._raycaster.cfg.mesh_prim_paths[0]][
@@ -582,11 +648,10 @@ class TerrainAnalysis:
 
             cost = class_id_to_cost[class_id.cpu()]
         else:
-            ray_classes = self._raycast_usd_stage(
-                ray_starts=grid_points,
-                ray_directions=direction,
-                max_dist=self.cfg.wall_height * 2,
-                return_class=True,
+            ray_classes = (
+                yield from self._raycast_iter(
+                    "semantic grid", grid_points, direction, max_dist=self.cfg.wall_height * 2, return_class=True
+                )
             )[3]
 
             # get class to cost mapping
@@ -627,6 +692,9 @@ class TerrainAnalysis:
             grid_idx_x, grid_idx_y = line(edge_start_idx[0], edge_start_idx[1], edge_end_idx[0], edge_end_idx[1])
 
             filter_idx[idx] = np.any(cost_grid[grid_idx_x, grid_idx_y] > self.cfg.semantic_cost_threshold)
+            if (idx + 1) % self.cfg.batch_size == 0:
+                yield "filter edges (semantic cost)", idx + 1, filter_idx.shape[0]
+        yield "filter edges (semantic cost)", filter_idx.shape[0], filter_idx.shape[0]
 
         # filter edges
         idx_edge_start_filtered = idx_edge_start[filter_idx]
@@ -638,6 +706,66 @@ class TerrainAnalysis:
 
         return idx_edge_start, idx_edge_end, distance, idx_edge_start_filtered, idx_edge_end_filtered
 
+    ###
+    # Raycasting
+    ###
+
+    def _raycast_iter(
+        self,
+        stage: str,
+        ray_starts: torch.Tensor,
+        ray_directions: torch.Tensor,
+        max_dist: float = 1e6,
+        return_distance: bool = False,
+        return_face_id: bool = False,
+        return_class: bool = False,
+    ) -> ProgressGenerator:
+        """Raycast in batches of :attr:`TerrainAnalysisCfg.batch_size` rays and yield the progress after every batch.
+
+        The rays are cast against the mesh of the raycaster or, if it is not available or classes are requested,
+        against the USD stage.
+
+        Returns:
+            The hit positions, distances, normals and face ids (mesh) or classes (USD stage) of all rays, entries
+            that are not requested are None.
+        """
+        use_mesh = self._raycaster is not None and not return_class
+        results = []
+        # cast at least one batch such that empty inputs return empty results
+        for start in range(0, max(ray_starts.shape[0], 1), self.cfg.batch_size):
+            end = min(start + self.cfg.batch_size, ray_starts.shape[0])
+            if use_mesh:
+                result = raycast_mesh(
+                    ray_starts=ray_starts[start:end].unsqueeze(0),
+                    ray_directions=ray_directions[start:end].unsqueeze(0),
+                    mesh=self._raycaster.meshes[self._raycaster.cfg.mesh_prim_paths[0]],
+                    max_dist=max_dist,
+                    return_distance=return_distance,
+                    return_face_id=return_face_id,
+                )
+                result = [value.squeeze(0) if value is not None else None for value in result]
+            else:
+                result = self._raycast_usd_stage(
+                    ray_starts=ray_starts[start:end],
+                    ray_directions=ray_directions[start:end],
+                    max_dist=max_dist,
+                    return_distance=return_distance,
+                    return_class=return_class,
+                )
+            results.append(result)
+            yield stage, end, ray_starts.shape[0]
+
+        # concatenate the batches
+        concatenated = []
+        for values in zip(*results):
+            if values[0] is None:
+                concatenated.append(None)
+            elif isinstance(values[0], list):
+                concatenated.append([value for batch in values for value in batch])
+            else:
+                concatenated.append(torch.cat(values))
+        return tuple(concatenated)
+
     ###
     # Helper function when orbit raycaster is not available
     ###
@@ -656,6 +784,8 @@ class TerrainAnalysis:
 
         Interface is the same as the normal raycast_mesh function without the option to provide specific meshes.
         """
+        import carb
+        from omni.physx import get_physx_scene_query_interface
 
         hits = [
             get_physx_scene_query_interface().raycast_closest(carb.Float3(ray_single), carb.Float3(ray_dir), max_dist)
@@ -686,14 +816,26 @@ class TerrainAnalysis:
         # get class
         if return_class:
             ray_class = [
-                (
-                    get_semantics(prims_utils.get_prim_at_path(single_hit["collision"]))["Semantics"][1]
-                    if single_hit["hit"]
-                    else None
-                )
-                for single_hit in hits
+                self._get_semantic_class(single_hit["collision"]) if single_hit["hit"] else None for single_hit in hits
             ]
         else:
             ray_class = None
 
         return hit_positions, ray_distance, ray_normal, ray_class
+
+    def _get_semantic_class(self, prim_path: str) -> str | None:
+        """Semantic class of a collision prim, cached per prim path.
+
+        Collisions of instanced duplicates are reported on the instance proxies, which do not carry the labels of
+        their instance. The class is therefore taken from the closest labelled ancestor. Returns None if no ancestor
+        up to the pseudo-root is labelled."""
+        if prim_path not in self._semantic_class_cache:
+            import omni.isaac.core.utils.prims as prims_utils
+            from omni.isaac.core.utils.semantics import get_semantics
+
+            prim = prims_utils.get_prim_at_path(prim_path)
+            while "Semantics" not in get_semantics(prim) and not prim.GetParent().IsPseudoRoot():
+                prim = prim.GetParent()
+            semantics = get_semantics(prim).get("Semantics")
+            self._semantic_class_cache[prim_path] = semantics[1] if semantics is not None else None
+        return self._semantic_class_cache[prim_path]
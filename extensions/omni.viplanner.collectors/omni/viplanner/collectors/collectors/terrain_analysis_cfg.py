@@ -32,12 +32,28 @@ class TerrainAnalysisCfg:
     the Orbit raycaster sensor can be used as the ply mesh is a single mesh. On the contrary,
     for unreal engine meshes (as they consists out of multiple meshes), raycasting should be
     performed over the USD stage. Default is None."""
+    sample_table_dir: str | None = None
+    """Directory to save the path samples (start, goal and path length) as memory-mapped column files.
+
+    For dense graphs, the samples can exceed the host memory. If None, the samples are kept in memory.
+    Default is None."""
+    sample_length_dtype: str = "float32"
+    """Data type of the stored path lengths, either "float32" or "float16". Default is "float32"."""
+    batch_size: int = 100000
+    """Number of rays, edges or nodes processed at once during the graph construction.
+
+    The analysis reports its progress after every batch, i.e. the UI stays responsive when it runs in the background.
+    Default is 100000."""
     grid_resolution: float = 0.1
     """Resolution of the grid to check for not traversable edges"""
     height_diff_threshold: float = 0.3
     """Threshold for height difference between two points"""
     viz_graph: bool = True
     """Visualize the graph after the construction for a short amount of time."""
+    viz_graph_max_edges: int | None = 50000
+    """Maximum number of edges drawn per edge type (traversable and filtered) when visualizing the graph.
+
+    Larger edge sets are evenly decimated. If None, all edges are drawn. Default is 50000."""
 
     semantic_cost_mapping: object | None = None
     """Mapping of semantic categories to costs for filtering edges and nodes"""
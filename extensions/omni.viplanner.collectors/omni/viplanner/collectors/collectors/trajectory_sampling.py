@@ -8,12 +8,13 @@ from __future__ import annotations
 
 import os
 import pickle
-import random
 
 import torch
 from omni.isaac.lab.scene import InteractiveScene
 from omni.isaac.lab.sim import SimulationContext
 
+from ..utils.profiling import PROFILER
+from ..utils.task_progress import ProgressGenerator, run_to_completion
 from .terrain_analysis import TerrainAnalysis
 from .trajectory_sampling_cfg import TrajectorySamplingCfg
 
@@ -36,6 +37,10 @@ class TrajectorySampling:
         self.terrain_analyser = TerrainAnalysis(self.cfg.terrain_analysis, scene=self.scene)
 
     def sample_paths(self, num_paths, min_path_length, max_path_length, seed: int = 1) -> torch.Tensor:
+        return run_to_completion(self.sample_paths_iter(num_paths, min_path_length, max_path_length, seed))
+
+    def sample_paths_iter(self, num_paths, min_path_length, max_path_length, seed: int = 1) -> ProgressGenerator:
+        """Path sampling as progress generator, yields ``(stage, done, total)`` and returns the sampled paths."""
         # check dimensions
         assert (
             len(num_paths) == len(min_path_length) == len(max_path_length)
@@ -65,60 +70,90 @@ class TrajectorySampling:
         if len(num_paths_to_explore) == 0:
             return data
 
-        # analyse terrain if not done yet
-        if not self.terrain_analyser.complete:
-            self.terrain_analyser.analyse()
-
-        # map distance to idx pairs
-        random.seed(seed)
-
-        for num_path, min_len, max_len in zip(
-            num_paths_to_explore, min_path_length_to_explore, max_path_length_to_explore
-        ):
-            # get index of samples within length
-            within_length = (self.terrain_analyser.samples[:, 2] > min_len) & (
-                self.terrain_analyser.samples[:, 2] <= max_len
-            )
-
-            # randomly select certain pairs
-            rand_idx = torch.randperm(self.terrain_analyser.samples.shape[0])
-
-            # select the samples
-            selected_samples = self.terrain_analyser.samples[rand_idx[within_length]][:num_path]
-
-            # filter edge cases
-            if selected_samples.shape[0] == 0:
-                print(f"[WARNING] No paths found with length [{min_len},{max_len}]")
-                continue
-            if selected_samples.shape[0] < num_path:
-                print(
-                    f"[WARNING] Only {selected_samples.shape[0]} paths found with length [{min_len},{max_len}] instead"
-                    f" of {num_path}"
-                )
-
-            # get start, goal and path length
-            curr_data = torch.zeros((selected_samples.shape[0], 7))
-            curr_data[:, :3] = self.terrain_analyser.points[selected_samples[:, 0].type(torch.int64)]
-            curr_data[:, 3:6] = self.terrain_analyser.points[selected_samples[:, 1].type(torch.int64)]
-            curr_data[:, 6] = selected_samples[:, 2]
-
-            # save curr_data as pickle
-            filename = self._get_save_path_trajectories(seed, num_path, min_len, max_len)
-            with open(filename, "wb") as f:
-                pickle.dump(curr_data, f)
-
-            # update data buffer
-            data = torch.concatenate((data, curr_data), dim=0)
+        with PROFILER.run("trajectory_sampling", self._get_save_filedir()):
+            # analyse terrain if not done yet
+            if not self.terrain_analyser.complete:
+                yield from self.terrain_analyser.analyse_iter()
+
+            # sort the samples by path length once, the samples of a length range are then a contiguous slice
+            generator = torch.Generator().manual_seed(seed)
+            samples = self.terrain_analyser.samples
+            lengths = samples.length.float()
+            sorted_idx = torch.argsort(lengths, stable=True)
+            sorted_lengths = lengths[sorted_idx]
+
+            for length_idx, (num_path, min_len, max_len) in enumerate(
+                zip(num_paths_to_explore, min_path_length_to_explore, max_path_length_to_explore)
+            ):
+                # get range of samples within length (min_len, max_len]
+                range_start, range_end = torch.searchsorted(
+                    sorted_lengths, torch.tensor([min_len, max_len], dtype=sorted_lengths.dtype), right=True
+                ).tolist()
+
+                # randomly select certain pairs
+                rand_idx = self._draw_without_replacement(max(range_end - range_start, 0), num_path, generator)
+
+                # select the samples
+                selected_samples = sorted_idx[range_start + rand_idx]
+
+                # filter edge cases
+                if selected_samples.shape[0] == 0:
+                    print(f"[WARNING] No paths found with length [{min_len},{max_len}]")
+                    continue
+                if selected_samples.shape[0] < num_path:
+                    print(
+                        f"[WARNING] Only {selected_samples.shape[0]} paths found with length [{min_len},{max_len}]"
+                        f" instead of {num_path}"
+                    )
+
+                # get start, goal and path length
+                curr_data = torch.zeros((selected_samples.shape[0], 7))
+                curr_data[:, :3] = self.terrain_analyser.points[samples.start[selected_samples].type(torch.int64)]
+                curr_data[:, 3:6] = self.terrain_analyser.points[samples.goal[selected_samples].type(torch.int64)]
+                curr_data[:, 6] = lengths[selected_samples]
+
+                # save curr_data as pickle
+                filename = self._get_save_path_trajectories(seed, num_path, min_len, max_len)
+                with open(filename, "wb") as f:
+                    pickle.dump(curr_data, f)
+
+                # update data buffer
+                data = torch.concatenate((data, curr_data), dim=0)
+                yield "sample paths", length_idx + 1, len(num_paths_to_explore)
 
         # define start points
         return data
 
+    ###
+    # Helper functions
+    ###
+
+    @staticmethod
+    def _draw_without_replacement(population: int, num: int, generator: torch.Generator) -> torch.Tensor:
+        """Draw ``min(num, population)`` distinct indices of ``range(population)`` in random order.
+
+        Small draws from a large population are made by rejection of duplicates, i.e. proportional to ``num`` instead
+        of the population size.
+        """
+        if num * 4 >= population:
+            return torch.randperm(population, generator=generator)[:num]
+
+        drawn = torch.empty(0, dtype=torch.int64)
+        while drawn.shape[0] < num:
+            new_idx = torch.randint(population, (num - drawn.shape[0],), generator=generator)
+            drawn = torch.unique(torch.cat((drawn, new_idx)))
+        # unique sorts the indices, restore a random order
+        return drawn[torch.randperm(num, generator=generator)]
+
     ###
     # Safe paths
     ###
 
     def _get_save_path_trajectories(self, seed, num_path: int, min_len: float, max_len: float) -> str:
         filename = f"paths_seed{seed}_paths{num_path}_min{min_len}_max{max_len}.pkl"
+        return os.path.join(self._get_save_filedir(), filename)
+
+    def _get_save_filedir(self) -> str:
         # get env name
         if hasattr(self.scene.terrain.cfg, "obj_filepath"):
             terrain_file_path = self.scene.terrain.cfg.obj_filepath
@@ -130,4 +165,4 @@ class TrajectorySampling:
         # create directory if necessary
         filedir = os.path.join(terrain_file_path, env_name)
         os.makedirs(filedir, exist_ok=True)
-        return os.path.join(filedir, filename)
+        return filedir
@@ -9,10 +9,9 @@ from __future__ import annotations
 import builtins
 import os
 import pickle
-import random
 import time
+from typing import TYPE_CHECKING
 
-import cv2
 import numpy as np
 import omni.isaac.lab.utils.math as math_utils
 import torch
@@ -22,9 +21,14 @@ from omni.isaac.lab.scene import InteractiveScene
 from omni.isaac.lab.sensors import Camera
 from omni.isaac.lab.sim import SimulationContext
 
+from ..utils.profiling import PROFILER
+from ..utils.task_progress import ProgressGenerator, run_to_completion
 from .terrain_analysis import TerrainAnalysis
 from .viewpoint_sampling_cfg import ViewpointSamplingCfg
 
+if TYPE_CHECKING:
+    from ..utils.environment3d_reconstruction import EnvironmentReconstruction
+
 
 class ViewpointSampling:
     def __init__(self, cfg: ViewpointSamplingCfg, scene: InteractiveScene | None = None):
@@ -45,6 +49,10 @@ class ViewpointSampling:
 
     def sample_viewpoints(self, nbr_viewpoints: int, seed: int = 1) -> torch.Tensor:
         """Sample viewpoints for the given number of viewpoints and seed."""
+        return run_to_completion(self.sample_viewpoints_iter(nbr_viewpoints, seed))
+
+    def sample_viewpoints_iter(self, nbr_viewpoints: int, seed: int = 1) -> ProgressGenerator:
+        """Viewpoint sampling as progress generator, yields ``(stage, done, total)`` and returns the viewpoints."""
         # the samples are stored in a torch tensor with the structure
         # [x, y, z, qx, qv, qz, qw]
 
@@ -61,60 +69,49 @@ class ViewpointSampling:
         else:
             print(f"[INFO] No viewpoint samples found for seed {seed} and {nbr_viewpoints} samples.")
 
-        # analyse terrain if not done yet
-        if not self.terrain_analyser.complete:
-            self.terrain_analyser.analyse()
-
-        # set seed
-        random.seed(seed)
-        print(f"[INFO] Start sampling {nbr_viewpoints} viewpoints.")
-
-        # samples are organized in [point_idx, neighbor_idx, distance]
-        # sample from each point the neighbor with the largest distance
-        nbr_samples_per_point = int(np.ceil(nbr_viewpoints / self.terrain_analyser.points.shape[0]).item())
-        sample_locations = torch.zeros((nbr_samples_per_point * self.terrain_analyser.points.shape[0], 2))
-        sample_locations_count = 0
-        curr_env_idx = 0
-        while sample_locations_count < nbr_viewpoints:
-            # get samples
-            sample_idx = self.terrain_analyser.samples[:, 0] == curr_env_idx
-            sample_idx_select = torch.randperm(sample_idx.sum())[:nbr_samples_per_point]
-            sample_locations[sample_locations_count : sample_locations_count + sample_idx_select.shape[0]] = (
-                self.terrain_analyser.samples[sample_idx][sample_idx_select, :2]
+        with PROFILER.run("viewpoint_sampling", filedir):
+            # analyse terrain if not done yet
+            if not self.terrain_analyser.complete:
+                yield from self.terrain_analyser.analyse_iter()
+
+            # set seed
+            generator = torch.Generator().manual_seed(seed)
+            print(f"[INFO] Start sampling {nbr_viewpoints} viewpoints.")
+
+            # samples are organized in [point_idx, neighbor_idx, distance]
+            # sample from each point random neighbors, the points are taken in order until enough viewpoints are sampled
+            nbr_samples_per_point = int(np.ceil(nbr_viewpoints / self.terrain_analyser.points.shape[0]).item())
+            sample_locations = self._select_samples_per_point(nbr_samples_per_point, nbr_viewpoints, generator)
+            sample_locations_count = sample_locations.shape[0]
+
+            # get the z angle of the neighbor that is closest to the origin point
+            neighbor_direction = (
+                self.terrain_analyser.points[sample_locations[:, 0]]
+                - self.terrain_analyser.points[sample_locations[:, 1]]
             )
-            sample_locations_count += sample_idx_select.shape[0]
-            curr_env_idx += 1
-
-        sample_locations = sample_locations[:sample_locations_count].type(torch.int64)
-
-        # get the z angle of the neighbor that is closest to the origin point
-        neighbor_direction = (
-            self.terrain_analyser.points[sample_locations[:, 0]] - self.terrain_analyser.points[sample_locations[:, 1]]
-        )
-        z_angles = torch.atan2(neighbor_direction[:, 1], neighbor_direction[:, 0])
-
-        # vary the rotation of the forward and horizontal axis (in camera frame) as a uniform distribution within the limits
-        x_angles = math_utils.sample_uniform(
-            self.cfg.x_angle_range[0], self.cfg.x_angle_range[1], sample_locations_count, device="cpu"
-        )
-        y_angles = math_utils.sample_uniform(
-            self.cfg.y_angle_range[0], self.cfg.y_angle_range[1], sample_locations_count, device="cpu"
-        )
-        x_angles = torch.deg2rad(x_angles)
-        y_angles = torch.deg2rad(y_angles)
-
-        samples = torch.zeros((sample_locations_count, 7))
-        samples[:, :3] = self.terrain_analyser.points[sample_locations[:, 0]]
-        samples[:, 3:] = math_utils.quat_from_euler_xyz(x_angles, y_angles, z_angles)
-
-        print(f"[INFO] Sampled {sample_locations_count} viewpoints.")
-
-        # save samples
-        os.makedirs(filedir, exist_ok=True)
-        with open(filename, "wb") as f:
-            pickle.dump(samples, f)
+            z_angles = torch.atan2(neighbor_direction[:, 1], neighbor_direction[:, 0])
+
+            # vary the rotation of the forward and horizontal axis (in camera frame) as a uniform distribution within
+            # the limits
+            x_angles = torch.rand(sample_locations_count, generator=generator)
+            x_angles = x_angles * (self.cfg.x_angle_range[1] - self.cfg.x_angle_range[0]) + self.cfg.x_angle_range[0]
+            y_angles = torch.rand(sample_locations_count, generator=generator)
+            y_angles = y_angles * (self.cfg.y_angle_range[1] - self.cfg.y_angle_range[0]) + self.cfg.y_angle_range[0]
+            x_angles = torch.deg2rad(x_angles)
+            y_angles = torch.deg2rad(y_angles)
+
+            samples = torch.zeros((sample_locations_count, 7))
+            samples[:, :3] = self.terrain_analyser.points[sample_locations[:, 0]]
+            samples[:, 3:] = math_utils.quat_from_euler_xyz(x_angles, y_angles, z_angles)
 
-        print(f"[INFO] Saved {sample_locations_count} viewpoints with seed {seed} to {filename}.")
+            print(f"[INFO] Sampled {sample_locations_count} viewpoints.")
+
+            # save samples
+            os.makedirs(filedir, exist_ok=True)
+            with open(filename, "wb") as f:
+                pickle.dump(samples, f)
+
+            print(f"[INFO] Saved {sample_locations_count} viewpoints with seed {seed} to {filename}.")
 
         # debug points and orientation
         if self.cfg.debug_viz:
@@ -136,10 +133,43 @@ class ViewpointSampling:
 
         return samples
 
-    def render_viewpoints(self, samples: torch.Tensor):
-        """Render the images at the given viewpoints and save them to the drive."""
+    def render_viewpoints(self, samples: torch.Tensor, reconstruction: EnvironmentReconstruction | None = None):
+        """Render the images at the given viewpoints and save them to the drive.
+
+        Args:
+            samples: Viewpoints with the structure [x, y, z, qw, qx, qy, qz].
+            reconstruction: Reconstruction in online mode that is directly fed with the rendered images of every
+                round. The point cloud is completed when the rendering ends. Defaults to None.
+        """
+        run_to_completion(self.render_viewpoints_iter(samples, reconstruction))
+
+    def render_viewpoints_iter(
+        self, samples: torch.Tensor, reconstruction: EnvironmentReconstruction | None = None
+    ) -> ProgressGenerator:
+        """Rendering as progress generator, yields ``(stage, done, total)`` after every round of rendered images.
+
+        For the arguments, see :meth:`render_viewpoints`."""
+        import cv2
+
+        from ..utils.semantic_recoloring import build_lut
+
         print(f"[INFO] Start rendering {samples.shape[0]} images.")
 
+        if reconstruction is not None:
+            assert reconstruction.cfg.online, "Reconstruction has to be in online mode to be fed while rendering."
+            for cam in [reconstruction.cfg.depth_cam_name] + (
+                [reconstruction.cfg.semantic_cam_name] if reconstruction.cfg.semantics else []
+            ):
+                assert cam in self.cfg.cameras, f"Camera '{cam}' of the reconstruction is not rendered."
+
+        # the reconstruction expects colors, class ids are mapped with the palette of the camera
+        # (unknown ids are mapped to black)
+        sem_lut = None
+        if reconstruction is not None and reconstruction.cfg.semantics:
+            sem_sensor = self.scene.sensors[reconstruction.cfg.semantic_cam_name]
+            if getattr(sem_sensor.cfg, "semantic_class_ids", False):
+                sem_lut = build_lut(palette=sem_sensor.palette.cpu().numpy())
+
         # get number of environments (are the number of cameras)
         num_envs = self.scene.num_envs
         # define how many rounds are necessary to render all viewpoints
@@ -161,6 +191,14 @@ class ViewpointSampling:
                 self.scene.sensors[cam].data.intrinsic_matrices[0].cpu().numpy(),
                 delimiter=",",
             )
+            # save the palette of semantic class ids, used to recolor the images
+            if getattr(self.scene.sensors[cam].cfg, "semantic_class_ids", False):
+                np.savetxt(
+                    os.path.join(filedir, cam, "palette.txt"),
+                    self.scene.sensors[cam].palette.cpu().numpy(),
+                    delimiter=",",
+                    fmt="%d",
+                )
 
         # save camera poses
         np.savetxt(os.path.join(filedir, "camera_poses.txt"), samples.cpu().numpy(), delimiter=",")
@@ -168,53 +206,140 @@ class ViewpointSampling:
         # save images
         samples = samples.to(self.scene.device)
         start_time = time.time()
-        for i in range(num_rounds):
-            # get samples idx
-            samples_idx = torch.arange(i * num_envs, min((i + 1) * num_envs, samples.shape[0]))
-            # set camera positions
-            for cam in self.cfg.cameras.keys():
-                self.scene.sensors[cam].set_world_poses(
-                    positions=samples[samples_idx, :3],
-                    orientations=samples[samples_idx, 3:],
-                    env_ids=torch.arange(samples_idx.shape[0]),
-                    convention="world",
-                )
-            # update simulation
-            self.scene.write_data_to_sim()
-            # perform render steps to fill buffers if usd cameras are used
-            if any([isinstance(self.scene.sensors[cam], Camera) for cam in self.cfg.cameras.keys()]):
-                for _ in range(10):
-                    self.sim.render()
-            # update scene buffers
-            self.scene.update(self.sim.get_physics_dt())
-            # render
-            for cam_idx, curr_cam_annotator in enumerate(self.cfg.cameras.items()):
-                cam, annotator = curr_cam_annotator
-                image_data_np = self.scene.sensors[cam].data.output[annotator].cpu().numpy()
-                # filter nan
-                image_data_np[np.isnan(image_data_np)] = 0
-                # filter inf
-                image_data_np[np.isinf(image_data_np)] = 0
-
-                # save images
-                for idx in range(samples_idx.shape[0]):
-                    # semantic segmentation
-                    if image_data_np.shape[-1] == 3 or image_data_np.shape[-1] == 4:
-                        assert cv2.imwrite(
-                            os.path.join(filedir, cam, annotator, f"{image_idx[cam_idx]}".zfill(4) + ".png"),
-                            cv2.cvtColor(image_data_np[idx].astype(np.uint8), cv2.COLOR_RGB2BGR),
+        with PROFILER.run("viewpoint_rendering", filedir):
+            for i in range(num_rounds):
+                # get samples idx
+                samples_idx = torch.arange(i * num_envs, min((i + 1) * num_envs, samples.shape[0]))
+                with PROFILER.span("update scene"):
+                    # set camera positions
+                    for cam in self.cfg.cameras.keys():
+                        self.scene.sensors[cam].set_world_poses(
+                            positions=samples[samples_idx, :3],
+                            orientations=samples[samples_idx, 3:],
+                            env_ids=torch.arange(samples_idx.shape[0]),
+                            convention="world",
                         )
-                    # depth
-                    else:
-                        assert cv2.imwrite(
-                            os.path.join(filedir, cam, annotator, f"{image_idx[cam_idx]}".zfill(4) + ".png"),
-                            np.uint16(image_data_np[idx] * self.cfg.depth_scale),
+                    # update simulation
+                    self.scene.write_data_to_sim()
+                    # perform render steps to fill buffers if usd cameras are used
+                    if any([isinstance(self.scene.sensors[cam], Camera) for cam in self.cfg.cameras.keys()]):
+                        for _ in range(10):
+                            self.sim.render()
+                    # update scene buffers
+                    self.scene.update(self.sim.get_physics_dt())
+                # render
+                round_images = {}
+                for cam_idx, curr_cam_annotator in enumerate(self.cfg.cameras.items()):
+                    cam, annotator = curr_cam_annotator
+                    with PROFILER.span("fetch images"):
+                        image_data_np = self.scene.sensors[cam].data.output[annotator].cpu().numpy()
+                        # filter nan
+                        image_data_np[np.isnan(image_data_np)] = 0
+                        # filter inf
+                        image_data_np[np.isinf(image_data_np)] = 0
+                        round_images[cam] = image_data_np[: samples_idx.shape[0]]
+
+                    # save images
+                    with PROFILER.span("write images"):
+                        for idx in range(samples_idx.shape[0]):
+                            # semantic class ids
+                            if image_data_np.dtype == np.uint8 and image_data_np.shape[-1] == 1:
+                                image = image_data_np[idx, ..., 0]
+                            # semantic segmentation
+                            elif image_data_np.shape[-1] == 3 or image_data_np.shape[-1] == 4:
+                                image = cv2.cvtColor(image_data_np[idx].astype(np.uint8), cv2.COLOR_RGB2BGR)
+                            # depth
+                            else:
+                                image = np.uint16(image_data_np[idx] * self.cfg.depth_scale)
+                            file_path = os.path.join(filedir, cam, annotator, f"{image_idx[cam_idx]}".zfill(4) + ".png")
+                            assert cv2.imwrite(file_path, image)
+                            PROFILER.count("images written")
+                            if PROFILER.enabled:
+                                PROFILER.count("bytes written", os.path.getsize(file_path))
+
+                            image_idx[cam_idx] += 1
+
+                            if sum(image_idx) % 100 == 0:
+                                print(f"[INFO] Rendered {sum(image_idx)} images in {(time.time() - start_time):.4f}s.")
+
+                # feed the images of the round to the online reconstruction
+                if reconstruction is not None:
+                    sem_cam = reconstruction.cfg.semantic_cam_name
+                    if sem_lut is not None:
+                        round_images[sem_cam] = sem_lut[round_images[sem_cam][..., 0]]
+                    with PROFILER.span("online reconstruction"):
+                        reconstruction.add_batch(
+                            depth_images=round_images[reconstruction.cfg.depth_cam_name],
+                            poses=samples[samples_idx],
+                            K_depth=self.scene.sensors[reconstruction.cfg.depth_cam_name].data.intrinsic_matrices[0],
+                            sem_images=round_images[sem_cam] if reconstruction.cfg.semantics else None,
+                            K_sem=(
+                                self.scene.sensors[sem_cam].data.intrinsic_matrices[0]
+                                if reconstruction.cfg.semantics
+                                else None
+                            ),
                         )
 
-                    image_idx[cam_idx] += 1
+                yield "render viewpoints", int(samples_idx[-1]) + 1, samples.shape[0]
+
+            if reconstruction is not None:
+                with PROFILER.span("online reconstruction"):
+                    reconstruction.finish_reconstruction()
+
+    ###
+    # Helper functions
+    ###
 
-                    if sum(image_idx) % 100 == 0:
-                        print(f"[INFO] Rendered {sum(image_idx)} images in {(time.time() - start_time):.4f}s.")
+    def _select_samples_per_point(
+        self, nbr_samples_per_point: int, nbr_viewpoints: int, generator: torch.Generator
+    ) -> torch.Tensor:
+        """Select random samples of each start point, proportional to the number of selected samples.
+
+        Points are taken in index order until at least ``nbr_viewpoints`` samples are selected. The samples of a point
+        are found with the start point index of the sample table. Of points with few samples, all samples are shuffled
+        and the first ``nbr_samples_per_point`` are taken. Of points with many samples, distinct random samples are
+        drawn by redrawing duplicates.
+
+        Returns:
+            The start and neighbor point index of the selected samples.
+        """
+        table = self.terrain_analyser.samples
+
+        # take the points in order until enough samples are selected
+        selected_per_point = torch.cumsum(table.count.clamp(max=nbr_samples_per_point), dim=0)
+        nbr_points = int(torch.searchsorted(selected_per_point, nbr_viewpoints).item()) + 1
+        if nbr_points > table.num_points:
+            print(f"[WARNING] Only {selected_per_point[-1]} viewpoints can be sampled, requested {nbr_viewpoints}.")
+            nbr_points = table.num_points
+        points = torch.arange(nbr_points)
+        few_samples = table.count[points] <= 4 * nbr_samples_per_point
+
+        # points with few samples: random order within the samples of every point by sorting the point plus a random key
+        points_few, counts_few = points[few_samples], table.count[points[few_samples]]
+        rows = table.rows_of_points(points_few)
+        group = torch.repeat_interleave(torch.arange(points_few.shape[0]), counts_few)
+        order = torch.argsort(group + torch.rand(rows.shape[0], generator=generator, dtype=torch.float64))
+        rank = torch.arange(rows.shape[0]) - (torch.cumsum(counts_few, dim=0) - counts_few)[group]
+        selected_few = rows[order][rank < nbr_samples_per_point]
+
+        # points with many samples: draw positions within the samples of every point until they are distinct
+        points_many = points[~few_samples]
+        counts_many = table.count[points_many].unsqueeze(1).expand(-1, nbr_samples_per_point)
+        positions = (torch.rand(counts_many.shape, generator=generator, dtype=torch.float64) * counts_many).long()
+        while True:
+            positions = positions.sort(dim=1).values
+            duplicate = torch.zeros_like(positions, dtype=torch.bool)
+            duplicate[:, 1:] = positions[:, 1:] == positions[:, :-1]
+            if not duplicate.any():
+                break
+            redraw = torch.rand(int(duplicate.sum()), generator=generator, dtype=torch.float64)
+            positions[duplicate] = (redraw * counts_many[duplicate]).long()
+        selected_many = (table.begin[points_many].unsqueeze(1) + positions).flatten()
+
+        # order the samples by start point
+        selected = torch.cat((selected_few, selected_many))
+        selected = selected[torch.argsort(table.start[selected], stable=True)]
+        return torch.stack((table.start[selected], table.goal[selected]), dim=1).type(torch.int64)
 
     ###
     # Safe paths
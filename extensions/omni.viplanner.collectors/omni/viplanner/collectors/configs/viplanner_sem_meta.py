@@ -4,6 +4,11 @@
 #
 # SPDX-License-Identifier: BSD-3-Clause
 
+from __future__ import annotations
+
+import numpy as np
+import torch
+
 OBSTACLE_LOSS = 2.0
 TRAVERSABLE_INTENDED_LOSS = 0
 TRAVERSABLE_UNINTENDED_LOSS = 0.5
@@ -233,7 +238,21 @@ VIPLANNER_SEM_META = [
 
 
 class VIPlannerSemMetaHandler:
-    """Useful functions for handling VIPlanner semantic meta data."""
+    """Useful functions for handling VIPlanner semantic meta data.
+
+    Next to the dicts, lookup tables are provided to convert full image batches with a single gather:
+
+    - ``color_array``: class id -> color (uint8, shape (256, 3))
+    - ``loss_array``: class id -> loss (float32, shape (256,))
+    - ``ground_array``: class id -> ground (bool, shape (256,))
+    - ``rgb_lut``: 24-bit packed color -> class id (uint8, shape (2**24,)), :attr:`UNKNOWN_ID` for unknown colors
+
+    The class id tables cover all uint8 ids, ids without a class (incl. :attr:`UNKNOWN_ID`) are black obstacles that are
+    not ground. The output of :meth:`decode_rgb` can therefore directly be gathered.
+    """
+
+    UNKNOWN_ID: int = 255
+    """Class id of colors that are not part of the VIPlanner color space."""
 
     def __init__(self) -> None:
         # meta config
@@ -244,16 +263,83 @@ class VIPlannerSemMetaHandler:
         self.class_color: dict = self._get_class_color_dict()
         self.class_ground: dict = self._get_class_ground_dict()
         self.class_id: dict = self._get_class_id_dict()
+
+        # class id lookup tables, padded to all uint8 ids
+        self.color_array = np.zeros((256, 3), dtype=np.uint8)
+        self.color_array[: len(self.meta)] = self.colors
+        self.loss_array = np.full(256, OBSTACLE_LOSS, dtype=np.float32)
+        self.loss_array[: len(self.meta)] = self.losses
+        self.ground_array = np.zeros(256, dtype=bool)
+        self.ground_array[: len(self.meta)] = self.ground
+        # packed rgb lookup table (16MB), only created when needed
+        self._rgb_lut: np.ndarray | None = None
+        self._torch_luts: dict = {}
         return
 
     def get_colors_for_names(self, name_list: list) -> list:
         """Get list of colors for a list of names."""
-        colors = []
-        name_to_color = {nc["name"]: nc["color"] for nc in self.meta}
-        for name in name_list:
-            if name in name_to_color:
-                colors.append(name_to_color[name])
-        return colors
+        return [self.class_color[name] for name in name_list if name in self.class_color]
+
+    def get_ids_for_names(self, name_list: list) -> list:
+        """Get list of class ids for a list of names."""
+        return [self.class_id[name] for name in name_list if name in self.class_id]
+
+    ###
+    # Lookup tables
+    ###
+
+    @property
+    def rgb_lut(self) -> np.ndarray:
+        """Lookup table from the 24-bit packed color (r << 16 | g << 8 | b) to the class id.
+
+        Classes sharing the same color are assigned the lower class id."""
+        if self._rgb_lut is None:
+            self._rgb_lut = np.full(2**24, self.UNKNOWN_ID, dtype=np.uint8)
+            # reversed, so that the lower class id is written last
+            colors = self.color_array[: len(self.meta)]
+            self._rgb_lut[self.pack_rgb(colors)[::-1]] = np.arange(len(self.meta), dtype=np.uint8)[::-1]
+        return self._rgb_lut
+
+    def decode_rgb(self, images: np.ndarray | torch.Tensor) -> np.ndarray | torch.Tensor:
+        """Decode semantic colors of shape (..., 3) to class ids of shape (...).
+
+        Colors that are not part of the VIPlanner color space are assigned :attr:`UNKNOWN_ID`."""
+        if isinstance(images, torch.Tensor):
+            return self._get_torch_lut("rgb", images.device)[self.pack_rgb(images)]
+        return self.rgb_lut[self.pack_rgb(images)]
+
+    def encode_ids(self, ids: np.ndarray | torch.Tensor) -> np.ndarray | torch.Tensor:
+        """Encode class ids of shape (...) to semantic colors of shape (..., 3)."""
+        if isinstance(ids, torch.Tensor):
+            return self._get_torch_lut("color", ids.device)[ids.long()]
+        return self.color_array[ids]
+
+    def get_losses_for_ids(self, ids: np.ndarray | torch.Tensor) -> np.ndarray | torch.Tensor:
+        """Get the loss of class ids of shape (...)."""
+        if isinstance(ids, torch.Tensor):
+            return self._get_torch_lut("loss", ids.device)[ids.long()]
+        return self.loss_array[ids]
+
+    @staticmethod
+    def pack_rgb(colors: np.ndarray | torch.Tensor) -> np.ndarray | torch.Tensor:
+        """Pack colors of shape (..., 3) to 24-bit integers of shape (...)."""
+        if isinstance(colors, torch.Tensor):
+            colors = colors.long()
+        else:
+            colors = colors.astype(np.int64)
+        return (colors[..., 0] << 16) | (colors[..., 1] << 8) | colors[..., 2]
+
+    def _get_torch_lut(self, name: str, device: torch.device | str) -> torch.Tensor:
+        """Get a lookup table as tensor on the given device, tables are cached per device."""
+        key = (name, str(device))
+        if key not in self._torch_luts:
+            array = {"rgb": self.rgb_lut, "color": self.color_array, "loss": self.loss_array}[name]
+            self._torch_luts[key] = torch.from_numpy(array).to(device)
+        return self._torch_luts[key]
+
+    ###
+    # Dicts
+    ###
 
     def _get_class_loss_dict(self) -> dict:
         """Get class loss dict."""
@@ -4,7 +4,10 @@
 #
 # SPDX-License-Identifier: BSD-3-Clause
 
+from __future__ import annotations
+
 import asyncio
+from collections.abc import Callable
 from typing import Literal
 
 import carb
@@ -39,6 +42,8 @@ from orbit.nav.importer.scripts import (
 from orbit.nav.importer.sensors import MatterportRayCasterCameraCfg
 from orbit.nav.importer.utils.toggleable_window import ToggleableWindow
 
+from ..utils.task_progress import ProgressGenerator, TaskProgress
+
 EXTENSION_NAME = "Orbit Navigation Data Collectors"
 
 
@@ -87,6 +92,9 @@ class OrbitNavCollectorExtension(OrbitNavImporterExtension):
         self._input_fields: dict = {}  # dictionary to store values of buttion, float fields, etc.
         self._sensor_input_fields: dict = {}  # dictionary to store values of buttion, float fields, etc.
         self.ply_proposal: str = ""
+        # background task of the collectors
+        self._collector_task: asyncio.Task | None = None
+        self._cancel_requested: bool = False
         # build ui
         self.build_ui()
 
@@ -253,6 +261,14 @@ class OrbitNavCollectorExtension(OrbitNavImporterExtension):
                 # disable rendering button until viewpoints are sampled
                 self._input_fields["viewpoint_rendering_btn"].enabled = False
 
+                # progress of the running task
+                self._input_fields["task_progress_bar"] = ui.ProgressBar(height=20)
+                self._input_fields["task_progress_label"] = ui.Label("No task running", word_wrap=True)
+                self._input_fields["task_cancel_btn"] = btn_builder(
+                    "Cancel Task", text="Cancel", on_clicked_fn=self._cancel_collector_task
+                )
+                self._input_fields["task_cancel_btn"].enabled = False
+
     ##
     # Load Mesh and Point-Cloud
     ##
@@ -356,10 +372,13 @@ class OrbitNavCollectorExtension(OrbitNavImporterExtension):
             self._traj_explorer = TrajectorySampling(traj_sampling_cfg, scene=self.scene)
 
         self.sim.play()
-        self._traj_explorer.sample_paths(
-            [self._input_fields["traj_sampling_nbr_samples"].get_value_as_int()],
-            [self._input_fields["traj_sampling_min_length"].get_value_as_float()],
-            [self._input_fields["traj_sampling_max_length"].get_value_as_float()],
+        self._start_collector_task(
+            "Trajectory Sampling",
+            self._traj_explorer.sample_paths_iter(
+                [self._input_fields["traj_sampling_nbr_samples"].get_value_as_int()],
+                [self._input_fields["traj_sampling_min_length"].get_value_as_float()],
+                [self._input_fields["traj_sampling_max_length"].get_value_as_float()],
+            ),
         )
 
     def _execute_viewpoint_sampling(self):
@@ -372,15 +391,81 @@ class OrbitNavCollectorExtension(OrbitNavImporterExtension):
             # execute viewpoint sampling
             self._viewpoint_explorer = ViewpointSampling(viewpoint_sampling_cfg, scene=self.scene)
 
-        self._viepoint_samples = self._viewpoint_explorer.sample_viewpoints(
-            self._input_fields["viewpoint_sampling_nbr_samples"].get_value_as_int()
+        def on_done(samples):
+            self._viepoint_samples = samples
+            # enable rendering button
+            self._input_fields["viewpoint_rendering_btn"].enabled = True
+
+        self._start_collector_task(
+            "Viewpoint Sampling",
+            self._viewpoint_explorer.sample_viewpoints_iter(
+                self._input_fields["viewpoint_sampling_nbr_samples"].get_value_as_int()
+            ),
+            on_done=on_done,
         )
-        # enable rendering button
-        self._input_fields["viewpoint_rendering_btn"].enabled = True
 
     def _execute_viewpoint_rendering(self):
         if not hasattr(self, "_viewpoint_explorer") or not hasattr(self, "_viepoint_samples"):
             carb.log_warn("No viewpoint explorer found. Please sample viewpoints first.")
             return
 
-        self._viewpoint_explorer.render_viewpoints(self._viepoint_samples)
+        self._start_collector_task(
+            "Viewpoint Rendering", self._viewpoint_explorer.render_viewpoints_iter(self._viepoint_samples)
+        )
+
+    ##
+    # Background execution of the sampling tasks
+    ##
+
+    def _start_collector_task(self, name: str, task: ProgressGenerator, on_done: Callable | None = None):
+        """Run a collector task in the background, yielding to the app loop between its batches."""
+        if self._collector_task is not None and not self._collector_task.done():
+            carb.log_warn("A collector task is already running. Cancel it or wait until it is finished.")
+            task.close()
+            return
+
+        self._cancel_requested = False
+        self._set_task_buttons_enabled(False)
+        self._collector_task = asyncio.ensure_future(self._run_collector_task(name, task, on_done))
+
+    async def _run_collector_task(self, name: str, task: ProgressGenerator, on_done: Callable | None):
+        progress = TaskProgress()
+        try:
+            while True:
+                try:
+                    progress.update(*next(task))
+                except StopIteration as result:
+                    if on_done is not None:
+                        on_done(result.value)
+                    self._input_fields["task_progress_label"].text = f"{name} finished"
+                    self._input_fields["task_progress_bar"].model.set_value(1.0)
+                    break
+
+                self._input_fields["task_progress_bar"].model.set_value(progress.fraction)
+                self._input_fields["task_progress_label"].text = f"{name} - {progress}"
+
+                # stop at the batch boundary
+                if self._cancel_requested:
+                    task.close()
+                    self._input_fields["task_progress_label"].text = f"{name} cancelled at {progress.stage}"
+                    print(f"[INFO] {name} cancelled by the user.")
+                    break
+
+                # give control back to the app loop
+                await omni.kit.app.get_app().next_update_async()
+        except Exception as e:
+            self._input_fields["task_progress_label"].text = f"{name} failed: {e}"
+            carb.log_error(f"{name} failed: {e}")
+            raise
+        finally:
+            self._set_task_buttons_enabled(True)
+
+    def _cancel_collector_task(self):
+        if self._collector_task is not None and not self._collector_task.done():
+            self._cancel_requested = True
+
+    def _set_task_buttons_enabled(self, enabled: bool):
+        self._input_fields["traj_sampling_btn"].enabled = enabled
+        self._input_fields["viewpoint_sampling_btn"].enabled = enabled
+        self._input_fields["viewpoint_rendering_btn"].enabled = enabled and hasattr(self, "_viepoint_samples")
+        self._input_fields["task_cancel_btn"].enabled = not enabled
@@ -0,0 +1,144 @@
+# Copyright (c) 2024 ETH Zurich (Robotic Systems Lab)
+# Author: Pascal Roth, Ziqi Fan
+# All rights reserved.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+
+"""Parameter sweeps, result files and baseline comparison of the benchmark scripts.
+
+A benchmark result is a json file of the form
+
+.. code-block:: json
+
+    {
+        "benchmark": "terrain_analysis",
+        "machine": {...},
+        "runs": [
+            {"params": {"sample_points": 1000, ...}, "stages": {"sample points": {"time_s": 0.1, ...}}, ...},
+        ]
+    }
+
+Runs are matched with the baseline by their parameters. A stage regresses if its time (or peak memory) exceeds the
+baseline by more than the relative tolerance, stages below a minimum time are ignored as they are dominated by noise.
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import os
+import platform
+from collections.abc import Iterator
+
+
+def sweep_params(defaults: dict, sweeps: dict[str, list], full_grid: bool = False) -> Iterator[dict]:
+    """Parameter sets of a sweep.
+
+    Args:
+        defaults: Default value of every parameter.
+        sweeps: Values of the swept parameters.
+        full_grid: Run the cartesian product of all sweeps. Otherwise, each parameter is swept individually while all
+            other parameters keep their default value. Defaults to False.
+    """
+    if full_grid:
+        names = list(sweeps.keys())
+        for values in itertools.product(*sweeps.values()):
+            yield {**defaults, **dict(zip(names, values))}
+        return
+
+    seen = set()
+    for name, values in sweeps.items():
+        for value in values:
+            params = {**defaults, name: value}
+            key = params_key(params)
+            if key not in seen:
+                seen.add(key)
+                yield params
+
+
+def params_key(params: dict) -> str:
+    return json.dumps(params, sort_keys=True)
+
+
+def machine_info() -> dict:
+    """Description of the machine the benchmark ran on, results of different machines are not comparable."""
+    info = {"platform": platform.platform(), "processor": platform.processor(), "cpu_count": os.cpu_count()}
+    try:
+        import torch
+
+        if torch.cuda.is_available():
+            info["gpu"] = torch.cuda.get_device_name()
+    except ImportError:
+        pass
+    return info
+
+
+def save_results(file_path: str, benchmark: str, runs: list[dict]):
+    os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+    with open(file_path, "w") as f:
+        json.dump({"benchmark": benchmark, "machine": machine_info(), "runs": runs}, f, indent=2)
+    print(f"[INFO] Saved benchmark results to {file_path}")
+
+
+def load_results(file_path: str) -> dict:
+    with open(file_path) as f:
+        return json.load(f)
+
+
+def compare_to_baseline(
+    runs: list[dict],
+    baseline: dict,
+    time_tolerance: float = 0.2,
+    memory_tolerance: float = 0.2,
+    min_time: float = 0.05,
+) -> list[str]:
+    """Compare the runs against the baseline results.
+
+    Args:
+        runs: Runs of the current benchmark.
+        baseline: Loaded baseline result file.
+        time_tolerance: Allowed relative increase of the stage time. Defaults to 0.2.
+        memory_tolerance: Allowed relative increase of the stage peak memory. Defaults to 0.2.
+        min_time: Minimum baseline time in seconds of a stage to be compared. Defaults to 0.05.
+
+    Returns:
+        Description of every regression, empty if there is none.
+    """
+    baseline_runs = {params_key(run["params"]): run for run in baseline["runs"]}
+    regressions = []
+    for run in runs:
+        baseline_run = baseline_runs.get(params_key(run["params"]))
+        if baseline_run is None:
+            print(f"[WARNING] No baseline for parameters {run['params']}")
+            continue
+        for stage, result in run["stages"].items():
+            reference = baseline_run["stages"].get(stage)
+            if reference is None:
+                continue
+            if reference["time_s"] >= min_time and result["time_s"] > reference["time_s"] * (1 + time_tolerance):
+                regressions.append(
+                    f"{stage} {run['params']}: time {result['time_s']:.3f}s > baseline {reference['time_s']:.3f}s"
+                )
+            if (
+                "peak_memory_mb" in result
+                and reference.get("peak_memory_mb", 0.0) > 0.0
+                and result["peak_memory_mb"] > reference["peak_memory_mb"] * (1 + memory_tolerance)
+            ):
+                regressions.append(
+                    f"{stage} {run['params']}: peak memory {result['peak_memory_mb']:.1f}MB > baseline"
+                    f" {reference['peak_memory_mb']:.1f}MB"
+                )
+    return regressions
+
+
+def format_runs(runs: list[dict], swept: list[str]) -> str:
+    """Table of the stage times and peak memory of every run."""
+    lines = []
+    for run in runs:
+        lines.append(", ".join(f"{name}={run['params'][name]}" for name in swept))
+        for stage, result in run["stages"].items():
+            memory = f"{result['peak_memory_mb']:>12.1f} MB" if "peak_memory_mb" in result else ""
+            lines.append(f"  {stage:<38}{result['time_s']:>12.3f} s{memory}")
+        for name, value in run.get("metrics", {}).items():
+            lines.append(f"  {name:<38}{value:>14.2f}")
+    return "\n".join(lines)
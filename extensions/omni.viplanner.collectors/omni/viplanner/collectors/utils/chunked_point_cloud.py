@@ -0,0 +1,233 @@
+# Copyright (c) 2024 ETH Zurich (Robotic Systems Lab)
+# Author: Pascal Roth, Ziqi Fan
+# All rights reserved.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+
+"""Chunked binary storage of (semantic) point clouds with a spatial grid index.
+
+The point cloud is stored in a directory with the following structure:
+
+- save_dir
+    - index.npz     (grid cell, offset, number of points and bounds of every chunk)
+    - points.bin    (float32 x y z, sorted by chunk)
+    - colors.bin    (uint8 r g b, same order as the points, optional)
+
+Within every chunk, the points are randomly shuffled. Reading the first fraction of every chunk therefore results
+in a uniform subsample of the cloud which is used for the level-of-detail reads. The binary files are accessed as
+memory maps, i.e. only the requested chunks are read from the drive.
+"""
+
+from __future__ import annotations
+
+import os
+
+import numpy as np
+
+INDEX_FILE = "index.npz"
+POINTS_FILE = "points.bin"
+COLORS_FILE = "colors.bin"
+
+
+def write_chunked_point_cloud(
+    save_dir: str, points: np.ndarray, colors: np.ndarray | None = None, chunk_size: float = 10.0, seed: int = 0
+):
+    """Write a point cloud in spatially sorted chunks.
+
+    Args:
+        save_dir: Directory the chunked point cloud is saved to.
+        points: Points with shape (N, 3).
+        colors: Colors of the points with shape (N, 3), either as uint8 or as float in [0, 1]. Defaults to None.
+        chunk_size: Edge length of the cubic chunks in meters. Defaults to 10.0.
+        seed: Seed of the shuffle within the chunks. Defaults to 0.
+    """
+    os.makedirs(save_dir, exist_ok=True)
+    points = np.asarray(points, dtype=np.float32)
+
+    # assign every point its grid cell
+    origin = points.min(axis=0)
+    cells = np.floor((points - origin) / chunk_size).astype(np.int64)
+    dims = cells.max(axis=0) + 1
+    keys = np.ravel_multi_index(cells.T, dims)
+    del cells
+
+    # sort by cell, the random permutation before the stable sort shuffles the points within every chunk
+    order = np.random.default_rng(seed).permutation(points.shape[0])
+    order = order[np.argsort(keys[order], kind="stable")]
+    chunk_keys, offsets, counts = np.unique(keys[order], return_index=True, return_counts=True)
+    del keys
+
+    # write points and colors
+    points = points[order]
+    points.tofile(os.path.join(save_dir, POINTS_FILE))
+    if colors is not None:
+        colors = np.asarray(colors)
+        if colors.dtype != np.uint8:
+            colors = np.round(colors * 255).clip(0, 255).astype(np.uint8)
+        colors[order].tofile(os.path.join(save_dir, COLORS_FILE))
+
+    # write index
+    np.savez(
+        os.path.join(save_dir, INDEX_FILE),
+        cells=np.stack(np.unravel_index(chunk_keys, dims), axis=1).astype(np.int32),
+        offsets=offsets.astype(np.int64),
+        counts=counts.astype(np.int64),
+        bounds_min=np.minimum.reduceat(points, offsets, axis=0),
+        bounds_max=np.maximum.reduceat(points, offsets, axis=0),
+        origin=origin,
+        chunk_size=np.float32(chunk_size),
+        has_colors=colors is not None,
+    )
+    print(f"[INFO] saved {points.shape[0]} points in {len(offsets)} chunks to {save_dir}")
+
+
+class ChunkedPointCloud:
+    """Reader for point clouds written with :func:`write_chunked_point_cloud`."""
+
+    def __init__(self, load_dir: str):
+        index = np.load(os.path.join(load_dir, INDEX_FILE))
+        self.cells: np.ndarray = index["cells"]
+        self.offsets: np.ndarray = index["offsets"]
+        self.counts: np.ndarray = index["counts"]
+        self.bounds_min: np.ndarray = index["bounds_min"]
+        self.bounds_max: np.ndarray = index["bounds_max"]
+        self.origin: np.ndarray = index["origin"]
+        self.chunk_size = float(index["chunk_size"])
+
+        # memory map the data
+        self._points = np.memmap(os.path.join(load_dir, POINTS_FILE), dtype=np.float32, mode="r").reshape(-1, 3)
+        if bool(index["has_colors"]):
+            self._colors = np.memmap(os.path.join(load_dir, COLORS_FILE), dtype=np.uint8, mode="r").reshape(-1, 3)
+        else:
+            self._colors = None
+
+    @property
+    def num_points(self) -> int:
+        return self._points.shape[0]
+
+    @property
+    def num_chunks(self) -> int:
+        return self.offsets.shape[0]
+
+    def query(
+        self, min_bound: np.ndarray | list, max_bound: np.ndarray | list, fraction: float = 1.0
+    ) -> tuple[np.ndarray, np.ndarray | None]:
+        """Get all points within an axis-aligned box.
+
+        Args:
+            min_bound: Minimum corner of the box.
+            max_bound: Maximum corner of the box.
+            fraction: Fraction of the points of every chunk that is read (level-of-detail). Defaults to 1.0.
+
+        Returns:
+            The points and colors (None if the cloud has no colors) within the box.
+        """
+        min_bound = np.asarray(min_bound, dtype=np.float32)
+        max_bound = np.asarray(max_bound, dtype=np.float32)
+        overlap = np.all(self.bounds_max >= min_bound, axis=1) & np.all(self.bounds_min <= max_bound, axis=1)
+        chunk_ids = np.where(overlap)[0]
+        points, colors = self._read_chunks(chunk_ids, np.ceil(self.counts[chunk_ids] * fraction).astype(np.int64))
+
+        inside = np.all((points >= min_bound) & (points <= max_bound), axis=1)
+        return points[inside], colors[inside] if colors is not None else None
+
+    def read_lod(
+        self, fraction: float | None = None, max_points: int | None = None
+    ) -> tuple[np.ndarray, np.ndarray | None]:
+        """Read a uniformly decimated version of the whole cloud.
+
+        Args:
+            fraction: Fraction of the points that is read. Defaults to None.
+            max_points: Maximum number of points that is read, only used if no fraction is given. Defaults to None.
+
+        Returns:
+            The points and colors (None if the cloud has no colors) of the decimated cloud.
+        """
+        if fraction is not None:
+            counts = np.ceil(self.counts * fraction).astype(np.int64)
+        elif max_points is None or max_points >= self.num_points:
+            counts = self.counts
+        else:
+            # distribute the budget proportional to the chunk sizes, the remainder to the largest fractional parts
+            exact = self.counts * (max_points / self.num_points)
+            counts = np.floor(exact).astype(np.int64)
+            remaining = max_points - int(counts.sum())
+            counts[np.argsort(counts - exact, kind="stable")[:remaining]] += 1
+        return self._read_chunks(np.arange(self.num_chunks), counts)
+
+    def _read_chunks(self, chunk_ids: np.ndarray, counts: np.ndarray) -> tuple[np.ndarray, np.ndarray | None]:
+        """Read the first ``counts`` points of the given chunks."""
+        starts = self.offsets[chunk_ids]
+        # indices of all points of the selected chunk prefixes
+        point_idx = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+
+        points = np.asarray(self._points[point_idx])
+        colors = np.asarray(self._colors[point_idx]) if self._colors is not None else None
+        return points, colors
+
+
+def read_ply_preview(
+    file_path: str, max_points: int, block_size: int = 1024, min_blocks: int = 16
+) -> tuple[np.ndarray, np.ndarray | None]:
+    """Read a decimated preview of a binary little endian ply point cloud without loading the whole file.
+
+    The vertex data is memory mapped and evenly spaced blocks of consecutive points are read.
+
+    Args:
+        file_path: Path to the ply file.
+        max_points: Maximum number of points of the preview.
+        block_size: Maximum number of consecutive points read at once. Defaults to 1024.
+        min_blocks: Minimum number of blocks, small previews use smaller blocks spread over the file. Defaults to 16.
+
+    Returns:
+        The points and colors in [0, 1] (None if the cloud has no colors) of the preview.
+    """
+    ply_types = {
+        "char": "i1", "int8": "i1", "uchar": "u1", "uint8": "u1", "short": "i2", "int16": "i2", "ushort": "u2",
+        "uint16": "u2", "int": "i4", "int32": "i4", "uint": "u4", "uint32": "u4", "float": "f4", "float32": "f4",
+        "double": "f8", "float64": "f8",
+    }  # fmt: skip
+
+    # parse header
+    with open(file_path, "rb") as f:
+        header = []
+        while True:
+            line = f.readline().decode("ascii").strip()
+            header.append(line)
+            if line == "end_header":
+                break
+        header_size = f.tell()
+
+    if "format binary_little_endian 1.0" not in header:
+        raise ValueError(f"Only binary little endian ply files can be previewed: {file_path}")
+
+    # get the properties of all elements, lists (e.g. of faces) are skipped as only the vertices are read
+    elements = []
+    for line in header:
+        tokens = line.split()
+        if tokens[0] == "element":
+            elements.append((tokens[1], int(tokens[2]), []))
+        elif tokens[0] == "property" and tokens[1] != "list":
+            elements[-1][2].append((tokens[2], "<" + ply_types[tokens[1]]))
+    if len(elements) == 0 or elements[0][0] != "vertex":
+        raise ValueError(f"Vertex element has to be the first element of the ply file: {file_path}")
+    _, nbr_vertices, fields = elements[0]
+
+    vertices = np.memmap(file_path, dtype=np.dtype(fields), mode="r", offset=header_size, shape=(nbr_vertices,))
+
+    # read evenly spaced blocks, the block sizes differ by at most one and sum up to the number of points
+    nbr_points = min(max_points, nbr_vertices)
+    nbr_blocks = max(int(np.ceil(nbr_points / block_size)), min(nbr_points, min_blocks), 1)
+    block_sizes = np.diff(np.linspace(0, nbr_points, nbr_blocks + 1).astype(np.int64))
+    # the skipped vertices are distributed evenly in front of the blocks, i.e. the blocks do not overlap
+    skipped = np.linspace(0, nbr_vertices - nbr_points, nbr_blocks).astype(np.int64)
+    point_idx = np.repeat(skipped, block_sizes) + np.arange(nbr_points)
+    data = np.asarray(vertices[point_idx])
+
+    points = np.stack((data["x"], data["y"], data["z"]), axis=1).astype(np.float64)
+    if all(name in data.dtype.names for name in ("red", "green", "blue")):
+        colors = np.stack((data["red"], data["green"], data["blue"]), axis=1).astype(np.float64)
+        colors = colors / 255.0 if data["red"].dtype == np.uint8 else colors
+    else:
+        colors = None
+    return points, colors
@@ -0,0 +1,161 @@
+# Copyright (c) 2024 ETH Zurich (Robotic Systems Lab)
+# Author: Pascal Roth, Ziqi Fan
+# All rights reserved.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+
+from __future__ import annotations
+
+import os
+
+import numpy as np
+import open3d as o3d
+import torch
+from omni.viplanner.collectors.configs.viplanner_sem_meta import (
+    OBSTACLE_LOSS,
+    VIPlannerSemMetaHandler,
+)
+
+from .cost_map_builder_cfg import CostMapBuilderCfg
+
+
+class CostMapBuilder:
+    """
+    Build a 2D traversability cost map from a reconstructed semantic point cloud.
+
+    The points are scattered into a xy-grid. For every cell, the lowest point defines the ground height, points above
+    the robot height are ignored. A cell is assigned the maximum loss of the VIPlanner semantic classes of its points
+    (:attr:`VIPlannerSemMetaHandler.class_loss`) and the obstacle loss if the height difference within the cell exceeds
+    the obstacle height threshold. All operations are vectorized scatter/reduce operations over the points.
+
+    The cost map is saved as a compressed ``.npz`` file with the following fields:
+
+    - cost          (float16, shape (X, Y))
+    - height        (float16, shape (X, Y), ground height, NaN for unknown cells)
+    - origin        (float32, xy position of the center of cell [0, 0])
+    - resolution    (float32)
+    """
+
+    def __init__(self, cfg: CostMapBuilderCfg):
+        # get config
+        self._cfg: CostMapBuilderCfg = cfg
+        # lookup of semantic color to loss
+        self._init_color_lookup()
+
+        # variables
+        self.cost: torch.Tensor | None = None
+        self.height: torch.Tensor | None = None
+        self.origin: np.ndarray | None = None
+
+    ###
+    # Operations
+    ###
+
+    def build_from_file(self, file_path: str):
+        """Build the cost map from a ``cloud.ply`` file as saved by :meth:`EnvironmentReconstruction.save_pcd`."""
+        pcd = o3d.io.read_point_cloud(file_path)
+        assert pcd.has_colors(), f"Point cloud {file_path} has no semantic colors."
+        self.build(np.asarray(pcd.points), np.asarray(pcd.colors))
+
+    def build(self, points: np.ndarray | torch.Tensor, colors: np.ndarray | torch.Tensor):
+        """Build the cost map.
+
+        Args:
+            points: Points of the semantic cloud with shape (N, 3).
+            colors: Semantic colors of the points with shape (N, 3), either as uint8 or as float in [0, 1].
+        """
+        device = self._cfg.device
+        points = torch.as_tensor(np.asarray(points) if not isinstance(points, torch.Tensor) else points)
+        points = points.to(device=device, dtype=torch.float32)
+        point_loss = self._get_point_loss(colors).to(device)
+
+        # assign points to grid cells
+        xy_min = points[:, :2].min(dim=0)[0]
+        cell_idx = torch.floor((points[:, :2] - xy_min) / self._cfg.resolution).long()
+        grid_shape = (int(cell_idx[:, 0].max()) + 1, int(cell_idx[:, 1].max()) + 1)
+        cell_idx = cell_idx[:, 0] * grid_shape[1] + cell_idx[:, 1]
+        nbr_cells = grid_shape[0] * grid_shape[1]
+
+        # ground height as lowest point of every cell
+        z_min = torch.full((nbr_cells,), float("inf"), device=device)
+        z_min.scatter_reduce_(0, cell_idx, points[:, 2], reduce="amin")
+
+        # ignore points above the robot height (e.g. ceilings, overhangs)
+        relevant = points[:, 2] <= z_min[cell_idx] + self._cfg.robot_height
+        cell_idx = cell_idx[relevant]
+
+        z_max = torch.full((nbr_cells,), float("-inf"), device=device)
+        z_max.scatter_reduce_(0, cell_idx, points[relevant, 2], reduce="amax")
+        sem_cost = torch.zeros(nbr_cells, device=device)
+        sem_cost.scatter_reduce_(0, cell_idx, point_loss[relevant], reduce="amax")
+
+        # combine semantic and geometric cost
+        known = torch.isfinite(z_min)
+        obstacle = known & (z_max - z_min > self._cfg.obstacle_height_threshold)
+        cost = torch.where(obstacle, torch.clamp(sem_cost, min=OBSTACLE_LOSS), sem_cost)
+        unknown_cost = self._cfg.unknown_cost if self._cfg.unknown_cost is not None else OBSTACLE_LOSS
+        cost[~known] = unknown_cost
+        cost = cost.reshape(grid_shape)
+
+        # inflate obstacles
+        if self._cfg.inflation_radius > 0:
+            cost = self._inflate_obstacles(cost)
+
+        self.cost = cost
+        self.height = torch.where(known, z_min, torch.full_like(z_min, float("nan"))).reshape(grid_shape)
+        self.origin = (xy_min + self._cfg.resolution / 2).cpu().numpy()
+        print(f"[INFO] Built cost map with {grid_shape[0]}x{grid_shape[1]} cells from {points.shape[0]} points.")
+
+    def save(self, save_path: str):
+        """Save the cost map as compressed ``.npz`` file."""
+        assert self.cost is not None, "No cost map built yet."
+        os.makedirs(os.path.dirname(os.path.abspath(save_path)), exist_ok=True)
+        np.savez_compressed(
+            save_path,
+            cost=self.cost.cpu().numpy().astype(np.float16),
+            height=self.height.cpu().numpy().astype(np.float16),
+            origin=self.origin.astype(np.float32),
+            resolution=np.float32(self._cfg.resolution),
+        )
+        print(f"[INFO] Saved cost map to {save_path}")
+
+    ###
+    # Helper functions
+    ###
+
+    def _init_color_lookup(self):
+        """Lookup tables of the VIPlanner classes."""
+        self._sem_meta = VIPlannerSemMetaHandler()
+        self._palette = self._sem_meta.color_array[: len(self._sem_meta.meta)].astype(np.int64)
+
+    def _get_point_loss(self, colors: np.ndarray | torch.Tensor) -> torch.Tensor:
+        """Map the semantic color of every point to the loss of its class.
+
+        Colors that are not part of the palette (e.g. averaged by the voxel downsampling) are assigned the loss of the
+        closest class color."""
+        colors = colors.cpu().numpy() if isinstance(colors, torch.Tensor) else np.asarray(colors)
+        if colors.dtype != np.uint8:
+            colors = np.round(colors * 255).clip(0, 255)
+        colors = colors.astype(np.int64)
+
+        # exact match over the packed colors
+        ids = self._sem_meta.decode_rgb(colors)
+        miss = np.where(ids == VIPlannerSemMetaHandler.UNKNOWN_ID)[0]
+
+        # closest color for all other points
+        for start in range(0, len(miss), 1_000_000):
+            curr_miss = miss[start : start + 1_000_000]
+            dist = np.sum((colors[curr_miss, None, :] - self._palette[None, :, :]) ** 2, axis=-1)
+            ids[curr_miss] = np.argmin(dist, axis=1)
+
+        return torch.from_numpy(self._sem_meta.get_losses_for_ids(ids))
+
+    def _inflate_obstacles(self, cost: torch.Tensor) -> torch.Tensor:
+        """Inflate obstacle cells with a circular kernel of the inflation radius."""
+        radius = int(np.ceil(self._cfg.inflation_radius / self._cfg.resolution))
+        offsets = torch.arange(-radius, radius + 1, device=cost.device, dtype=torch.float32)
+        kernel = ((offsets[:, None] ** 2 + offsets[None, :] ** 2) <= radius**2).float()
+
+        obstacle = (cost >= OBSTACLE_LOSS).float()[None, None]
+        inflated = torch.nn.functional.conv2d(obstacle, kernel[None, None], padding=radius)[0, 0] > 0
+        return torch.where(inflated, torch.clamp(cost, min=OBSTACLE_LOSS), cost)
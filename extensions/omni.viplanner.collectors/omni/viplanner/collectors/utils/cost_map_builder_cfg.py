@@ -0,0 +1,40 @@
+# Copyright (c) 2024 ETH Zurich (Robotic Systems Lab)
+# Author: Pascal Roth, Ziqi Fan
+# All rights reserved.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+
+from omni.isaac.lab.utils import configclass
+
+
+@configclass
+class CostMapBuilderCfg:
+    """
+    Arguments for the construction of a 2D cost map from a reconstructed semantic point cloud
+    """
+
+    # grid parameters
+    resolution: float = 0.1
+    """Resolution of the cost map in meters. Default is 0.1."""
+
+    # height parameters
+    robot_height: float = 0.6
+    """Height of the robot in meters (same as the terrain analysis).
+
+    Points higher than this value above the lowest point of a cell (e.g. ceilings) are ignored. Default is 0.6."""
+    obstacle_height_threshold: float = 0.3
+    """Height difference within a cell above which the cell is considered an obstacle.
+
+    Same as the height difference threshold of the terrain analysis. Default is 0.3."""
+
+    # cost parameters
+    unknown_cost: float | None = None
+    """Cost of cells without any point. If None, the obstacle loss of the VIPlanner semantic classes is used.
+    Default is None."""
+    inflation_radius: float = 0.0
+    """Radius in meters by which obstacles are inflated. No inflation is performed for a radius of 0.
+    Default is 0.0."""
+
+    # computation parameters
+    device: str = "cpu"
+    """Device used for the scatter operations. Default is "cpu"."""
@@ -4,15 +4,23 @@
 #
 # SPDX-License-Identifier: BSD-3-Clause
 
+from __future__ import annotations
+
+import json
 import os
 
 import cv2
 import numpy as np
 import open3d as o3d
 import scipy.spatial.transform as tf
+import torch
 from tqdm import tqdm
 
+from .chunked_point_cloud import write_chunked_point_cloud
 from .environment3d_reconstruction_cfg import ReconstructionCfg
+from .keyframe_selection import frustum_voxels, select_keyframes
+from .profiling import PROFILER
+from .semantic_recoloring import build_lut, load_palette
 
 
 class EnvironmentReconstruction:
@@ -32,6 +40,8 @@ class EnvironmentReconstruction:
             - semantic_segmentation
                 - xxxx.png  (images should be named with 4 digits, e.g. 0000.png, 0001.png, etc., RGB images)
 
+    In the online mode (:attr:`ReconstructionCfg.online`), nothing is read from the drive. Instead, the images are
+    passed directly over :meth:`add_batch`, e.g. from :meth:`ViewpointSampling.render_viewpoints`.
     """
 
     debug = False
@@ -40,15 +50,25 @@ class EnvironmentReconstruction:
         # get config
         self._cfg: ReconstructionCfg = cfg
         # read camera params and odom
-        self._read_intrinsic()
-        self._read_extrinsic()
+        if not self._cfg.online:
+            self._read_intrinsic()
+            self._read_extrinsic()
         # control flag if point-cloud has been loaded
         self._is_constructed = False
 
         # variables
         self._pcd: o3d.geometry.PointCloud = None
-
-        print("Ready to read depth data.")
+        # buffers of the online reconstruction
+        self._pixels: np.ndarray | None = None
+        self._pixels_key: tuple | None = None
+        self._points_buffer: list[np.ndarray] = []
+        self._sem_buffer: list[np.ndarray] = []
+        self._img_counter = 0
+
+        if self._cfg.online:
+            print("Ready to receive depth data.")
+        else:
+            print("Ready to read depth data.")
 
     ###
     # Operations
@@ -59,6 +79,17 @@ class EnvironmentReconstruction:
         N = len(self.extrinsics)
         self._end_idx = min(self._cfg.max_images, N) if self._cfg.max_images is not None else N
 
+        # get image shape and pixel tensor for reprojection
+        img_shape = self._load_depth_image(0).shape
+        pixels = self._computePixelTensor(self.K_depth, img_shape)
+
+        # select the images used for the reconstruction
+        if self._cfg.keyframe_selection:
+            img_indices = self._select_keyframes(img_shape)
+            self._end_idx = len(img_indices)
+        else:
+            img_indices = range(self._end_idx)
+
         if self._cfg.point_cloud_batch_size > self._end_idx:
             print(
                 "[WARNING] batch size must be smaller or equal than number of"
@@ -69,86 +100,109 @@ class EnvironmentReconstruction:
 
         print(f"[INFO] total number of images for reconstruction: {int(self._end_idx)}")
 
-        # get pixel tensor for reprojection
-        pixels = self._computePixelTensor()
+        with PROFILER.run("reconstruction", self._cfg.data_dir):
+            # init point-cloud
+            self._reset_buffers()
 
-        # init point-cloud
-        self._pcd = o3d.geometry.PointCloud()  # point size (n, 3)
-        first_batch = True
+            for img_idx in tqdm(
+                img_indices,
+                desc="Reconstructing 3D Points",
+            ):
+                with PROFILER.span("load depth image"):
+                    im = self._load_depth_image(img_idx)
 
-        # init lists
-        points_all = []
-        if self._cfg.semantics:
-            sem_map_all = []
+                # project points in world frame
+                with PROFILER.span("project depth"):
+                    points_final = self._project_depth(im, self.extrinsics[img_idx], pixels)
+                    PROFILER.count("points projected", points_final.shape[0])
 
-        for img_counter, img_idx in enumerate(
-            tqdm(
-                range(self._end_idx),
-                desc="Reconstructing 3D Points",
-            )
-        ):
-            im = self._load_depth_image(img_idx)
+                if self._cfg.semantics:
+                    with PROFILER.span("load semantic image"):
+                        sem_image = self._load_semantic_image(img_idx)
+                    with PROFILER.span("semantic annotation"):
+                        sem_annotation, filter_idx = self._get_semantic_annotation(
+                            points_final, sem_image, self.extrinsics[img_idx], self.K_sem
+                        )
+                    self._add_to_buffer(points_final[filter_idx], sem_annotation)
+                else:
+                    self._add_to_buffer(points_final)
 
-            # project points in world frame
-            rot = tf.Rotation.from_quat(self.extrinsics[img_idx][3:]).as_matrix()
-            points = im.reshape(-1, 1) * (rot @ pixels.T).T
-            # filter points with 0 depth --> otherwise obstacles at camera position
-            non_zero_idx = np.where(points.any(axis=1))[0]
+            # add last batch
+            self.finish_reconstruction()
 
-            points_final = points[non_zero_idx] + self.extrinsics[img_idx][:3]
+        return
 
-            if self._cfg.semantics:
-                sem_annotation, filter_idx = self._get_semantic_image(points_final, img_idx)
-                points_all.append(points_final[filter_idx])
-                sem_map_all.append(sem_annotation)
-            else:
-                points_all.append(points_final)
+    def add_batch(
+        self,
+        depth_images: np.ndarray | torch.Tensor,
+        poses: np.ndarray | torch.Tensor,
+        K_depth: np.ndarray | torch.Tensor,
+        sem_images: np.ndarray | torch.Tensor | None = None,
+        K_sem: np.ndarray | torch.Tensor | None = None,
+        sem_poses: np.ndarray | torch.Tensor | None = None,
+    ):
+        """Add a batch of rendered images directly to the reconstruction.
+
+        Used in the online mode to integrate images without writing and reading them from the drive. The
+        point cloud is updated every :attr:`ReconstructionCfg.point_cloud_batch_size` images, the remaining images are
+        added when calling :meth:`finish_reconstruction`. The first batch after a finished reconstruction starts a new
+        point cloud.
+
+        Args:
+            depth_images: Depth images in meters with shape (N, H, W) or (N, H, W, 1).
+            poses: Camera poses of the depth images with shape (N, 7) in the format x y z qw qx qy qz
+                (same as ``camera_poses.txt``).
+            K_depth: Intrinsic matrix of the depth camera with shape (3, 3) or (N, 3, 3).
+            sem_images: RGB semantic images with shape (N, H, W, 3) or (N, H, W, 4). Required if
+                :attr:`ReconstructionCfg.semantics` is True.
+            K_sem: Intrinsic matrix of the semantic camera with shape (3, 3) or (N, 3, 3).
+            sem_poses: Camera poses of the semantic images in the same format as ``poses``. Defaults to ``poses``.
+        """
+        # convert inputs to numpy
+        depth_images = self._to_numpy(depth_images).astype(np.float64)
+        if depth_images.ndim == 4:
+            depth_images = depth_images[..., 0]
+        poses = self._to_extrinsic_format(self._to_numpy(poses))
+        K_depth = self._to_numpy(K_depth)
+        if self._cfg.semantics:
+            assert sem_images is not None and K_sem is not None, "Semantic reconstruction requires semantic images."
+            sem_images = self._to_numpy(sem_images)[..., :3].astype(np.uint8)
+            sem_poses = self._to_extrinsic_format(self._to_numpy(sem_poses)) if sem_poses is not None else poses
+            K_sem = self._to_numpy(K_sem)
 
-            # update point cloud
-            if img_counter % self._cfg.point_cloud_batch_size == 0:
-                print(f"[INFO] Updating open3d point cloud with {self._cfg.point_cloud_batch_size} images ...")
+        # set invalid depth values to 0
+        depth_images[~np.isfinite(depth_images)] = 0
 
-                if first_batch:
-                    self._pcd.points = o3d.utility.Vector3dVector(np.vstack(points_all))
-                    if self._cfg.semantics:
-                        self._pcd.colors = o3d.utility.Vector3dVector(np.vstack(sem_map_all) / 255.0)
-                    first_batch = False
+        # start a new reconstruction for the first batch or if the previous one has been finished
+        if self._pcd is None or self._is_constructed:
+            self._reset_buffers()
 
-                else:
-                    self._pcd.points.extend(np.vstack(points_all))
-                    if self._cfg.semantics:
-                        self._pcd.colors.extend(np.vstack(sem_map_all) / 255.0)
+        for idx in range(depth_images.shape[0]):
+            curr_K_depth = K_depth[idx] if K_depth.ndim == 3 else K_depth
+            pixels = self._get_cached_pixel_tensor(curr_K_depth, depth_images.shape[1:3])
+            with PROFILER.span("project depth"):
+                points_final = self._project_depth(depth_images[idx], poses[idx], pixels)
+                PROFILER.count("points projected", points_final.shape[0])
 
-                # reset buffer lists
-                del points_all
-                points_all = []
-                if self._cfg.semantics:
-                    del sem_map_all
-                    sem_map_all = []
-
-                # apply downsampling
-                print(f"[INFO] downsampling point cloud with voxel size {self._cfg.voxel_size} ...")
-                self._pcd = self._pcd.voxel_down_sample(self._cfg.voxel_size)
-
-        # add last batch
-        if len(points_all) > 0:
-            print("[INFO[] updating open3d geometry point cloud with last images ...")
-            self._pcd.points.extend(np.vstack(points_all))
-            points_all = None
             if self._cfg.semantics:
-                self._pcd.colors.extend(np.vstack(sem_map_all) / 255.0)
-                sem_map_all = None
+                with PROFILER.span("semantic annotation"):
+                    sem_annotation, filter_idx = self._get_semantic_annotation(
+                        points_final, sem_images[idx], sem_poses[idx], K_sem[idx] if K_sem.ndim == 3 else K_sem
+                    )
+                self._add_to_buffer(points_final[filter_idx], sem_annotation)
+            else:
+                self._add_to_buffer(points_final)
 
-            # apply downsampling
-            print(f"[INFO] downsampling point cloud with voxel size {self._cfg.voxel_size} ...")
-            self._pcd = self._pcd.voxel_down_sample(self._cfg.voxel_size)
+    def finish_reconstruction(self):
+        """Add the remaining buffered points to the point cloud and mark the reconstruction as completed."""
+        if len(self._points_buffer) > 0:
+            print("[INFO] updating open3d geometry point cloud with last images ...")
+            self._update_pcd()
 
         # update flag
         self._is_constructed = True
         print("[INFO] construction completed.")
 
-        return
-
     def show_pcd(self):
         if not self._is_constructed:
             print("[WARNING] no reconstructed cloud")
@@ -170,14 +224,60 @@ class EnvironmentReconstruction:
         o3d.io.write_point_cloud(os.path.join(save_path, "cloud.ply"), self._pcd)
         print("saved point cloud to ply file.")
 
+    def save_pcd_chunked(self, save_path: str | None = None):
+        """Save the point cloud in spatially sorted chunks with a grid index.
+
+        The chunked cloud allows fast region queries and level-of-detail reads without loading the whole cloud,
+        see :class:`ChunkedPointCloud`. It is saved under ``cloud_chunks`` in the save path."""
+        if not self._is_constructed:
+            print("save points failed, no reconstructed cloud!")
+            return
+
+        save_path = save_path if save_path is not None else os.path.join(self._cfg.data_dir)
+        print("[INFO] save chunked point cloud to: " + os.path.join(save_path, "cloud_chunks"))
+
+        write_chunked_point_cloud(
+            os.path.join(save_path, "cloud_chunks"),
+            np.asarray(self._pcd.points),
+            np.asarray(self._pcd.colors) if self._pcd.has_colors() else None,
+            chunk_size=self._cfg.chunk_size,
+        )
+
     @property
     def pcd(self):
         return self._pcd
 
+    @property
+    def cfg(self) -> ReconstructionCfg:
+        return self._cfg
+
     ###
     # Helper functions
     ###
 
+    def _select_keyframes(self, img_shape: tuple[int, int]) -> np.ndarray:
+        """Select the keyframes that maximize the coverage within the image budget and save the coverage report."""
+        budget = self._end_idx
+        print(f"[INFO] selecting up to {budget} keyframes out of {len(self.extrinsics)} images ...")
+
+        frame_voxels = frustum_voxels(
+            self.extrinsics,
+            self.K_depth,
+            img_shape,
+            voxel_size=self._cfg.keyframe_voxel_size,
+            max_depth=self._cfg.keyframe_max_depth,
+        )
+        img_indices, report = select_keyframes(frame_voxels, budget=budget, min_gain=self._cfg.keyframe_min_gain)
+
+        print(
+            f"[INFO] selected {report['nbr_selected']} keyframes covering {report['coverage'] * 100:.2f} % of"
+            f" {report['nbr_voxels']} frustum voxels"
+        )
+        with open(os.path.join(self._cfg.data_dir, "keyframes.json"), "w") as f:
+            json.dump(report, f, indent=4)
+
+        return img_indices
+
     def _read_extrinsic(self):
         """Read the camera extrinsic parameters from file.
 
@@ -217,32 +317,76 @@ class EnvironmentReconstruction:
         img_array[~np.isfinite(img_array)] = 0
         return img_array
 
-    def _computePixelTensor(self):
-        depth_img = self._load_depth_image(0)
+    def _load_semantic_image(self, idx: int) -> np.ndarray:
+        """Load semantic image from file in RGB order."""
+        img_path = os.path.join(
+            self._cfg.data_dir, self._cfg.semantic_cam_name, "semantic_segmentation", str(idx).zfill(4) + ".png"
+        )
 
+        assert os.path.isfile(img_path), f"Semantic image {img_path} not found."
+        sem_image = cv2.imread(img_path, cv2.IMREAD_UNCHANGED)
+        # images saved as class ids are recolored with the palette of the camera, unknown ids are mapped to black
+        if sem_image.ndim == 2:
+            if not hasattr(self, "_sem_lut"):
+                palette_path = os.path.join(self._cfg.data_dir, self._cfg.semantic_cam_name, "palette.txt")
+                assert os.path.isfile(palette_path), f"Palette {palette_path} of the class id images not found."
+                self._sem_lut = build_lut(palette=load_palette(palette_path))
+            return self._sem_lut[sem_image]
+        return cv2.cvtColor(sem_image[..., :3], cv2.COLOR_BGR2RGB)  # loads in bgr order
+
+    @staticmethod
+    def _computePixelTensor(K: np.ndarray, img_shape: tuple[int, int]) -> np.ndarray:
         # get image plane mesh grid
-        pix_u = np.arange(0, depth_img.shape[1])
-        pix_v = np.arange(0, depth_img.shape[0])
+        pix_u = np.arange(0, img_shape[1])
+        pix_v = np.arange(0, img_shape[0])
         grid = np.meshgrid(pix_u, pix_v)
         pixels = np.vstack(list(map(np.ravel, grid))).T
         pixels = np.hstack([pixels, np.ones((len(pixels), 1))])  # add ones for 3D coordinates
 
         # transform to camera frame
-        k_inv = np.linalg.inv(self.K_depth)
+        k_inv = np.linalg.inv(K)
         pix_cam_frame = np.matmul(k_inv, pixels.T)
         # reorder to be in "robotics" axis order (x forward, y left, z up)
         return pix_cam_frame[[2, 0, 1], :].T * np.array([1, -1, -1])
 
-    def _get_semantic_image(self, points, idx):
-        # load semantic image and pose
-        img_path = os.path.join(
-            self._cfg.data_dir, self._cfg.semantic_cam_name, "semantic_segmentation", str(idx).zfill(4) + ".png"
-        )
-
-        assert os.path.isfile(img_path), f"Semantic image {img_path} not found."
-        sem_image = cv2.imread(img_path)  # loads in bgr order
-        sem_image = cv2.cvtColor(sem_image, cv2.COLOR_BGR2RGB)
-        pose_sem = self.extrinsics[idx]
+    def _get_cached_pixel_tensor(self, K: np.ndarray, img_shape: tuple[int, int]) -> np.ndarray:
+        """Get the pixel tensor, only recomputed if the intrinsics or the image shape change."""
+        key = (tuple(img_shape), K.tobytes())
+        if self._pixels_key != key:
+            self._pixels = self._computePixelTensor(K, img_shape)
+            self._pixels_key = key
+        return self._pixels
+
+    @staticmethod
+    def _project_depth(depth_img: np.ndarray, pose: np.ndarray, pixels: np.ndarray) -> np.ndarray:
+        """Project a depth image into the world frame.
+
+        Args:
+            depth_img: Depth image in meters with shape (H, W).
+            pose: Camera pose in the format x y z qx qy qz qw.
+            pixels: Pixel tensor of the camera, see :meth:`_computePixelTensor`.
+        """
+        rot = tf.Rotation.from_quat(pose[3:]).as_matrix()
+        points = depth_img.reshape(-1, 1) * (rot @ pixels.T).T
+        # filter points with 0 depth --> otherwise obstacles at camera position
+        non_zero_idx = np.where(points.any(axis=1))[0]
+        return points[non_zero_idx] + pose[:3]
+
+    @staticmethod
+    def _get_semantic_annotation(
+        points: np.ndarray, sem_image: np.ndarray, pose_sem: np.ndarray, K_sem: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Get the semantic annotation of the points by projecting them into the semantic image.
+
+        Args:
+            points: Points in the world frame with shape (N, 3).
+            sem_image: RGB semantic image with shape (H, W, 3).
+            pose_sem: Pose of the semantic camera in the format x y z qx qy qz qw.
+            K_sem: Intrinsic matrix of the semantic camera.
+
+        Returns:
+            The RGB annotation of the annotated points and the filter of points that have an annotation.
+        """
         # transform points to semantic camera frame
         points_sem_cam_frame = (tf.Rotation.from_quat(pose_sem[3:]).as_matrix().T @ (points - pose_sem[:3]).T).T
         # normalize points
@@ -250,7 +394,7 @@ class EnvironmentReconstruction:
         # reorder points be camera convention (z-forward)
         points_sem_cam_frame_norm = points_sem_cam_frame_norm[:, [1, 2, 0]] * np.array([-1, -1, 1])
         # transform points to pixel coordinates
-        pixels = (self.K_sem @ points_sem_cam_frame_norm.T).T
+        pixels = (K_sem @ points_sem_cam_frame_norm.T).T
         # filter points outside of image
         filter_idx = (
             (pixels[:, 0] >= 0)
@@ -269,3 +413,52 @@ class EnvironmentReconstruction:
         filter_idx[np.where(filter_idx)[0][non_classified_idx]] = False
 
         return sem_annotation, filter_idx
+
+    def _reset_buffers(self):
+        self._pcd = o3d.geometry.PointCloud()  # point size (n, 3)
+        self._points_buffer = []
+        self._sem_buffer = []
+        self._img_counter = 0
+        self._is_constructed = False
+
+    def _add_to_buffer(self, points: np.ndarray, sem_annotation: np.ndarray | None = None):
+        """Add the points of a single image to the buffer and update the point cloud once a batch is full."""
+        self._points_buffer.append(points)
+        if sem_annotation is not None:
+            self._sem_buffer.append(sem_annotation)
+        PROFILER.count("images integrated")
+        PROFILER.count("points added", points.shape[0])
+
+        # update point cloud
+        if self._img_counter % self._cfg.point_cloud_batch_size == 0:
+            print(f"[INFO] Updating open3d point cloud with {self._cfg.point_cloud_batch_size} images ...")
+            self._update_pcd()
+        self._img_counter += 1
+
+    def _update_pcd(self):
+        """Extend the point cloud with the buffered points and apply the voxel downsampling."""
+        with PROFILER.span("update point cloud"):
+            self._pcd.points.extend(np.vstack(self._points_buffer))
+            if len(self._sem_buffer) > 0:
+                self._pcd.colors.extend(np.vstack(self._sem_buffer) / 255.0)
+
+            # reset buffer lists
+            self._points_buffer = []
+            self._sem_buffer = []
+
+            # apply downsampling
+            print(f"[INFO] downsampling point cloud with voxel size {self._cfg.voxel_size} ...")
+            self._pcd = self._pcd.voxel_down_sample(self._cfg.voxel_size)
+
+    @staticmethod
+    def _to_numpy(data: np.ndarray | torch.Tensor) -> np.ndarray:
+        if isinstance(data, torch.Tensor):
+            return data.detach().cpu().numpy()
+        return np.asarray(data)
+
+    @staticmethod
+    def _to_extrinsic_format(poses: np.ndarray) -> np.ndarray:
+        """Convert poses from x y z qw qx qy qz to the x y z qx qy qz qw format used by scipy."""
+        poses = poses.astype(np.float64, copy=True).reshape(-1, 7)
+        poses[:, 3:] = poses[:, [4, 5, 6, 3]]
+        return poses
@@ -42,9 +42,35 @@ class ReconstructionCfg:
     """Whether to perform semantic reconstruction.
 
     Requires semantic images to be present in the data_dir. Default is True."""
+    online: bool = False
+    """Whether the images are directly passed to the reconstruction instead of being read from the data_dir.
+
+    In the online mode, batches of images are added over :meth:`EnvironmentReconstruction.add_batch` and the
+    reconstruction is completed with :meth:`EnvironmentReconstruction.finish_reconstruction`. The parameter
+    :attr:`max_images` is ignored. Default is False."""
+
+    # keyframe selection parameters
+    keyframe_selection: bool = False
+    """Whether to select a subset of keyframes before the reconstruction.
+
+    The keyframes are selected to maximize the coverage of the environment within the frame budget given by
+    :attr:`max_images`. The coverage is estimated from the view frustums of the cameras on a coarse voxel grid, i.e.
+    only the camera poses and intrinsics are used. A coverage report is saved as ``keyframes.json`` in the data_dir.
+    Default is False."""
+    keyframe_voxel_size: float = 0.5
+    """Voxel size of the coarse grid used to estimate the frustum overlap in meters. Default is 0.5."""
+    keyframe_max_depth: float = 10.0
+    """Maximum depth of the view frustums in meters. Default is 10.0 (same as the default camera range)."""
+    keyframe_min_gain: int = 1
+    """Minimum number of new voxels a frame has to cover to be selected. Default is 1."""
 
     # speed vs. memory trade-off parameters
     point_cloud_batch_size: int = 200
     """Batch size for point cloud generation.
 
     Defines how many images are added to the pouint-cloud at once. Higher values use more memory but are faster. Default is 200."""
+
+    # saving parameters
+    chunk_size: float = 10.0
+    """Edge length of the chunks in meters when saving the point cloud with
+    :meth:`EnvironmentReconstruction.save_pcd_chunked`. Default is 10.0."""
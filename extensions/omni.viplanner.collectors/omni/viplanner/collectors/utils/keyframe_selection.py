@@ -0,0 +1,112 @@
+# Copyright (c) 2024 ETH Zurich (Robotic Systems Lab)
+# Author: Pascal Roth, Ziqi Fan
+# All rights reserved.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+
+from __future__ import annotations
+
+import heapq
+
+import numpy as np
+import scipy.spatial.transform as tf
+
+
+def frustum_voxels(
+    extrinsics: np.ndarray,
+    K: np.ndarray,
+    img_shape: tuple[int, int],
+    voxel_size: float,
+    max_depth: float,
+    rays_per_axis: int = 24,
+) -> list[np.ndarray]:
+    """Get the coarse voxels covered by the view frustum of every camera.
+
+    The frustum is approximated by a sparse grid of pixel rays that are sampled every half voxel up to the maximum
+    depth. Occlusions are not considered as only the camera poses and intrinsics are known.
+
+    Args:
+        extrinsics: Camera poses with shape (N, 7) in the format x y z qx qy qz qw.
+        K: Intrinsic matrix of the camera with shape (3, 3).
+        img_shape: Height and width of the image plane.
+        voxel_size: Size of the coarse voxels in meters.
+        max_depth: Maximum depth of the frustum in meters.
+        rays_per_axis: Number of rays along the longer image axis. Defaults to 24.
+
+    Returns:
+        The int64 keys of the voxels covered by every camera.
+    """
+    # sparse pixel grid on the image plane
+    height, width = img_shape
+    nbr_u = max(int(rays_per_axis * width / max(height, width)), 2)
+    nbr_v = max(int(rays_per_axis * height / max(height, width)), 2)
+    grid = np.meshgrid(np.linspace(0, width - 1, nbr_u), np.linspace(0, height - 1, nbr_v))
+    pixels = np.vstack([grid[0].ravel(), grid[1].ravel(), np.ones(grid[0].size)])
+    # transform to camera frame and reorder to be in "robotics" axis order (x forward, y left, z up)
+    rays = (np.linalg.inv(K) @ pixels)[[2, 0, 1], :].T * np.array([1, -1, -1])
+
+    # points along the rays in the camera frame (depth is the distance to the image plane)
+    depths = np.arange(voxel_size / 2, max_depth, voxel_size / 2)
+    points_cam = (depths[:, None, None] * rays[None, :, :]).reshape(-1, 3)
+
+    voxels = []
+    for pose in extrinsics:
+        rot = tf.Rotation.from_quat(pose[3:]).as_matrix()
+        points = points_cam @ rot.T + pose[:3]
+        voxel_idx = np.floor(points / voxel_size).astype(np.int64)
+        # pack the voxel index into a single key (21 bits per axis)
+        voxel_idx += 1 << 20
+        keys = (voxel_idx[:, 0] << 42) | (voxel_idx[:, 1] << 21) | voxel_idx[:, 2]
+        voxels.append(np.unique(keys))
+    return voxels
+
+
+def select_keyframes(frame_voxels: list[np.ndarray], budget: int, min_gain: int = 1) -> tuple[np.ndarray, dict]:
+    """Select the subset of frames that maximizes the voxel coverage within a frame budget.
+
+    The selection uses a lazy greedy approach, i.e. the frame with the most not yet covered voxels is selected until
+    the budget is reached or no frame adds at least ``min_gain`` new voxels.
+
+    Args:
+        frame_voxels: Voxel keys covered by every frame, see :func:`frustum_voxels`.
+        budget: Maximum number of selected frames.
+        min_gain: Minimum number of new voxels a frame has to cover to be selected. Defaults to 1.
+
+    Returns:
+        The sorted indices of the selected frames and a coverage report.
+    """
+    # map voxel keys to continuous ids
+    counts = np.array([len(voxels) for voxels in frame_voxels])
+    _, voxel_ids = np.unique(np.concatenate(frame_voxels), return_inverse=True)
+    voxel_ids = np.split(voxel_ids, np.cumsum(counts)[:-1])
+    nbr_voxels = int(max((ids.max() for ids in voxel_ids if len(ids)), default=-1)) + 1
+
+    covered = np.zeros(nbr_voxels, dtype=bool)
+    # max heap of the (outdated) gain of every frame
+    heap = [(-int(count), idx) for idx, count in enumerate(counts)]
+    heapq.heapify(heap)
+
+    selected = []
+    coverage = []
+    while heap and len(selected) < budget:
+        _, idx = heapq.heappop(heap)
+        gain = int(np.count_nonzero(~covered[voxel_ids[idx]]))
+        # gains only decrease, if the updated gain is still the largest the frame is the best choice
+        if heap and gain < -heap[0][0]:
+            heapq.heappush(heap, (-gain, idx))
+            continue
+        if gain < min_gain:
+            break
+        covered[voxel_ids[idx]] = True
+        selected.append(idx)
+        coverage.append(int(covered.sum()))
+
+    report = {
+        "nbr_frames": len(frame_voxels),
+        "nbr_selected": len(selected),
+        "nbr_voxels": nbr_voxels,
+        "coverage": coverage[-1] / nbr_voxels if len(coverage) > 0 else 0.0,
+        "selection_order": [int(idx) for idx in selected],
+        "cumulative_covered_voxels": coverage,
+    }
+    return np.sort(np.array(selected, dtype=np.int64)), report
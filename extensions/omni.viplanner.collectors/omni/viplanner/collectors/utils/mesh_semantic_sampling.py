@@ -0,0 +1,204 @@
+# Copyright (c) 2024 ETH Zurich (Robotic Systems Lab)
+# Author: Pascal Roth, Ziqi Fan
+# All rights reserved.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+
+from __future__ import annotations
+
+import os
+
+import numpy as np
+import open3d as o3d
+import pandas as pd
+import torch
+import trimesh
+import yaml
+from omni.isaac.lab.utils.warp import convert_to_warp_mesh, raycast_mesh
+from omni.viplanner.collectors.configs.viplanner_sem_meta import VIPlannerSemMetaHandler
+from omni.viplanner.importer.sensors import DATA_DIR
+
+from .mesh_semantic_sampling_cfg import MeshSemanticSamplingCfg
+
+
+class MeshSemanticSampling:
+    """
+    Generate a semantic point cloud directly from the surface of a Matterport ply mesh.
+
+    Instead of rendering and back-projecting images, points are sampled on the mesh surface with a probability
+    proportional to the face area, labeled with the category of their face and downsampled to the voxel size.
+    Optionally, only faces that are visible from a set of viewpoints are considered.
+
+    The resulting point cloud is saved in the same layout as :meth:`EnvironmentReconstruction.save_pcd`, i.e. as
+    ``cloud.ply`` with the semantic color of every point.
+    """
+
+    def __init__(self, cfg: MeshSemanticSamplingCfg):
+        # get config
+        self._cfg: MeshSemanticSamplingCfg = cfg
+        # load mesh and semantic information
+        self._load_mesh()
+        self._load_color_mapping()
+        # control flag if point-cloud has been generated
+        self._is_constructed = False
+
+        # variables
+        self._pcd: o3d.geometry.PointCloud = None
+
+    ###
+    # Operations
+    ###
+
+    def sample(self, viewpoints: np.ndarray | torch.Tensor | None = None):
+        """Sample the semantic point cloud from the mesh surface.
+
+        Args:
+            viewpoints: Viewpoints used for the visibility filter with shape (N, 3) or (N, 7). Only the positions are
+                used. If None and the visibility filter is enabled, the viewpoints are read from
+                :attr:`MeshSemanticSamplingCfg.viewpoint_file`. Defaults to None.
+        """
+        # get faces that should be sampled
+        if self._cfg.visibility_filter:
+            if viewpoints is None:
+                assert self._cfg.viewpoint_file is not None, "Visibility filter requires viewpoints."
+                viewpoints = np.loadtxt(self._cfg.viewpoint_file, delimiter=",")
+            elif isinstance(viewpoints, torch.Tensor):
+                viewpoints = viewpoints.cpu().numpy()
+            face_mask = self._get_visible_faces(np.asarray(viewpoints)[:, :3])
+            print(f"[INFO] {face_mask.sum()} of {face_mask.shape[0]} faces visible from {len(viewpoints)} viewpoints")
+        else:
+            face_mask = np.ones(self._faces.shape[0], dtype=bool)
+
+        # area weighted sampling of the faces
+        face_idx = np.where(face_mask)[0]
+        area = self._face_area[face_idx]
+        nbr_points = int(np.ceil(area.sum() / self._cfg.voxel_size**2 * self._cfg.points_per_voxel))
+        print(f"[INFO] Sampling {nbr_points} points on a surface of {area.sum():.2f} m^2 ...")
+
+        rng = np.random.default_rng(self._cfg.seed)
+        cdf = np.cumsum(area)
+        sampled_faces = np.searchsorted(cdf, rng.random(nbr_points) * cdf[-1], side="right")
+        sampled_faces = face_idx[sampled_faces.clip(max=len(cdf) - 1)]
+
+        # uniform sampling within the triangles
+        r1 = np.sqrt(rng.random((nbr_points, 1)))
+        r2 = rng.random((nbr_points, 1))
+        triangles = self._vertices[self._faces[sampled_faces]]
+        points = (1 - r1) * triangles[:, 0] + r1 * (1 - r2) * triangles[:, 1] + r1 * r2 * triangles[:, 2]
+
+        # downsample to one point per voxel and keep the class of the point (no averaging of the colors)
+        voxel_idx = np.floor((points - points.min(axis=0)) / self._cfg.voxel_size).astype(np.int64)
+        _, keep_idx = np.unique(voxel_idx, axis=0, return_index=True)
+        points = points[keep_idx]
+        colors = self._face_color[sampled_faces[keep_idx]]
+
+        # construct point cloud
+        self._pcd = o3d.geometry.PointCloud()
+        self._pcd.points = o3d.utility.Vector3dVector(points)
+        self._pcd.colors = o3d.utility.Vector3dVector(colors / 255.0)
+
+        # update flag
+        self._is_constructed = True
+        print(f"[INFO] construction completed with {points.shape[0]} points.")
+
+    def show_pcd(self):
+        if not self._is_constructed:
+            print("[WARNING] no sampled cloud")
+            return
+        origin = o3d.geometry.TriangleMesh.create_coordinate_frame(
+            size=1.0, origin=np.min(np.asarray(self._pcd.points), axis=0)
+        )
+        o3d.visualization.draw_geometries([self._pcd, origin], mesh_show_wireframe=True)  # visualize point cloud
+        return
+
+    def save_pcd(self, save_path: str | None = None):
+        if not self._is_constructed:
+            print("save points failed, no sampled cloud!")
+            return
+
+        if save_path is None:
+            save_path = self._cfg.data_dir if self._cfg.data_dir is not None else os.path.dirname(self._cfg.ply_path)
+        print("[INFO] save output files to: " + save_path)
+
+        # save clouds
+        o3d.io.write_point_cloud(os.path.join(save_path, "cloud.ply"), self._pcd)
+        print("saved point cloud to ply file.")
+
+    @property
+    def pcd(self):
+        return self._pcd
+
+    ###
+    # Helper functions
+    ###
+
+    def _load_mesh(self):
+        """Load the ply mesh and the mpcat40 class of every face."""
+        # load ply without trimesh processing to keep the face order of the category information
+        mesh = trimesh.load(self._cfg.ply_path, process=False)
+        self._vertices = np.asarray(mesh.vertices, dtype=np.float64)
+        self._faces = np.asarray(mesh.faces, dtype=np.int64)
+        self._face_area = np.asarray(mesh.area_faces, dtype=np.float64)
+
+        # get face categories (4th face property, same as in the MatterportRayCaster)
+        faces_raw = mesh.metadata["_ply_raw"]["face"]["data"]
+        face_category = np.asarray(faces_raw[faces_raw.dtype.names[3]]).astype(np.int64).reshape(-1)
+
+        # map category index to reduced mpcat40 set
+        # More Information: https://github.com/niessner/Matterport/blob/master/data_organization.md#house_segmentations
+        mapping = pd.read_csv(DATA_DIR + "/matterport/category_mapping.tsv", sep="\t")
+        mapping_mpcat40 = mapping["mpcat40index"].to_numpy()
+        self._face_class = mapping_mpcat40[face_category - 1]
+
+    def _load_color_mapping(self):
+        """Get the color of every face in the selected color space."""
+        mapping_40 = pd.read_csv(DATA_DIR + "/matterport/mpcat40.tsv", sep="\t")
+        if self._cfg.color_space == "viplanner":
+            with open(DATA_DIR + "/matterport/mpcat40_to_vip_sem.yml") as file:
+                map_mpcat40_to_vip_sem = yaml.safe_load(file)
+            color = np.array(
+                VIPlannerSemMetaHandler().get_colors_for_names(list(map_mpcat40_to_vip_sem.values())), dtype=np.uint8
+            )
+        elif self._cfg.color_space == "mpcat40":
+            color = mapping_40["hex"].to_numpy()
+            color = np.array(
+                [(int(color[i][1:3], 16), int(color[i][3:5], 16), int(color[i][5:7], 16)) for i in range(len(color))],
+                dtype=np.uint8,
+            )
+        else:
+            raise ValueError(f"Unknown color space: {self._cfg.color_space}")
+
+        self._face_color = color[self._face_class].astype(np.float64)
+
+    def _get_visible_faces(self, viewpoints: np.ndarray) -> np.ndarray:
+        """Identify all faces that are hit by rays cast uniformly in all directions from the viewpoints."""
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+        wp_mesh = convert_to_warp_mesh(self._vertices.astype(np.float32), self._faces.astype(np.int32), device=device)
+
+        # uniform directions on the unit sphere (fibonacci lattice)
+        n = self._cfg.rays_per_viewpoint
+        idx = torch.arange(n, dtype=torch.float32, device=device) + 0.5
+        phi = torch.arccos(1 - 2 * idx / n)
+        theta = torch.pi * (1 + 5**0.5) * idx
+        directions = torch.stack(
+            (torch.cos(theta) * torch.sin(phi), torch.sin(theta) * torch.sin(phi), torch.cos(phi)), dim=1
+        )
+
+        face_mask = torch.zeros(self._faces.shape[0], dtype=torch.bool, device=device)
+        viewpoints = torch.tensor(viewpoints, dtype=torch.float32, device=device)
+        for start_idx in range(0, viewpoints.shape[0], self._cfg.viewpoint_batch_size):
+            curr_viewpoints = viewpoints[start_idx : start_idx + self._cfg.viewpoint_batch_size]
+            ray_starts = curr_viewpoints[:, None, :].expand(-1, n, -1).reshape(1, -1, 3)
+            ray_directions = directions.repeat(curr_viewpoints.shape[0], 1).unsqueeze(0)
+            ray_face_ids = raycast_mesh(
+                ray_starts=ray_starts.contiguous(),
+                ray_directions=ray_directions.contiguous(),
+                mesh=wp_mesh,
+                max_dist=self._cfg.max_distance,
+                return_face_id=True,
+            )[3].flatten()
+            # rays without hit have a face id of -1
+            ray_face_ids = ray_face_ids[ray_face_ids >= 0].type(torch.long)
+            face_mask[ray_face_ids] = True
+
+        return face_mask.cpu().numpy()
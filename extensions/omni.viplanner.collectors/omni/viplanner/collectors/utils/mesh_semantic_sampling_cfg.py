@@ -0,0 +1,53 @@
+# Copyright (c) 2024 ETH Zurich (Robotic Systems Lab)
+# Author: Pascal Roth, Ziqi Fan
+# All rights reserved.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+
+from dataclasses import MISSING
+from typing import Literal
+
+from omni.isaac.lab.utils import configclass
+
+
+@configclass
+class MeshSemanticSamplingCfg:
+    """
+    Arguments for the direct generation of a semantic point cloud from the Matterport ply mesh
+    """
+
+    # input data parameters
+    ply_path: str = MISSING
+    """Path to the Matterport ply file that includes the per-face category ids."""
+    data_dir: str | None = None
+    """Directory where the point cloud is saved to. If None, the directory of the ply file is used. Default is None."""
+    color_space: Literal["viplanner", "mpcat40"] = "viplanner"
+    """Color space of the semantic classes.
+
+    For ``viplanner``, the mpcat40 classes are mapped to the VIPlanner classes (same as the
+    :class:`VIPlannerMatterportRayCasterCamera`), for ``mpcat40`` the colors of the reduced matterport class set are used
+    (same as the :class:`MatterportRayCasterCamera`). Default is ``viplanner``."""
+
+    # sampling parameters
+    voxel_size: float = 0.05
+    """Voxel size of the point cloud in meters. Default is 0.05 (same as recommended for the reconstruction)."""
+    points_per_voxel: float = 4.0
+    """Number of points sampled per voxel face area (voxel_size^2) before the voxel downsampling.
+
+    Higher values ensure that every voxel that intersects the surface is occupied. Default is 4.0."""
+    seed: int = 0
+    """Seed of the random surface sampling. Default is 0."""
+
+    # visibility parameters
+    visibility_filter: bool = False
+    """Only sample faces that are visible from the given viewpoints. Default is False."""
+    viewpoint_file: str | None = None
+    """File with the viewpoints used for the visibility filter (format: x y z qw qx qy qz, as ``camera_poses.txt``).
+
+    Only used if no viewpoints are passed directly to :meth:`MeshSemanticSampling.sample`. Default is None."""
+    rays_per_viewpoint: int = 20000
+    """Number of rays cast uniformly on the unit sphere from every viewpoint. Default is 20000."""
+    max_distance: float = 10.0
+    """Maximum distance of the visibility rays in meters (same as the default camera range). Default is 10.0."""
+    viewpoint_batch_size: int = 50
+    """Number of viewpoints that are ray-casted at once. Default is 50."""
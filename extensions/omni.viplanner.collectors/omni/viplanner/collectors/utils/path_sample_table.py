@@ -0,0 +1,180 @@
+# Copyright (c) 2024 ETH Zurich (Robotic Systems Lab)
+# Author: Pascal Roth, Ziqi Fan
+# All rights reserved.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+
+"""Columnar storage of the shortest path samples (start point, goal point, path length) of the terrain analysis.
+
+The samples are written in chunks while the shortest paths are searched. They are either kept in memory or stored in
+a directory with the following structure:
+
+- save_dir
+    - index.npz     (first sample and number of samples of every start point, dtype of the lengths)
+    - start.bin     (int32 index of the start point)
+    - goal.bin      (int32 index of the goal point)
+    - length.bin    (float32 or float16 path length)
+
+The samples of a start point are stored contiguously, i.e. the samples of a point are a slice of the columns given by
+the index. The binary files are accessed as copy-on-write memory maps, i.e. only the accessed rows are read from the
+drive and modifications are never written back.
+"""
+
+from __future__ import annotations
+
+import os
+
+import numpy as np
+import torch
+
+INDEX_FILE = "index.npz"
+START_FILE = "start.bin"
+GOAL_FILE = "goal.bin"
+LENGTH_FILE = "length.bin"
+
+
+class PathSampleTable:
+    """Shortest path samples stored column-wise with an index of the samples of every start point.
+
+    The columns :attr:`start`, :attr:`goal` and :attr:`length` are torch tensors that share the memory of the numpy
+    arrays (or memory maps) they are created from.
+    """
+
+    def __init__(self, start: np.ndarray, goal: np.ndarray, length: np.ndarray, begin: np.ndarray, count: np.ndarray):
+        self.start = torch.from_numpy(start)
+        """Index of the start point (int32)."""
+        self.goal = torch.from_numpy(goal)
+        """Index of the goal point (int32)."""
+        self.length = torch.from_numpy(length)
+        """Length of the shortest path (float32 or float16)."""
+        self.begin = torch.from_numpy(begin)
+        """First sample of every start point (int64)."""
+        self.count = torch.from_numpy(count)
+        """Number of samples of every start point (int64)."""
+
+    def __len__(self) -> int:
+        return self.start.shape[0]
+
+    @property
+    def num_points(self) -> int:
+        return self.begin.shape[0]
+
+    def rows_of_point(self, point_idx: int) -> slice:
+        """Rows of the samples of the start point."""
+        begin = int(self.begin[point_idx])
+        return slice(begin, begin + int(self.count[point_idx]))
+
+    def rows_of_points(self, point_idx: torch.Tensor) -> torch.Tensor:
+        """Rows of the samples of the start points, grouped by point in the given order."""
+        counts = self.count[point_idx]
+        # offset of every row within the rows of its point
+        group_begin = torch.cumsum(counts, dim=0) - counts
+        offsets = torch.arange(int(counts.sum())) - torch.repeat_interleave(group_begin, counts)
+        return torch.repeat_interleave(self.begin[point_idx], counts) + offsets
+
+    @classmethod
+    def load(cls, save_dir: str) -> PathSampleTable:
+        """Open the table saved in the directory as memory maps."""
+        index = np.load(os.path.join(save_dir, INDEX_FILE))
+        num_samples = int(index["count"].sum())
+
+        def _memmap(file: str, dtype: np.dtype) -> np.ndarray:
+            if num_samples == 0:
+                return np.zeros(0, dtype=dtype)
+            return np.memmap(os.path.join(save_dir, file), dtype=dtype, mode="c", shape=(num_samples,))
+
+        return cls(
+            _memmap(START_FILE, np.int32),
+            _memmap(GOAL_FILE, np.int32),
+            _memmap(LENGTH_FILE, np.dtype(str(index["length_dtype"]))),
+            index["begin"],
+            index["count"],
+        )
+
+
+class PathSampleTableWriter:
+    """Writer of a :class:`PathSampleTable`, the samples are added per start point and flushed in chunks.
+
+    Args:
+        num_points: Number of points of the graph.
+        save_dir: Directory the table is saved to. Defaults to None, i.e. the table is kept in memory.
+        length_dtype: Data type of the path lengths, either "float32" or "float16". Defaults to "float32".
+        chunk_size: Number of samples that are buffered before they are flushed. Defaults to 2**20.
+    """
+
+    def __init__(
+        self, num_points: int, save_dir: str | None = None, length_dtype: str = "float32", chunk_size: int = 1 << 20
+    ):
+        assert length_dtype in ("float32", "float16"), f"Unsupported path length dtype '{length_dtype}'"
+        self.save_dir = save_dir
+        self.length_dtype = np.dtype(length_dtype)
+        self.chunk_size = chunk_size
+
+        self._begin = np.zeros(num_points, dtype=np.int64)
+        self._count = np.zeros(num_points, dtype=np.int64)
+        self._num_samples = 0
+
+        # buffered samples of the current chunk and the flushed chunks (in memory) or files (on the drive)
+        self._buffer: list[tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+        self._buffered = 0
+        self._chunks: list[tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+        if save_dir is not None:
+            os.makedirs(save_dir, exist_ok=True)
+            # truncate the column files of a previous run, the chunks are appended
+            for file in (START_FILE, GOAL_FILE, LENGTH_FILE):
+                with open(os.path.join(save_dir, file), "wb"):
+                    pass
+
+    def __len__(self) -> int:
+        return self._num_samples
+
+    def append(self, start_idx: int, goal_idx: np.ndarray, length: np.ndarray):
+        """Add all samples of a start point, every start point can only be added once."""
+        assert self._count[start_idx] == 0, f"Samples of point {start_idx} have already been added."
+        goal_idx = np.asarray(goal_idx, dtype=np.int32)
+        self._begin[start_idx] = self._num_samples
+        self._count[start_idx] = goal_idx.shape[0]
+        self._num_samples += goal_idx.shape[0]
+
+        self._buffer.append(
+            (np.full(goal_idx.shape[0], start_idx, dtype=np.int32), goal_idx, np.asarray(length, self.length_dtype))
+        )
+        self._buffered += goal_idx.shape[0]
+        if self._buffered >= self.chunk_size:
+            self._flush()
+
+    def close(self) -> PathSampleTable:
+        """Flush the remaining samples and return the table."""
+        self._flush()
+        if self.save_dir is None:
+            dtypes = (np.int32, np.int32, self.length_dtype)
+            columns = [
+                np.concatenate([chunk[i] for chunk in self._chunks]) if self._chunks else np.zeros(0, dtype=dtype)
+                for i, dtype in enumerate(dtypes)
+            ]
+            self._chunks = []
+            return PathSampleTable(*columns, self._begin, self._count)
+
+        np.savez(
+            os.path.join(self.save_dir, INDEX_FILE),
+            begin=self._begin,
+            count=self._count,
+            length_dtype=str(self.length_dtype),
+        )
+        return PathSampleTable.load(self.save_dir)
+
+    ###
+    # Helper functions
+    ###
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        chunk = tuple(np.concatenate(column) for column in zip(*self._buffer))
+        self._buffer, self._buffered = [], 0
+        if self.save_dir is None:
+            self._chunks.append(chunk)
+        else:
+            for file, column in zip((START_FILE, GOAL_FILE, LENGTH_FILE), chunk):
+                with open(os.path.join(self.save_dir, file), "ab") as f:
+                    column.tofile(f)
@@ -0,0 +1,274 @@
+# Copyright (c) 2024 ETH Zurich (Robotic Systems Lab)
+# Author: Pascal Roth, Ziqi Fan
+# All rights reserved.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+
+"""Lightweight profiling of the collection pipeline.
+
+The profiler records nested timed spans and counters (e.g. rays cast, points rejected per filter, images written). It
+is disabled by default and then only costs a flag check per call. Enable it with the environment variable
+``VIPLANNER_PROFILING=1`` or with ``PROFILER.enable()``. With ``track_memory``, the peak increase of the resident
+memory (and of the allocated CUDA memory) is recorded per span, this requires linux to reset the peak RSS. As the peak
+statistics of the process (incl. ``torch.cuda.max_memory_allocated``) are reset at every span, the reported peak memory
+of the run is then taken from the tracked spans.
+
+Usage:
+
+.. code-block:: python
+
+    with PROFILER.run("viewpoint_rendering", save_dir):
+        with PROFILER.span("render"):
+            ...
+            PROFILER.count("images written")
+
+At the end of the outermost :meth:`Profiler.run`, a summary table is printed and the recorded events are exported as
+Chrome trace (``profile_<name>.json``, open with ``chrome://tracing`` or https://ui.perfetto.dev).
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Iterator
+
+
+class Profiler:
+    """Recorder of nested timed spans and counters."""
+
+    def __init__(self, enabled: bool = False, track_memory: bool = False):
+        self.enabled = enabled
+        self.track_memory = track_memory
+        self._run_depth = 0
+        self.reset()
+
+    def enable(self, track_memory: bool | None = None):
+        self.enabled = True
+        if track_memory is not None:
+            self.track_memory = track_memory
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        """Clear all recorded spans and counters."""
+        self._start = time.perf_counter()
+        self._stack: list[str] = []
+        self._memory_stack: list[list[float]] = []  # memory at the start and running peak of the open spans
+        self._run_peak_memory = 0.0  # peak memory of all tracked spans
+        self._events: list[dict] = []
+        # calls, total, max, peak memory increase
+        self._span_stats: dict[str, list[float]] = defaultdict(lambda: [0, 0.0, 0.0, 0.0])
+        self._counters: dict[str, float] = defaultdict(float)
+        self._span_counters: dict[tuple[str, str], float] = defaultdict(float)
+
+    ###
+    # Recording
+    ###
+
+    @contextlib.contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as a span nested into the currently open spans."""
+        if not self.enabled:
+            yield
+            return
+        self._stack.append(name)
+        if self.track_memory:
+            self._push_memory()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            self._stack.pop()
+            stats = self._span_stats[name]
+            stats[0] += 1
+            stats[1] += duration
+            stats[2] = max(stats[2], duration)
+            if self.track_memory:
+                stats[3] = max(stats[3], self._pop_memory())
+            self._events.append({
+                "name": name,
+                "ph": "X",
+                "ts": (start - self._start) * 1e6,
+                "dur": duration * 1e6,
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+            })
+
+    def count(self, name: str, value: float = 1):
+        """Increase a counter, the value is also attributed to the innermost open span to derive rates."""
+        if not self.enabled:
+            return
+        self._counters[name] += value
+        if self._stack:
+            self._span_counters[(self._stack[-1], name)] += value
+        self._events.append({
+            "name": name,
+            "ph": "C",
+            "ts": (time.perf_counter() - self._start) * 1e6,
+            "pid": os.getpid(),
+            "args": {name: self._counters[name]},
+        })
+
+    @contextlib.contextmanager
+    def run(self, name: str, save_dir: str | None = None) -> Iterator[None]:
+        """Span of a complete run, the outermost run reports the summary and exports the trace at its end."""
+        if not self.enabled:
+            yield
+            return
+        if self._run_depth == 0:
+            self.reset()
+        self._run_depth += 1
+        try:
+            with self.span(name):
+                yield
+        finally:
+            self._run_depth -= 1
+            if self._run_depth == 0:
+                print(self.summary())
+                if save_dir is not None:
+                    self.export_chrome_trace(os.path.join(save_dir, f"profile_{name}.json"))
+
+    ###
+    # Memory tracking
+    ###
+
+    def _push_memory(self):
+        if not os.path.exists("/proc/self/clear_refs"):
+            print("[WARNING] Memory tracking requires linux, it is disabled.")
+            self.track_memory = False
+            return
+        # attribute the peak since the last reset to the parent span before resetting it for the new span
+        if self._memory_stack:
+            self._memory_stack[-1][1] = max(self._memory_stack[-1][1], self._read_memory()[1])
+        if not self._reset_peak_memory():
+            print("[WARNING] Resetting the peak memory is not permitted, memory tracking is disabled.")
+            self.track_memory = False
+            self._memory_stack.clear()
+            return
+        current = self._read_memory()[0]
+        self._memory_stack.append([current, current])
+
+    def _pop_memory(self) -> float:
+        """Close the memory tracking of the innermost span and return its peak memory increase in MB."""
+        if not self._memory_stack:
+            return 0.0
+        start, running_peak = self._memory_stack.pop()
+        peak = max(running_peak, self._read_memory()[1])
+        if self._memory_stack:
+            self._memory_stack[-1][1] = max(self._memory_stack[-1][1], peak)
+        self._run_peak_memory = max(self._run_peak_memory, peak)
+        return peak - start
+
+    @staticmethod
+    def _read_memory() -> tuple[float, float]:
+        """Current and peak (since the last reset) memory in MB, host RSS plus allocated CUDA memory."""
+        current, peak = 0.0, 0.0
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    current += int(line.split()[1]) / 1024
+                elif line.startswith("VmHWM:"):
+                    peak += int(line.split()[1]) / 1024
+        torch = sys.modules.get("torch")
+        if torch is not None and torch.cuda.is_initialized():
+            current += torch.cuda.memory_allocated() / 1024**2
+            peak += torch.cuda.max_memory_allocated() / 1024**2
+        return current, peak
+
+    @staticmethod
+    def _reset_peak_memory() -> bool:
+        try:
+            # writing 5 resets the peak resident set size (VmHWM), see proc(5)
+            with open("/proc/self/clear_refs", "w") as f:
+                f.write("5")
+        except OSError:
+            return False
+        torch = sys.modules.get("torch")
+        if torch is not None and torch.cuda.is_initialized():
+            torch.cuda.reset_peak_memory_stats()
+        return True
+
+    ###
+    # Reporting
+    ###
+
+    def results(self) -> dict:
+        """Recorded spans, counters and the peak memory in a machine-readable format."""
+        return {
+            "spans": {
+                name: {
+                    "calls": calls,
+                    "total_s": total,
+                    "mean_ms": total / calls * 1e3,
+                    "max_ms": max_duration * 1e3,
+                    **({"peak_memory_mb": peak_memory} if self.track_memory else {}),
+                }
+                for name, (calls, total, max_duration, peak_memory) in self._span_stats.items()
+            },
+            "counters": dict(self._counters),
+            "peak_memory_mb": self._peak_memory(),
+        }
+
+    def summary(self) -> str:
+        """Summary table of all spans (with the rates of their counters), counters and the peak memory."""
+        memory_header = f"{'peak [MB]':>12}" if self.track_memory else ""
+        lines = [f"{'span':<40}{'calls':>8}{'total [s]':>12}{'mean [ms]':>12}{'max [ms]':>12}{memory_header}"]
+        for name, (calls, total, max_duration, peak_memory) in sorted(
+            self._span_stats.items(), key=lambda item: -item[1][1]
+        ):
+            memory = f"{peak_memory:>12.1f}" if self.track_memory else ""
+            lines.append(
+                f"{name:<40}{calls:>8}{total:>12.3f}{total / calls * 1e3:>12.3f}{max_duration * 1e3:>12.3f}{memory}"
+            )
+            for (span_name, counter), value in self._span_counters.items():
+                if span_name == name and total > 0:
+                    lines.append(f"  {counter:<38}{value:>20.0f}{value / total:>16.1f}/s")
+        lines.append(f"{'counter':<40}{'total':>20}")
+        for name, value in sorted(self._counters.items()):
+            lines.append(f"{name:<40}{value:>20.0f}")
+        for name, value in self._peak_memory().items():
+            lines.append(f"{name:<40}{value:>17.1f} MB")
+        return "[INFO] Profiling summary\n" + "\n".join(lines)
+
+    def export_chrome_trace(self, file_path: str):
+        """Export the recorded spans and counters in the Chrome trace event format."""
+        os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+        with open(file_path, "w") as f:
+            json.dump({"traceEvents": self._events, "displayTimeUnit": "ms"}, f)
+        print(f"[INFO] Saved profiling trace to {file_path}")
+
+    def _peak_memory(self) -> dict[str, float]:
+        # the peak statistics of the process only cover the time since the last span started when tracking memory
+        if self.track_memory and self._run_peak_memory > 0:
+            return {"peak memory (host + cuda)": self._run_peak_memory}
+        memory = {}
+        try:
+            # only available on unix
+            import resource
+
+            # ru_maxrss is given in KB on linux
+            memory["peak memory (host)"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        except ImportError:
+            pass
+        try:
+            import torch
+
+            if torch.cuda.is_available():
+                memory["peak memory (cuda)"] = torch.cuda.max_memory_allocated() / 1024**2
+        except ImportError:
+            pass
+        return memory
+
+
+PROFILER = Profiler(
+    enabled=os.environ.get("VIPLANNER_PROFILING", "0") == "1",
+    track_memory=os.environ.get("VIPLANNER_PROFILING_MEMORY", "0") == "1",
+)
+"""Profiler shared across the collection pipeline."""
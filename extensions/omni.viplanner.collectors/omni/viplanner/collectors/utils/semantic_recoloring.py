@@ -0,0 +1,142 @@
+# Copyright (c) 2024 ETH Zurich (Robotic Systems Lab)
+# Author: Pascal Roth, Ziqi Fan
+# All rights reserved.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+
+"""Offline recoloring and remapping of rendered semantic images through lookup tables.
+
+Semantic images are either saved as RGB images or as single-channel uint8 class id images together with a
+``palette.txt`` (color of every class id) in the camera directory. A lookup table (LUT) maps every class id either to
+a new class id (shape (256,)) or to a color (shape (256, 3)). RGB images are first decoded to class ids with the
+palette they were rendered with. This allows to change the colors or the class mapping of a dataset without
+re-rendering it. Colors outside the palette are decoded to :attr:`VIPlannerSemMetaHandler.UNKNOWN_ID`, which has no
+color and is mapped to black by the LUT.
+"""
+
+from __future__ import annotations
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from ..configs.viplanner_sem_meta import VIPlannerSemMetaHandler
+
+
+def load_palette(file_path: str) -> np.ndarray:
+    """Load a palette (color of every class id) saved next to the rendered images."""
+    return np.loadtxt(file_path, delimiter=",", dtype=np.uint8, ndmin=2)
+
+
+def save_palette(camera_dir: str, palette: np.ndarray | None):
+    """Save the palette of the class id images of the camera directory.
+
+    If None, the images are saved as colors and an existing palette is removed."""
+    file_path = os.path.join(camera_dir, "palette.txt")
+    if palette is not None:
+        np.savetxt(file_path, palette, delimiter=",", fmt="%d")
+    elif os.path.isfile(file_path):
+        os.remove(file_path)
+
+
+def remap_palette(palette: np.ndarray, id_mapping: dict[int, int] | None = None) -> np.ndarray:
+    """Palette of the class ids after remapping with :func:`build_lut`.
+
+    A new class id takes the color of the smallest old class id mapped to it."""
+    new_ids = build_lut(id_mapping=id_mapping)[: palette.shape[0]]
+    remapped = np.zeros((max(palette.shape[0], int(new_ids.max()) + 1), 3), dtype=np.uint8)
+    remapped[: palette.shape[0]] = palette
+    unique_ids, first_idx = np.unique(new_ids, return_index=True)
+    remapped[unique_ids] = palette[first_idx]
+    if remapped.shape[0] > VIPlannerSemMetaHandler.UNKNOWN_ID:
+        remapped[VIPlannerSemMetaHandler.UNKNOWN_ID] = 0
+    return remapped
+
+
+def build_lut(palette: np.ndarray | None = None, id_mapping: dict[int, int] | None = None) -> np.ndarray:
+    """Build a lookup table over all uint8 class ids.
+
+    Args:
+        palette: Colors of the (remapped) class ids with shape (C, 3). If None, the LUT maps to class ids.
+            Defaults to None.
+        id_mapping: Mapping from old to new class ids. Ids that are not part of the mapping are kept.
+            Defaults to None.
+
+    Returns:
+        LUT of shape (256,) mapping to class ids or of shape (256, 3) mapping to colors.
+    """
+    lut = np.arange(256, dtype=np.uint8)
+    if id_mapping is not None:
+        lut[list(id_mapping.keys())] = list(id_mapping.values())
+    if palette is None:
+        return lut
+    # ids without a color, incl. the unknown id, are mapped to black
+    palette_full = np.zeros((256, 3), dtype=np.uint8)
+    palette_full[: palette.shape[0]] = palette[:256]
+    palette_full[VIPlannerSemMetaHandler.UNKNOWN_ID] = 0
+    return palette_full[lut]
+
+
+def decode_rgb(image: np.ndarray, palette: np.ndarray) -> np.ndarray:
+    """Decode a RGB semantic image to class ids with the palette it was rendered with.
+
+    Works with arbitrary palettes (e.g. mpcat40). Colors that are not part of the palette are assigned
+    :attr:`VIPlannerSemMetaHandler.UNKNOWN_ID`, colors of the palette (incl. black) keep their class id."""
+    palette_packed = VIPlannerSemMetaHandler.pack_rgb(palette)
+    image_packed = VIPlannerSemMetaHandler.pack_rgb(image)
+    # classes can share the same color, the first class id is used
+    sorted_packed, first_idx = np.unique(palette_packed, return_index=True)
+    idx = np.searchsorted(sorted_packed, image_packed).clip(max=len(sorted_packed) - 1)
+    ids = first_idx[idx]
+    ids[sorted_packed[idx] != image_packed] = VIPlannerSemMetaHandler.UNKNOWN_ID
+    return ids.astype(np.uint8)
+
+
+def recolor_image(image: np.ndarray, lut: np.ndarray, palette: np.ndarray | None = None) -> np.ndarray:
+    """Apply a LUT to a semantic image.
+
+    Args:
+        image: Class id image of shape (H, W) or RGB image of shape (H, W, 3).
+        lut: Lookup table as returned by :func:`build_lut`.
+        palette: Palette of the RGB image, required if the image is given as colors. Defaults to None.
+    """
+    if image.ndim == 3:
+        assert palette is not None, "Palette required to decode RGB semantic images."
+        image = decode_rgb(image, palette)
+    return lut[image]
+
+
+def recolor_dataset(
+    src_dir: str, dst_dir: str, lut: np.ndarray, palette: np.ndarray | None = None, num_workers: int = 8
+) -> int:
+    """Apply a LUT to all semantic images of a directory in parallel.
+
+    Args:
+        src_dir: Directory of the semantic images (e.g. ``<data_dir>/camera_0/semantic_segmentation``).
+        dst_dir: Directory the recolored images are saved to, can be the same as the source directory.
+        lut: Lookup table as returned by :func:`build_lut`.
+        palette: Palette of the source images if they are saved as RGB images. Defaults to None.
+        num_workers: Number of threads, image decoding and encoding release the GIL. Defaults to 8.
+
+    Returns:
+        Number of processed images.
+    """
+    os.makedirs(dst_dir, exist_ok=True)
+    files = sorted(file for file in os.listdir(src_dir) if file.endswith(".png"))
+
+    def _process(file: str):
+        image = cv2.imread(os.path.join(src_dir, file), cv2.IMREAD_UNCHANGED)
+        if image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        image = recolor_image(image, lut, palette)
+        if image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+        assert cv2.imwrite(os.path.join(dst_dir, file), image)
+
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        list(executor.map(_process, files))
+
+    print(f"[INFO] Recolored {len(files)} semantic images from {src_dir} to {dst_dir}")
+    return len(files)
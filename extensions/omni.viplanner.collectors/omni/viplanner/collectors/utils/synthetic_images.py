@@ -0,0 +1,164 @@
+# Copyright (c) 2024 ETH Zurich (Robotic Systems Lab)
+# Author: Pascal Roth, Ziqi Fan
+# All rights reserved.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+
+"""Synthetic depth and semantic image sets for benchmarking the reconstruction without rendering.
+
+The images are ray traced analytically in a box shaped room with box obstacles. The poses, intrinsics and images are
+saved in the layout written by :meth:`ViewpointSampling.render_viewpoints` and read by
+:class:`EnvironmentReconstruction`::
+
+    data_dir
+        - camera_poses.txt  (x y z qw qx qy qz)
+        - camera_1
+            - intrinsics.txt
+            - distance_to_image_plane
+                - xxxx.png  (uint16, scaled by the depth scale)
+        - camera_0
+            - intrinsics.txt
+            - semantic_segmentation
+                - xxxx.png  (RGB colors of the VIPlanner classes)
+"""
+
+from __future__ import annotations
+
+import os
+
+import cv2
+import numpy as np
+import scipy.spatial.transform as tf
+
+from ..configs.viplanner_sem_meta import VIPlannerSemMetaHandler
+from .environment3d_reconstruction import EnvironmentReconstruction
+
+SCENE_PRESETS = {
+    "room": {"room_size": (10.0, 8.0, 3.0), "obstacles": 10},
+    "hall": {"room_size": (40.0, 30.0, 8.0), "obstacles": 60},
+}
+"""Room size [m] and number of obstacles of the predefined scene types."""
+
+
+def intrinsics_matrix(resolution: tuple[int, int], fov: float = 90.0) -> np.ndarray:
+    """Pinhole intrinsic matrix for an image resolution (height, width) and a horizontal field of view in degrees."""
+    height, width = resolution
+    focal = width / 2 / np.tan(np.deg2rad(fov) / 2)
+    return np.array([[focal, 0.0, width / 2], [0.0, focal, height / 2], [0.0, 0.0, 1.0]])
+
+
+class SyntheticRoom:
+    """Analytic ray tracer of a box room with axis aligned box obstacles."""
+
+    def __init__(self, room_size: tuple[float, float, float], obstacles: int = 10, seed: int = 0):
+        self.room_size = np.asarray(room_size, dtype=np.float64)
+        self._rng = np.random.default_rng(seed)
+
+        # obstacles standing on the floor
+        footprint = self._rng.uniform(0.3, 1.5, size=(obstacles, 2))
+        origin = self._rng.uniform(0.0, self.room_size[:2] - footprint)
+        height = self._rng.uniform(0.4, min(2.0, self.room_size[2]), size=(obstacles, 1))
+        self.box_min = np.hstack((origin, np.zeros((obstacles, 1))))
+        self.box_max = np.hstack((origin + footprint, height))
+
+        # class colors, the walls of the room are 0-3, floor 4, ceiling 5 and the obstacles 6
+        sem_handler = VIPlannerSemMetaHandler()
+        colors = sem_handler.get_colors_for_names(["wall"] * 4 + ["floor", "ceiling", "furniture"])
+        self.colors = np.asarray(colors, dtype=np.uint8)
+
+    def sample_poses(self, num_poses: int, margin: float = 0.5) -> np.ndarray:
+        """Sample camera poses (x y z qw qx qy qz) in free space with random yaw and small pitch."""
+        poses = np.zeros((0, 7))
+        while poses.shape[0] < num_poses:
+            low = [margin, margin, 0.5]
+            high = [self.room_size[0] - margin, self.room_size[1] - margin, 1.5]
+            pos = self._rng.uniform(low, high, size=(num_poses, 3))
+            inside = np.any(np.all((pos[:, None] > self.box_min) & (pos[:, None] < self.box_max), axis=2), axis=1)
+            pos = pos[~inside]
+            euler = np.stack(
+                (self._rng.uniform(-np.pi, np.pi, pos.shape[0]), self._rng.uniform(-0.2, 0.2, pos.shape[0])), axis=1
+            )
+            quat = tf.Rotation.from_euler("zy", euler).as_quat()  # x y z w
+            poses = np.vstack((poses, np.hstack((pos, quat[:, [3, 0, 1, 2]]))))
+        return poses[:num_poses]
+
+    def render(self, pose: np.ndarray, K: np.ndarray, resolution: tuple[int, int]) -> tuple[np.ndarray, np.ndarray]:
+        """Render the depth (distance to the image plane) and the RGB semantic image of a pose (x y z qw qx qy qz)."""
+        pixels = EnvironmentReconstruction._computePixelTensor(K, resolution)
+        rot = tf.Rotation.from_quat(pose[[4, 5, 6, 3]]).as_matrix()
+        # rays are scaled to unit distance to the image plane, i.e. the ray parameter is the depth
+        directions = (rot @ pixels.T).T
+        origin = pose[:3]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            inv_dir = 1.0 / directions
+            # exit of the room
+            t_bounds = np.where(directions > 0, (self.room_size - origin) * inv_dir, -origin * inv_dir)
+            t_bounds[~np.isfinite(t_bounds)] = np.inf
+            axis = np.argmin(t_bounds, axis=1)
+            depth = t_bounds[np.arange(directions.shape[0]), axis]
+            # walls of the x- and y-axis, floor and ceiling
+            class_idx = axis * 2 + (directions[np.arange(directions.shape[0]), axis] > 0)
+            class_idx[axis == 2] = np.where(directions[axis == 2, 2] < 0, 4, 5)
+
+            # entry into the obstacles
+            for box_min, box_max in zip(self.box_min, self.box_max):
+                t_1 = (box_min - origin) * inv_dir
+                t_2 = (box_max - origin) * inv_dir
+                t_near = np.nanmax(np.minimum(t_1, t_2), axis=1)
+                t_far = np.nanmin(np.maximum(t_1, t_2), axis=1)
+                hit = (t_near <= t_far) & (t_near > 0) & (t_near < depth)
+                depth[hit] = t_near[hit]
+                class_idx[hit] = 6
+
+        return depth.reshape(resolution), self.colors[class_idx].reshape(*resolution, 3)
+
+
+def write_synthetic_dataset(
+    data_dir: str,
+    num_images: int = 100,
+    resolution: tuple[int, int] = (480, 640),
+    sem_resolution: tuple[int, int] | None = None,
+    scene: str = "room",
+    depth_scale: float = 1000.0,
+    depth_cam_name: str = "camera_1",
+    semantic_cam_name: str = "camera_0",
+    seed: int = 0,
+) -> str:
+    """Write a synthetic depth and semantic image set for the reconstruction.
+
+    Args:
+        data_dir: Directory of the image set.
+        num_images: Number of camera poses. Defaults to 100.
+        resolution: Resolution (height, width) of the depth camera. Defaults to (480, 640).
+        sem_resolution: Resolution of the semantic camera. Defaults to None, i.e. the depth resolution.
+        scene: Scene type, one of :data:`SCENE_PRESETS`. Defaults to "room".
+        depth_scale: Scale of the depth images. Defaults to 1000.0.
+        depth_cam_name: Name of the depth camera. Defaults to "camera_1".
+        semantic_cam_name: Name of the semantic camera. Defaults to "camera_0".
+        seed: Seed of the scene and the poses. Defaults to 0.
+    """
+    sem_resolution = sem_resolution if sem_resolution is not None else resolution
+    room = SyntheticRoom(seed=seed, **SCENE_PRESETS[scene])
+    poses = room.sample_poses(num_images)
+    K_depth, K_sem = intrinsics_matrix(resolution), intrinsics_matrix(sem_resolution)
+
+    depth_dir = os.path.join(data_dir, depth_cam_name, "distance_to_image_plane")
+    sem_dir = os.path.join(data_dir, semantic_cam_name, "semantic_segmentation")
+    os.makedirs(depth_dir, exist_ok=True)
+    os.makedirs(sem_dir, exist_ok=True)
+    np.savetxt(os.path.join(data_dir, "camera_poses.txt"), poses, delimiter=",")
+    np.savetxt(os.path.join(data_dir, depth_cam_name, "intrinsics.txt"), K_depth, delimiter=",")
+    np.savetxt(os.path.join(data_dir, semantic_cam_name, "intrinsics.txt"), K_sem, delimiter=",")
+
+    for idx, pose in enumerate(poses):
+        depth, sem_image = room.render(pose, K_depth, resolution)
+        if sem_resolution != resolution:
+            _, sem_image = room.render(pose, K_sem, sem_resolution)
+        depth = np.clip(depth * depth_scale, 0, np.iinfo(np.uint16).max)
+        assert cv2.imwrite(os.path.join(depth_dir, f"{idx}".zfill(4) + ".png"), depth.astype(np.uint16))
+        sem_image = cv2.cvtColor(sem_image, cv2.COLOR_RGB2BGR)
+        assert cv2.imwrite(os.path.join(sem_dir, f"{idx}".zfill(4) + ".png"), sem_image)
+
+    print(f"[INFO] Saved {num_images} synthetic depth and semantic images to {data_dir}")
+    return data_dir
@@ -0,0 +1,568 @@
+# Copyright (c) 2024 ETH Zurich (Robotic Systems Lab)
+# Author: Pascal Roth, Ziqi Fan
+# All rights reserved.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+
+"""Procedural synthetic scenes for benchmarking and regression testing without licensed Matterport or Carla assets.
+
+The generator writes indoor (rooms along a corridor, doors, furniture, stairs between multiple levels) and outdoor
+(uneven ground, buildings, obstacles) scenes as binary PLY files with the same face layout as the Matterport meshes::
+
+    element face
+    property list uchar int vertex_indices
+    property int material_id
+    property int segment_id
+    property int category_id
+
+where ``category_id`` is the 1-based row of ``category_mapping.tsv``, i.e. the meshes can directly be loaded by
+:class:`MatterportRayCaster` and :class:`MatterportRayCasterCamera`. :class:`SyntheticScene` is a thin stand-in for
+the :class:`InteractiveScene` with a mesh ray caster and optional ray caster cameras, so that :class:`TerrainAnalysis`
+and depth and semantic images can be computed on the generated meshes on a CPU-only machine without Isaac Sim. The
+stand-ins ray cast with the warp kernels of Isaac Lab, i.e. Isaac Lab has to be installed but the app is not launched.
+
+The generator itself only depends on numpy and its configuration is a plain dataclass.
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+
+import numpy as np
+
+# category ids (row in category_mapping.tsv) used for the scene elements
+CATEGORY_IDS = {
+    "wall": 1,
+    "door": 2,
+    "ceiling": 3,
+    "floor": 4,
+    "chair": 7,
+    "object": 11,
+    "cabinet": 13,
+    "table": 15,
+    "stairs": 32,
+}
+
+PLY_VERTEX_DTYPE = np.dtype([
+    ("x", "<f4"),
+    ("y", "<f4"),
+    ("z", "<f4"),
+    ("nx", "<f4"),
+    ("ny", "<f4"),
+    ("nz", "<f4"),
+    ("tx", "<f4"),
+    ("ty", "<f4"),
+    ("red", "u1"),
+    ("green", "u1"),
+    ("blue", "u1"),
+])
+PLY_FACE_DTYPE = np.dtype([
+    ("n", "u1"),
+    ("vertex_indices", "<i4", (3,)),
+    ("material_id", "<i4"),
+    ("segment_id", "<i4"),
+    ("category_id", "<i4"),
+])
+
+
+@dataclass
+class SyntheticSceneCfg:
+    """Configuration of a procedural synthetic scene."""
+
+    scene_type: str = "indoor"
+    """Type of the scene, either "indoor" or "outdoor". Default is "indoor"."""
+    seed: int = 0
+    """Seed of the random placement of the obstacles. Default is 0."""
+
+    # indoor
+    rooms_per_side: int = 4
+    """Number of rooms on each side of the corridor, controls the length of the building. Default is 4."""
+    room_size: float = 5.0
+    """Side length of the square rooms in meters. Default is 5.0."""
+    corridor_width: float = 2.0
+    """Width of the corridor in meters. Default is 2.0."""
+    levels: int = 1
+    """Number of levels, connected by stairs at the end of the corridor. Default is 1."""
+    level_height: float = 3.0
+    """Height of a level in meters. Default is 3.0."""
+    door_width: float = 1.0
+    """Width of the doors in meters. Default is 1.0."""
+    obstacles_per_room: int = 3
+    """Number of furniture obstacles per room. Default is 3."""
+    step_height: float = 0.15
+    """Height of the stairs steps in meters. Default is 0.15."""
+
+    # outdoor
+    outdoor_size: float = 50.0
+    """Side length of the square outdoor area in meters. Default is 50.0."""
+    ground_resolution: float = 1.0
+    """Resolution of the uneven ground grid in meters. Default is 1.0."""
+    ground_amplitude: float = 0.2
+    """Amplitude of the ground height variations in meters. Default is 0.2."""
+    buildings: int = 6
+    """Number of buildings in the outdoor scene. Default is 6."""
+    outdoor_obstacles: int = 40
+    """Number of small obstacles in the outdoor scene. Default is 40."""
+
+    wall_thickness: float = 0.1
+    """Thickness of walls and floor slabs in meters. Default is 0.1."""
+    color: tuple[int, int, int] = field(default=(180, 180, 180))
+    """Vertex color of the mesh. Default is (180, 180, 180)."""
+
+
+class SyntheticSceneGenerator:
+    """Generate procedural indoor and outdoor meshes with per-face category ids."""
+
+    def __init__(self, cfg: SyntheticSceneCfg):
+        self._cfg = cfg
+        # buffers
+        self._vertices: list[np.ndarray] = []
+        self._faces: list[np.ndarray] = []
+        self._categories: list[np.ndarray] = []
+        self._nbr_vertices = 0
+
+    ###
+    # Operations
+    ###
+
+    def generate(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Generate the scene.
+
+        Returns:
+            Vertices (V, 3), faces (F, 3) and category id of every face (F,).
+        """
+        # reset the buffers and the random generator so that every call results in the same scene
+        self._rng = np.random.default_rng(self._cfg.seed)
+        self._vertices, self._faces, self._categories, self._nbr_vertices = [], [], [], 0
+        if self._cfg.scene_type == "indoor":
+            self._build_indoor()
+        elif self._cfg.scene_type == "outdoor":
+            self._build_outdoor()
+        else:
+            raise ValueError(f"Unknown scene type: {self._cfg.scene_type}")
+        return np.vstack(self._vertices), np.vstack(self._faces), np.concatenate(self._categories)
+
+    def save(self, file_path: str) -> str:
+        """Generate the scene and save it as binary PLY file."""
+        vertices, faces, categories = self.generate()
+        write_category_ply(file_path, vertices, faces, categories, color=self._cfg.color)
+        print(f"[INFO] Saved synthetic {self._cfg.scene_type} scene with {faces.shape[0]} faces to {file_path}")
+        return file_path
+
+    ###
+    # Scene layouts
+    ###
+
+    def _build_indoor(self):
+        cfg = self._cfg
+        rooms_length = cfg.rooms_per_side * cfg.room_size
+        width = 2 * cfg.room_size + cfg.corridor_width
+        corridor = (cfg.room_size, cfg.room_size + cfg.corridor_width)
+        # the stairwell extends the corridor beyond the rooms
+        nbr_steps = int(np.ceil(cfg.level_height / cfg.step_height))
+        step_depth = 0.3
+        length = rooms_length + (nbr_steps * step_depth if cfg.levels > 1 else 0.0)
+        stairwell = (rooms_length, length, corridor[0], corridor[1])
+
+        for level in range(cfg.levels):
+            z = level * cfg.level_height
+            # floor slab, upper levels have an opening above the stairs
+            hole = stairwell if level > 0 else None
+            self._add_slab(0, length, 0, width, z - cfg.wall_thickness, z, hole)
+
+            # outer walls
+            self._add_wall_x(0, length, 0, z)
+            self._add_wall_x(0, length, width, z)
+            self._add_wall_y(0, 0, width, z)
+            self._add_wall_y(length, 0, width, z)
+
+            # walls between the rooms and the corridor with a door per room
+            for room in range(cfg.rooms_per_side):
+                x_start = room * cfg.room_size
+                door_center = x_start + cfg.room_size / 2
+                doors = [(door_center - cfg.door_width / 2, door_center + cfg.door_width / 2)]
+                for y in corridor:
+                    self._add_wall_x(x_start, x_start + cfg.room_size, y, z, doors)
+                # walls between neighboring rooms and to the stairwell
+                if room > 0:
+                    self._add_wall_y(x_start, 0, corridor[0], z)
+                    self._add_wall_y(x_start, corridor[1], width, z)
+                if room == cfg.rooms_per_side - 1 and length > rooms_length:
+                    self._add_wall_y(rooms_length, 0, corridor[0], z)
+                    self._add_wall_y(rooms_length, corridor[1], width, z)
+                    for y in corridor:
+                        self._add_wall_x(rooms_length, length, y, z)
+                # furniture
+                for y_min, y_max in ((0, corridor[0]), (corridor[1], width)):
+                    self._add_furniture(x_start, x_start + cfg.room_size, y_min, y_max, z)
+
+            # stairs to the next level
+            if level < cfg.levels - 1:
+                for step in range(nbr_steps):
+                    x_min = stairwell[0] + step * step_depth
+                    self._add_box(
+                        (x_min, stairwell[2], z),
+                        (x_min + step_depth, stairwell[3], z + (step + 1) * cfg.step_height),
+                        CATEGORY_IDS["stairs"],
+                    )
+
+        # ceiling of the top level
+        z_top = cfg.levels * cfg.level_height
+        self._add_box((0, 0, z_top), (length, width, z_top + cfg.wall_thickness), CATEGORY_IDS["ceiling"])
+
+    def _build_outdoor(self):
+        cfg = self._cfg
+        size = cfg.outdoor_size
+
+        # uneven ground as height field
+        nbr_cells = max(int(np.ceil(size / cfg.ground_resolution)), 1)
+        coords = np.linspace(0, size, nbr_cells + 1)
+        grid_x, grid_y = np.meshgrid(coords, coords, indexing="ij")
+        phase = self._rng.uniform(0, 2 * np.pi, size=2)
+        heights = cfg.ground_amplitude * (
+            np.sin(2 * np.pi * grid_x / 17.0 + phase[0]) * np.cos(2 * np.pi * grid_y / 13.0 + phase[1])
+        )
+        vertices = np.stack((grid_x, grid_y, heights), axis=-1).reshape(-1, 3)
+        idx = np.arange((nbr_cells + 1) ** 2).reshape(nbr_cells + 1, nbr_cells + 1)
+        v00, v10, v01, v11 = idx[:-1, :-1], idx[1:, :-1], idx[:-1, 1:], idx[1:, 1:]
+        faces = np.concatenate(
+            (np.stack((v00, v10, v11), axis=-1).reshape(-1, 3), np.stack((v00, v11, v01), axis=-1).reshape(-1, 3))
+        )
+        self._add_mesh(vertices, faces, CATEGORY_IDS["floor"])
+
+        # buildings and obstacles are placed on the maximum ground height
+        z_ground = cfg.ground_amplitude
+        for _ in range(cfg.buildings):
+            footprint = self._rng.uniform(4.0, 10.0, size=2)
+            origin = self._rng.uniform(0, size - footprint)
+            height = self._rng.uniform(3.0, 12.0)
+            self._add_box(
+                (*origin, -cfg.ground_amplitude), (*(origin + footprint), z_ground + height), CATEGORY_IDS["wall"]
+            )
+        for _ in range(cfg.outdoor_obstacles):
+            footprint = self._rng.uniform(0.3, 1.5, size=2)
+            origin = self._rng.uniform(0, size - footprint)
+            height = self._rng.uniform(0.3, 1.5)
+            self._add_box(
+                (*origin, -cfg.ground_amplitude), (*(origin + footprint), z_ground + height), CATEGORY_IDS["object"]
+            )
+
+    ###
+    # Primitives
+    ###
+
+    def _add_furniture(self, x_min: float, x_max: float, y_min: float, y_max: float, z: float):
+        """Randomly place furniture within a room, keeping a margin to the walls."""
+        margin = 0.5
+        categories = [CATEGORY_IDS["table"], CATEGORY_IDS["chair"], CATEGORY_IDS["cabinet"]]
+        for _ in range(self._cfg.obstacles_per_room):
+            footprint = self._rng.uniform(0.4, 1.2, size=2)
+            low = np.array([x_min + margin, y_min + margin])
+            high = np.array([x_max - margin, y_max - margin]) - footprint
+            if np.any(high <= low):
+                continue
+            origin = self._rng.uniform(low, high)
+            height = self._rng.uniform(0.4, 1.8)
+            self._add_box((*origin, z), (*(origin + footprint), z + height), int(self._rng.choice(categories)))
+
+    def _add_slab(self, x_min, x_max, y_min, y_max, z_min, z_max, hole: tuple | None = None):
+        """Floor slab, optionally with a rectangular opening (x_min, x_max, y_min, y_max)."""
+        category = CATEGORY_IDS["floor"]
+        if hole is None:
+            self._add_box((x_min, y_min, z_min), (x_max, y_max, z_max), category)
+            return
+        hx_min, hx_max, hy_min, hy_max = hole
+        for box_min, box_max in (
+            ((x_min, y_min), (hx_min, y_max)),
+            ((hx_max, y_min), (x_max, y_max)),
+            ((hx_min, y_min), (hx_max, hy_min)),
+            ((hx_min, hy_max), (hx_max, y_max)),
+        ):
+            if box_max[0] > box_min[0] and box_max[1] > box_min[1]:
+                self._add_box((*box_min, z_min), (*box_max, z_max), category)
+
+    def _add_wall_x(self, x_min: float, x_max: float, y: float, z: float, doors: list | None = None):
+        """Wall along the x-axis, doors are given as list of (x_min, x_max) openings."""
+        t = self._cfg.wall_thickness / 2
+        x_segments = self._split_segment(x_min, x_max, doors)
+        for seg_min, seg_max in x_segments:
+            self._add_box((seg_min, y - t, z), (seg_max, y + t, z + self._cfg.level_height), CATEGORY_IDS["wall"])
+
+    def _add_wall_y(self, x: float, y_min: float, y_max: float, z: float):
+        t = self._cfg.wall_thickness / 2
+        self._add_box((x - t, y_min, z), (x + t, y_max, z + self._cfg.level_height), CATEGORY_IDS["wall"])
+
+    @staticmethod
+    def _split_segment(start: float, end: float, openings: list | None) -> list[tuple[float, float]]:
+        if not openings:
+            return [(start, end)]
+        segments = []
+        for open_start, open_end in sorted(openings):
+            if open_start > start:
+                segments.append((start, open_start))
+            start = max(start, open_end)
+        if end > start:
+            segments.append((start, end))
+        return segments
+
+    def _add_box(self, box_min: tuple, box_max: tuple, category: int):
+        """Axis aligned box with outward facing triangles."""
+        x0, y0, z0 = box_min
+        x1, y1, z1 = box_max
+        vertices = np.array([
+            [x0, y0, z0],
+            [x1, y0, z0],
+            [x1, y1, z0],
+            [x0, y1, z0],
+            [x0, y0, z1],
+            [x1, y0, z1],
+            [x1, y1, z1],
+            [x0, y1, z1],
+        ])
+        faces = np.array([
+            [0, 2, 1], [0, 3, 2],  # bottom
+            [4, 5, 6], [4, 6, 7],  # top
+            [0, 1, 5], [0, 5, 4],  # front
+            [1, 2, 6], [1, 6, 5],  # right
+            [2, 3, 7], [2, 7, 6],  # back
+            [3, 0, 4], [3, 4, 7],  # left
+        ])  # fmt: skip
+        self._add_mesh(vertices, faces, category)
+
+    def _add_mesh(self, vertices: np.ndarray, faces: np.ndarray, category: int):
+        self._vertices.append(vertices.astype(np.float32))
+        self._faces.append(faces.astype(np.int32) + self._nbr_vertices)
+        self._categories.append(np.full(faces.shape[0], category, dtype=np.int32))
+        self._nbr_vertices += vertices.shape[0]
+
+
+def write_category_ply(
+    file_path: str,
+    vertices: np.ndarray,
+    faces: np.ndarray,
+    categories: np.ndarray,
+    color: tuple[int, int, int] = (180, 180, 180),
+):
+    """Write a mesh as binary PLY file in the Matterport face layout with per-face category ids."""
+    vertex_data = np.zeros(vertices.shape[0], dtype=PLY_VERTEX_DTYPE)
+    vertex_data["x"], vertex_data["y"], vertex_data["z"] = vertices.T
+    vertex_data["red"], vertex_data["green"], vertex_data["blue"] = color
+
+    face_data = np.zeros(faces.shape[0], dtype=PLY_FACE_DTYPE)
+    face_data["n"] = 3
+    face_data["vertex_indices"] = faces
+    face_data["segment_id"] = np.arange(faces.shape[0])
+    face_data["category_id"] = categories
+
+    header = "\n".join([
+        "ply",
+        "format binary_little_endian 1.0",
+        f"element vertex {vertices.shape[0]}",
+        *[
+            f"property {'uchar' if PLY_VERTEX_DTYPE[name] == np.uint8 else 'float'} {name}"
+            for name in PLY_VERTEX_DTYPE.names
+        ],
+        f"element face {faces.shape[0]}",
+        "property list uchar int vertex_indices",
+        "property int material_id",
+        "property int segment_id",
+        "property int category_id",
+        "end_header",
+    ])
+    os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+    with open(file_path, "wb") as f:
+        f.write((header + "\n").encode("ascii"))
+        f.write(vertex_data.tobytes())
+        f.write(face_data.tobytes())
+
+
+###
+# Scene stand-in
+###
+
+
+class SyntheticMeshRayCaster:
+    """Stand-in for a :class:`MatterportRayCaster` with a single mesh.
+
+    Provides the attributes used by :class:`TerrainAnalysis`: the warp mesh, the face id to category mapping and
+    the mpcat40 class mapping (incl. the mpcat40 colors used by :class:`SyntheticRayCasterCamera`)."""
+
+    def __init__(self, ply_path: str, data_dir: str, device: str = "cpu"):
+        import pandas as pd
+        import torch
+        import trimesh
+        import warp as wp
+
+        wp.init()
+        self.cfg = SimpleNamespace(mesh_prim_paths=[ply_path])
+        self.device = device
+
+        mesh = trimesh.load(ply_path, process=False)
+        self.meshes = {
+            ply_path: wp.Mesh(
+                points=wp.array(mesh.vertices.astype(np.float32), dtype=wp.vec3, device=device),
+                indices=wp.array(mesh.faces.astype(np.int32).flatten(), dtype=int, device=device),
+            )
+        }
+        faces_raw = mesh.metadata["_ply_raw"]["face"]["data"]
+        self.face_id_category_mapping = {
+            ply_path: torch.tensor(np.asarray(faces_raw["category_id"]).reshape(-1), device=device)
+        }
+
+        # category id to class mapping (name and id of mpcat40 reduced class set)
+        mapping = pd.read_csv(os.path.join(data_dir, "matterport", "category_mapping.tsv"), sep="\t")
+        self.mapping_mpcat40 = torch.tensor(mapping["mpcat40index"].to_numpy(), device=device, dtype=torch.long)
+        mapping_40 = pd.read_csv(os.path.join(data_dir, "matterport", "mpcat40.tsv"), sep="\t")
+        self.classes_mpcat40 = mapping_40["mpcat40"].to_numpy()
+        self.color_mpcat40 = torch.tensor(
+            [(int(color[1:3], 16), int(color[3:5], 16), int(color[5:7], 16)) for color in mapping_40["hex"]],
+            device=device,
+            dtype=torch.uint8,
+        )
+
+
+class SyntheticRayCasterCamera:
+    """Stand-in for a :class:`MatterportRayCasterCamera` on the mesh of a :class:`SyntheticMeshRayCaster`.
+
+    Provides the interface used to render viewpoints (:meth:`set_world_poses`, :meth:`update` and ``data`` with
+    ``output``, ``intrinsic_matrices``, ``pos_w`` and ``quat_w_world``) for the data types ``distance_to_image_plane``,
+    ``distance_to_camera`` and ``semantic_segmentation``. The pixels follow the convention of
+    :class:`EnvironmentReconstruction`, i.e. the images can directly be reconstructed. Pixels without a hit have an
+    infinite distance and the mpcat40 class "void".
+    """
+
+    SUPPORTED_TYPES = ("distance_to_image_plane", "distance_to_camera", "semantic_segmentation")
+
+    def __init__(
+        self,
+        raycaster: SyntheticMeshRayCaster,
+        data_types: list[str] | tuple[str, ...] = ("distance_to_image_plane",),
+        resolution: tuple[int, int] = (480, 640),
+        fov: float = 90.0,
+        num_envs: int = 1,
+        max_distance: float = 1e6,
+        semantic_class_ids: bool = False,
+    ):
+        import torch
+
+        from .environment3d_reconstruction import EnvironmentReconstruction
+        from .synthetic_images import intrinsics_matrix
+
+        unsupported = set(data_types) - set(self.SUPPORTED_TYPES)
+        assert not unsupported, f"Data types {unsupported} are not supported by the synthetic camera."
+        self.cfg = SimpleNamespace(
+            data_types=list(data_types),
+            mesh_prim_paths=raycaster.cfg.mesh_prim_paths,
+            max_distance=max_distance,
+            semantic_class_ids=semantic_class_ids,
+        )
+        self.device = raycaster.device
+        self.image_shape = tuple(resolution)
+        self._raycaster = raycaster
+
+        # ray directions in the camera frame (x forward, y left, z up), normalized with the distance to the image
+        # plane being the forward component
+        K = intrinsics_matrix(resolution, fov)
+        pixels = EnvironmentReconstruction._computePixelTensor(K, resolution)
+        norm = np.linalg.norm(pixels, axis=1)
+        self._ray_directions = torch.tensor(pixels / norm[:, None], dtype=torch.float32, device=self.device)
+        self._ray_forward = torch.tensor(1.0 / norm, dtype=torch.float32, device=self.device)
+
+        # class ids are the mpcat40 indices, the palette are their colors
+        self.palette = raycaster.color_mpcat40
+        self.class_ids = torch.arange(self.palette.shape[0], device=self.device, dtype=torch.uint8)
+
+        # buffers
+        self.data = SimpleNamespace(
+            pos_w=torch.zeros((num_envs, 3), device=self.device),
+            quat_w_world=torch.tensor([[1.0, 0.0, 0.0, 0.0]], device=self.device).repeat(num_envs, 1),
+            intrinsic_matrices=torch.tensor(K, dtype=torch.float32, device=self.device).repeat(num_envs, 1, 1),
+            image_shape=self.image_shape,
+            output={},
+        )
+        for name in self.cfg.data_types:
+            if name == "semantic_segmentation":
+                shape, dtype = (*self.image_shape, 1 if semantic_class_ids else 3), torch.uint8
+            else:
+                shape, dtype = self.image_shape, torch.float32
+            self.data.output[name] = torch.zeros((num_envs, *shape), dtype=dtype, device=self.device)
+
+    def set_world_poses(self, positions, orientations, env_ids=None, convention: str = "world"):
+        """Set the camera poses, orientations are quaternions (w, x, y, z) in the world convention (x forward)."""
+        assert convention == "world", "The synthetic camera only supports the world convention."
+        env_ids = slice(None) if env_ids is None else env_ids
+        self.data.pos_w[env_ids] = positions.to(self.device, dtype=self.data.pos_w.dtype)
+        self.data.quat_w_world[env_ids] = orientations.to(self.device, dtype=self.data.quat_w_world.dtype)
+
+    def update(self, dt: float = 0.0, force_recompute: bool = False):
+        """Ray cast the images of all cameras at their current poses."""
+        import scipy.spatial.transform as tf
+        import torch
+        from omni.isaac.lab.utils.warp import raycast_mesh
+
+        quat = self.data.quat_w_world.cpu().numpy()
+        rot = torch.tensor(
+            tf.Rotation.from_quat(quat[:, [1, 2, 3, 0]]).as_matrix(), dtype=torch.float32, device=self.device
+        )
+        ray_directions = torch.einsum("nij,rj->nri", rot, self._ray_directions).contiguous()
+        ray_starts = self.data.pos_w[:, None, :].expand_as(ray_directions).contiguous()
+        _, ray_depth, _, ray_face_ids = raycast_mesh(
+            ray_starts,
+            ray_directions,
+            mesh=self._raycaster.meshes[self.cfg.mesh_prim_paths[0]],
+            max_dist=self.cfg.max_distance,
+            return_distance=True,
+            return_face_id="semantic_segmentation" in self.cfg.data_types,
+        )
+
+        if "distance_to_image_plane" in self.cfg.data_types:
+            self.data.output["distance_to_image_plane"][:] = (ray_depth * self._ray_forward).view(-1, *self.image_shape)
+        if "distance_to_camera" in self.cfg.data_types:
+            self.data.output["distance_to_camera"][:] = ray_depth.view(-1, *self.image_shape)
+        if "semantic_segmentation" in self.cfg.data_types:
+            # category index of the hit faces (1-based row of category_mapping.tsv), mapped to the mpcat40 classes
+            hit = torch.isfinite(ray_depth.flatten())
+            face_ids = ray_face_ids.flatten().type(torch.long).clamp(min=0)
+            category = self._raycaster.face_id_category_mapping[self.cfg.mesh_prim_paths[0]][face_ids]
+            class_ids = torch.where(hit, self._raycaster.mapping_mpcat40[category.type(torch.long) - 1], 0)
+            if self.cfg.semantic_class_ids:
+                output = self.class_ids[class_ids].view(-1, *self.image_shape, 1)
+            else:
+                output = self.palette[class_ids].view(-1, *self.image_shape, 3)
+            self.data.output["semantic_segmentation"][:] = output
+
+
+class SyntheticScene:
+    """Thin stand-in for an :class:`InteractiveScene` with the synthetic mesh as terrain and a mesh ray caster.
+
+    Use it with ``TerrainAnalysisCfg.raycaster_sensor = "raycaster"``. Cameras are given by their name and the keyword
+    arguments of :class:`SyntheticRayCasterCamera`, e.g. ``{"camera_0": {"data_types": ["semantic_segmentation"]}}``.
+    """
+
+    def __init__(
+        self,
+        ply_path: str,
+        data_dir: str | None = None,
+        device: str = "cpu",
+        cameras: dict[str, dict] | None = None,
+        num_envs: int = 1,
+    ):
+        if data_dir is None:
+            # data directory of the importer extension
+            data_dir = os.path.abspath(
+                os.path.join(os.path.dirname(__file__), "../../../../../omni.viplanner.importer/data")
+            )
+        self.device = device
+        self.num_envs = num_envs
+        self.terrain = SimpleNamespace(cfg=SimpleNamespace(obj_filepath=ply_path, prim_path="/World/Synthetic"))
+        self.sensors = {"raycaster": SyntheticMeshRayCaster(ply_path, data_dir, device)}
+        for name, camera_kwargs in (cameras or {}).items():
+            self.sensors[name] = SyntheticRayCasterCamera(self.sensors["raycaster"], num_envs=num_envs, **camera_kwargs)
+
+    def update(self, dt: float = 0.0):
+        """Ray cast the images of all cameras."""
+        for sensor in self.sensors.values():
+            if isinstance(sensor, SyntheticRayCasterCamera):
+                sensor.update(dt)
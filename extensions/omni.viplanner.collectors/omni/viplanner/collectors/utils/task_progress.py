@@ -0,0 +1,67 @@
+# Copyright (c) 2024 ETH Zurich (Robotic Systems Lab)
+# Author: Pascal Roth, Ziqi Fan
+# All rights reserved.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+
+"""Progress reporting of cooperative collector tasks.
+
+Long running collector operations (terrain analysis, trajectory and viewpoint sampling, rendering) are implemented as
+generators that yield a ``(stage, done, total)`` tuple at every batch boundary. Scripts run them to completion with
+:func:`run_to_completion`, the extension iterates them in an asyncio task and yields to the app loop in between which
+keeps the UI responsive and allows to cancel a run at the next batch boundary.
+"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Generator
+from typing import Any
+
+ProgressGenerator = Generator[tuple[str, int, int], None, Any]
+"""Generator yielding ``(stage, done, total)`` and returning the result of the task."""
+
+
+def run_to_completion(task: ProgressGenerator) -> Any:
+    """Run a progress generator to completion and return its result."""
+    while True:
+        try:
+            next(task)
+        except StopIteration as result:
+            return result.value
+
+
+class TaskProgress:
+    """Throughput and ETA of the current stage of a progress generator."""
+
+    def __init__(self):
+        self.stage: str = ""
+        self.done: int = 0
+        self.total: int = 0
+        self._stage_start: float = time.perf_counter()
+
+    def update(self, stage: str, done: int, total: int):
+        """Update with the latest ``(stage, done, total)`` tuple, the timer is reset when the stage changes."""
+        if stage != self.stage:
+            self._stage_start = time.perf_counter()
+        self.stage, self.done, self.total = stage, done, total
+
+    @property
+    def fraction(self) -> float:
+        return min(self.done / self.total, 1.0) if self.total > 0 else 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Processed items per second within the current stage."""
+        elapsed = time.perf_counter() - self._stage_start
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def eta(self) -> float | None:
+        """Estimated remaining time of the current stage in seconds."""
+        throughput = self.throughput
+        return (self.total - self.done) / throughput if throughput > 0 else None
+
+    def __str__(self) -> str:
+        eta = f"{self.eta:.1f}s" if self.eta is not None else "-"
+        return f"{self.stage}: {self.done}/{self.total} ({self.throughput:.1f}/s, ETA {eta})"
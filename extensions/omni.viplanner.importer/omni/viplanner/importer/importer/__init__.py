@@ -4,15 +4,33 @@
 #
 # SPDX-License-Identifier: BSD-3-Clause
 
+from typing import TYPE_CHECKING
+
 from .importer import MatterportImporter
-from .importer_cfg import AssetConverterContext, MatterportImporterCfg
+from .importer_cfg import MatterportImporterCfg, default_asset_converter_context
 from .unreal_importer import UnRealImporter
 from .unreal_importer_cfg import UnRealImporterCfg
 
+if TYPE_CHECKING:
+    from omni.kit.asset_converter.impl import AssetConverterContext
+
 __all__ = [
     "MatterportImporterCfg",
     "AssetConverterContext",
+    "default_asset_converter_context",
     "MatterportImporter",
     "UnRealImporterCfg",
     "UnRealImporter",
 ]
+
+
+def __getattr__(name: str):
+    # the asset converter extension is only enabled when its settings are used
+    if name == "AssetConverterContext":
+        from omni.isaac.core.utils import extensions
+
+        extensions.enable_extension("omni.kit.asset_converter")
+        from omni.kit.asset_converter.impl import AssetConverterContext
+
+        return AssetConverterContext
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
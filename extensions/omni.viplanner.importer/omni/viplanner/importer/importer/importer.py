@@ -15,23 +15,25 @@ import numpy as np
 import omni.isaac.core.utils.prims as prim_utils
 import omni.isaac.core.utils.stage as stage_utils
 import omni.isaac.lab.sim as sim_utils
-import trimesh
+import warp as wp
 from omni.isaac.lab.terrains import TerrainImporter
-from omni.isaac.lab.utils.warp import convert_to_warp_mesh
 from pxr import UsdGeom
 
 if TYPE_CHECKING:
+    import trimesh
+    from omni.kit.asset_converter.impl import AssetConverterContext
+
     from .importer_cfg import MatterportImporterCfg
 
-# omniverse
-from omni.isaac.core.utils import extensions
 
-extensions.enable_extension("omni.kit.asset_converter")
-import omni.kit.asset_converter as converter
+class MatterportConverter:
+    def __init__(self, input_obj: str, context: AssetConverterContext):
+        # the asset converter extension is only enabled once a conversion is set up
+        from omni.isaac.core.utils import extensions
 
+        extensions.enable_extension("omni.kit.asset_converter")
+        import omni.kit.asset_converter as converter
 
-class MatterportConverter:
-    def __init__(self, input_obj: str, context: converter.impl.AssetConverterContext):
         self._input_obj = input_obj
         self._context = context
 
@@ -74,9 +76,11 @@ class MatterportImporter(TerrainImporter):
         self.cfg = cfg
         self.device = sim_utils.SimulationContext.instance().device
 
-        # create a dict of meshes
-        self.meshes = dict()
-        self.warp_meshes = dict()
+        # the meshes are read from the stage and converted on first access of `meshes` or `warp_meshes`
+        self._mesh_prim_paths: dict[str, str] = dict()
+        self._mesh_arrays: dict[str, tuple[np.ndarray, np.ndarray]] = dict()
+        self._meshes: dict[str, trimesh.Trimesh] = dict()
+        self._warp_meshes: dict[str, wp.Mesh] = dict()
         self.env_origins = None
         self.terrain_origins = None
 
@@ -100,7 +104,49 @@ class MatterportImporter(TerrainImporter):
             carb.log_info("[INFO]: Loading in extension mode requires calling 'load_world_async'")
 
             # Converter
-            self.converter: MatterportConverter = MatterportConverter(self.cfg.obj_filepath, self.cfg.asset_converter)
+            from .importer_cfg import default_asset_converter_context
+
+            asset_converter = self.cfg.asset_converter or default_asset_converter_context()
+            self.converter: MatterportConverter = MatterportConverter(self.cfg.obj_filepath, asset_converter)
+
+    """
+    Properties
+    """
+
+    @property
+    def meshes(self) -> dict[str, trimesh.Trimesh]:
+        """Trimesh meshes of the terrain, built on first access.
+
+        The meshes are constructed without trimesh's processing (merging of vertices, removal of degenerate faces),
+        i.e. they have the vertices and faces of the USD mesh.
+        """
+        import trimesh
+
+        for name in self._mesh_prim_paths.keys() - self._meshes.keys():
+            vertices, faces = self._get_mesh_arrays(name)
+            self._meshes[name] = trimesh.Trimesh(vertices=vertices, faces=faces, process=False, validate=False)
+        return self._meshes
+
+    @property
+    def warp_meshes(self) -> dict[str, wp.Mesh]:
+        """Warp meshes of the terrain, built on first access.
+
+        On the CPU, the warp meshes reference the same vertex and face buffers that were read from the stage.
+        """
+        device = "cuda" if "cuda" in self.device else "cpu"
+        for name in self._mesh_prim_paths.keys() - self._warp_meshes.keys():
+            vertices, faces = self._get_mesh_arrays(name)
+            # host buffers can only be aliased by cpu arrays
+            copy = device != "cpu"
+            self._warp_meshes[name] = wp.Mesh(
+                points=wp.array(vertices, dtype=wp.vec3, device=device, copy=copy),
+                indices=wp.array(faces.ravel(), dtype=wp.int32, device=device, copy=copy),
+            )
+        return self._warp_meshes
+
+    """
+    Loading
+    """
 
     async def load_world_async(self):
         """Function called when clicking load button"""
@@ -162,18 +208,24 @@ class MatterportImporter(TerrainImporter):
         # check if the mesh is valid
         if mesh_prim is None:
             raise ValueError(f"Could not find any collision mesh in {self.cfg.obj_filepath}. Please check asset.")
-        # cast into UsdGeomMesh
-        mesh_prim = UsdGeom.Mesh(mesh_prim)
-        # store the mesh
-        vertices = np.asarray(mesh_prim.GetPointsAttr().Get())
-        faces = np.asarray(mesh_prim.GetFaceVertexIndicesAttr().Get()).reshape(-1, 3)
-        self.meshes["matterport"] = trimesh.Trimesh(vertices=vertices, faces=faces)
-        # create a warp mesh
-        device = "cuda" if "cuda" in self.device else "cpu"
-        self.warp_meshes["matterport"] = convert_to_warp_mesh(vertices, faces, device=device)
+        # the mesh is only read and converted when the meshes are accessed
+        self._mesh_prim_paths["matterport"] = mesh_prim.GetPath().pathString
 
         # add colliders and physics material
         if self.cfg.groundplane:
             ground_plane_cfg = sim_utils.GroundPlaneCfg(physics_material=self.cfg.physics_material)
             ground_plane = ground_plane_cfg.func("/World/GroundPlane", ground_plane_cfg)
             ground_plane.visible = False
+
+    """
+    Helper functions
+    """
+
+    def _get_mesh_arrays(self, name: str) -> tuple[np.ndarray, np.ndarray]:
+        """Vertices (float32) and faces (int32) of the mesh, read once from the stage and shared by all meshes."""
+        if name not in self._mesh_arrays:
+            mesh_prim = UsdGeom.Mesh(stage_utils.get_current_stage().GetPrimAtPath(self._mesh_prim_paths[name]))
+            vertices = np.ascontiguousarray(mesh_prim.GetPointsAttr().Get(), dtype=np.float32)
+            faces = np.ascontiguousarray(mesh_prim.GetFaceVertexIndicesAttr().Get(), dtype=np.int32).reshape(-1, 3)
+            self._mesh_arrays[name] = (vertices, faces)
+        return self._mesh_arrays[name]
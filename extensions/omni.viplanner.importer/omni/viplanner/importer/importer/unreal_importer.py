@@ -6,21 +6,23 @@
 
 from __future__ import annotations
 
+import bisect
+import functools
+import hashlib
+import json
 import os
+import re
 from typing import TYPE_CHECKING
 
 import carb
 import omni
 import omni.isaac.core.utils.prims as prim_utils
 import yaml
-from omni.isaac.core.utils.semantics import add_update_semantics, remove_all_semantics
+from omni.isaac.core.utils.semantics import add_update_semantics, get_semantics, remove_all_semantics
 from omni.isaac.lab.terrains import TerrainImporter
 from omni.isaac.lab.utils.assets import ISAAC_NUCLEUS_DIR
-from omni.viplanner.importer.utils.prims import (
-    get_all_prims_including_str,
-    get_mesh_prims,
-)
-from pxr import Gf, UsdGeom
+from omni.viplanner.importer.utils.prims import StageIndex, get_all_prims_including_str
+from pxr import Gf, Sdf, Usd, UsdGeom
 
 if TYPE_CHECKING:
     from .unreal_importer_cfg import UnRealImporterCfg
@@ -37,6 +39,18 @@ class UnRealImporter(TerrainImporter):
         """
         :param
         """
+        # load the prepared scene of a previous run
+        baked_path = self._get_baked_scene_path(cfg)
+        if baked_path is not None and os.path.isfile(baked_path):
+            print(f"[INFO] Loading baked scene {baked_path}")
+            # load from a copy, the config of the caller keeps the source scene for the cache lookup
+            cfg = cfg.replace(usd_path=baked_path)
+            super().__init__(cfg)
+            if cfg.people_config_file:
+                stage = omni.usd.get_context().get_stage()
+                stage.DefinePrim("/World/People").GetReferences().AddReference(baked_path, "/People")
+            return
+
         super().__init__(cfg)
 
         # modify mesh
@@ -55,80 +69,211 @@ class UnRealImporter(TerrainImporter):
         if self.cfg.sem_mesh_to_class_map:
             self._add_semantics()
 
+        if baked_path is not None:
+            self._bake_scene(baked_path)
+
+    """ Baked Scene """
+
+    @staticmethod
+    def _get_baked_scene_path(cfg: UnRealImporterCfg) -> str | None:
+        """Path of the baked scene, named by the hash of all inputs of the scene preparation."""
+        if not cfg.bake_scene:
+            return None
+        key = UnRealImporter._hash_scene_inputs(
+            cfg,
+            [cfg.people_config_file, cfg.sem_mesh_to_class_map],
+            f"instanceable={cfg.duplicate_instanceable}",
+        )
+        if key is None:
+            print("[WARNING] Baking is only supported for local USD files.")
+            return None
+        return os.path.splitext(cfg.usd_path)[0] + f".baked_{key[:16]}.usd"
+
+    def _bake_scene(self, baked_path: str):
+        """Save the prepared terrain (duplicates, semantic labels) and the people as a flattened USD layer."""
+        stage = omni.usd.get_context().get_stage()
+        flattened = stage.Flatten()
+
+        baked = Sdf.Layer.CreateNew(baked_path)
+        Sdf.CopySpec(flattened, self.cfg.prim_path + "/terrain", baked, "/terrain")
+        if self.cfg.people_config_file:
+            Sdf.CopySpec(flattened, "/World/People", baked, "/People")
+        # prototypes of the instances are flattened into root prims that are referenced internally
+        for root_prim in flattened.rootPrims:
+            if root_prim.name.startswith("Flattened_Prototype"):
+                Sdf.CopySpec(flattened, root_prim.path, baked, root_prim.path)
+        baked.defaultPrim = "terrain"
+        baked.Save()
+        print(f"[INFO] Saved baked scene to {baked_path}")
+
     """ Assign Semantic Labels """
 
     def _add_semantics(self):
+        terrain_prim_path = self.cfg.prim_path + "/terrain"
         # remove all previous semantic labels
-        remove_all_semantics(prim_utils.get_prim_at_path(self.cfg.prim_path + "/terrain"), recursive=True)
-
-        # get mesh prims
-        mesh_prims, mesh_prims_name = get_mesh_prims(self.cfg.prim_path + "/terrain")
-
-        carb.log_info(f"Total of {len(mesh_prims)} meshes in the scene, start assigning semantic class ...")
+        remove_all_semantics(prim_utils.get_prim_at_path(terrain_prim_path), recursive=True)
 
         # mapping from prim name to class
         with open(self.cfg.sem_mesh_to_class_map) as stream:
             class_keywords = yaml.safe_load(stream)
 
-        # make all the string lower case
-        mesh_prims_name = [mesh_prim_single.lower() for mesh_prim_single in mesh_prims_name]
-        keywords_class_mapping_lower = {
-            key: [value_single.lower() for value_single in value] for key, value in class_keywords.items()
-        }
-
-        # assign class to mesh in ISAAC
-        def recursive_semUpdate(prim, sem_class_name: str, update_submesh: bool) -> bool:
-            # Necessary for Park Mesh
-            if (
-                prim.GetName() == "HierarchicalInstancedStaticMesh"
-            ):  # or "FoliageInstancedStaticMeshComponent" in prim.GetName():
-                add_update_semantics(prim, sem_class_name)
-                update_submesh = True
-            children = prim.GetChildren()
-            if len(children) > 0:
-                for child in children:
-                    update_submesh = recursive_semUpdate(child, sem_class_name, update_submesh)
-            return update_submesh
-
-        def recursive_meshInvestigator(mesh_idx, mesh_name, mesh_prim_list) -> bool:
-            success = False
-            for class_name, keywords in keywords_class_mapping_lower.items():
-                if any([keyword in mesh_name for keyword in keywords]):
-                    update_submesh = recursive_semUpdate(mesh_prim_list[mesh_idx], class_name, False)
-                    if not update_submesh:
-                        add_update_semantics(mesh_prim_list[mesh_idx], class_name)
-                    success = True
-                    break
-
-            if not success:
-                success_child = []
-                mesh_prims_children, mesh_prims_name_children = get_mesh_prims(
-                    mesh_prim_list[mesh_idx].GetPrimPath().pathString
-                )
-                mesh_prims_name_children = [mesh_prim_single.lower() for mesh_prim_single in mesh_prims_name_children]
-                for mesh_idx_child, mesh_name_child in enumerate(mesh_prims_name_children):
-                    success_child.append(
-                        recursive_meshInvestigator(mesh_idx_child, mesh_name_child, mesh_prims_children)
-                    )
-                success = any(success_child)
-
-            return success
-
-        mesh_list = []
-        for mesh_idx, mesh_name in enumerate(mesh_prims_name):
-            success = recursive_meshInvestigator(mesh_idx=mesh_idx, mesh_name=mesh_name, mesh_prim_list=mesh_prims)
-            if success:
-                mesh_list.append(mesh_idx)
-
-        missing = [i for x, y in zip(mesh_list, mesh_list[1:]) for i in range(x + 1, y) if y - x > 1]
-        assert len(mesh_list) > 0, "No mesh is assigned a semantic class!"
-        assert len(mesh_list) == len(mesh_prims_name), (
-            "Not all meshes are assigned a semantic class! Following mesh names are included yet:"
-            f" {[mesh_prims_name[miss_idx] for miss_idx in missing]}"
-        )
+        # apply the assignment of a previous load if the scene and the mapping did not change
+        cache_path, cache_key = self._get_semantics_cache(class_keywords)
+        if cache_path is not None and os.path.isfile(cache_path):
+            with open(cache_path) as stream:
+                cache = json.load(stream)
+            if cache.get("key") == cache_key and self._apply_semantics(cache["assignment"]):
+                carb.log_info(f"Semantic mapping loaded from {cache_path}.")
+                return
+
+        assignment = self._resolve_semantics(terrain_prim_path, class_keywords)
+        self._apply_semantics(assignment)
+
+        if cache_path is not None:
+            try:
+                with open(cache_path, "w") as stream:
+                    json.dump({"key": cache_key, "assignment": assignment}, stream)
+            except OSError:
+                carb.log_warn(f"Could not save the semantic mapping to {cache_path}.")
         carb.log_info("Semantic mapping done.")
 
-        return
+    @staticmethod
+    def _resolve_semantics(terrain_prim_path: str, class_keywords: dict) -> dict[str, str]:
+        """Assign a semantic class to every mesh below the terrain prim.
+
+        The meshes (xforms and meshes below scopes) are matched by their lower case name against the keywords of the
+        classes, the first class in the mapping with a keyword included in the name is assigned. Unmatched meshes are
+        resolved by their child meshes. The class is set on all ``HierarchicalInstancedStaticMesh`` prims in the
+        subtree of a matched mesh, or on the mesh itself if it has none. Unmatched instances share the semantics of
+        the prim they reference and are only resolved if that prim is assigned a class or if their prototype is
+        already labelled.
+
+        Returns:
+            Mapping from prim path to semantic class.
+        """
+        index = StageIndex.get()
+
+        # compile the keywords into one pattern, a lookahead finds the keywords at every position of the name and the
+        # alternatives are ordered by the class order, i.e. the first match at a position has the highest priority
+        class_names = list(class_keywords.keys())
+        keyword_to_class: dict[str, int] = {}
+        for class_idx, keywords in enumerate(class_keywords.values()):
+            for keyword in keywords:
+                keyword_to_class.setdefault(keyword.lower(), class_idx)
+        pattern = re.compile("(?=(" + "|".join(re.escape(keyword) for keyword in keyword_to_class) + "))")
+
+        @functools.lru_cache(maxsize=None)
+        def match_class(mesh_name: str) -> int | None:
+            matches = [keyword_to_class[match.group(1)] for match in pattern.finditer(mesh_name)]
+            return min(matches) if matches else None
+
+        # prims to which the semantic labels are added instead of the matched mesh
+        instanced_idx = index.name_to_idx.get("HierarchicalInstancedStaticMesh", [])
+
+        def find_meshes(root_idx: int) -> list[int]:
+            # same search as get_mesh_prims: xforms and meshes are collected, only scopes are searched further
+            found, idx = [], root_idx + 1
+            while idx < index.subtree_end[root_idx]:
+                if index.type_names[idx] in ("Xform", "Mesh"):
+                    found.append(idx)
+                    idx = index.subtree_end[idx]
+                elif index.type_names[idx] == "Scope":
+                    idx += 1
+                else:
+                    idx = index.subtree_end[idx]
+            return found
+
+        @functools.lru_cache(maxsize=None)
+        def prototype_labelled(prototype_path: str) -> bool:
+            prototype = index.stage.GetPrimAtPath(prototype_path)
+            return any("Semantics" in get_semantics(prim) for prim in Usd.PrimRange(prototype))
+
+        def resolve_instance(mesh_idx: int) -> bool:
+            # the children of instances are not traversed, they share the semantics of the referenced prim
+            prim = index.prims[mesh_idx]
+            for prim_spec in prim.GetPrimStack():
+                for reference in prim_spec.referenceList.GetAddedOrExplicitItems():
+                    source_path = reference.primPath.pathString
+                    # internal references, e.g. the instanceable duplicates of mesh_duplicator
+                    if not reference.assetPath and index.has_path(source_path):
+                        if resolve(index.path_to_idx[source_path]):
+                            return True
+            # instances of external assets keep the labels of their prototype
+            prototype = prim.GetPrototype()
+            return prototype.IsValid() and prototype_labelled(prototype.GetPath().pathString)
+
+        @functools.lru_cache(maxsize=None)
+        def resolve(mesh_idx: int) -> bool:
+            class_idx = match_class(index.prims[mesh_idx].GetName().lower())
+            if class_idx is None and index.instances[mesh_idx]:
+                return resolve_instance(mesh_idx)
+            if class_idx is None:
+                # resolve by the child meshes, all children have to be investigated
+                return any([resolve(child_idx) for child_idx in find_meshes(mesh_idx)])
+            # NOTE: the range includes the mesh itself
+            start, end = mesh_idx, index.subtree_end[mesh_idx]
+            submeshes = instanced_idx[bisect.bisect_left(instanced_idx, start) : bisect.bisect_left(instanced_idx, end)]
+            for prim_idx in submeshes if submeshes else [mesh_idx]:
+                assignment[index.prims[prim_idx].GetPath().pathString] = class_names[class_idx]
+            return True
+
+        assert index.has_path(terrain_prim_path), f"Prim path '{terrain_prim_path}' is not valid"
+        mesh_prims_idx = find_meshes(index.path_to_idx[terrain_prim_path])
+        carb.log_info(f"Total of {len(mesh_prims_idx)} meshes in the scene, start assigning semantic class ...")
+
+        assignment: dict[str, str] = {}
+        missing = [index.prims[mesh_idx].GetName() for mesh_idx in mesh_prims_idx if not resolve(mesh_idx)]
+        assert len(assignment) > 0, "No mesh is assigned a semantic class!"
+        assert (
+            len(missing) == 0
+        ), f"Not all meshes are assigned a semantic class! Following mesh names are included yet: {missing}"
+        return assignment
+
+    @staticmethod
+    def _apply_semantics(assignment: dict[str, str]) -> bool:
+        """Add the semantic classes of the assignment, returns False if a prim of the assignment does not exist."""
+        prims = [prim_utils.get_prim_at_path(prim_path) for prim_path in assignment]
+        if not all(prim.IsValid() for prim in prims):
+            return False
+        for prim, class_name in zip(prims, assignment.values()):
+            add_update_semantics(prim, class_name)
+        return True
+
+    def _get_semantics_cache(self, class_keywords: dict) -> tuple[str | None, str | None]:
+        """Path and key of the semantic assignment sidecar of the USD file.
+
+        The key covers the USD file (path, size and modification time), the class mapping and the duplication
+        configurations as they add prims to the terrain."""
+        if not self.cfg.semantics_cache:
+            return None, None
+        key = self._hash_scene_inputs(
+            self.cfg,
+            [],
+            json.dumps(class_keywords, sort_keys=True) + f"instanceable={self.cfg.duplicate_instanceable}",
+        )
+        if key is None:
+            return None, None
+        return os.path.splitext(self.cfg.usd_path)[0] + ".semantics.json", key
+
+    @staticmethod
+    def _hash_scene_inputs(cfg: UnRealImporterCfg, files: list[str | None], extra: str = "") -> str | None:
+        """Hash of the USD file (path, size and modification time), the duplication configurations and the given
+        files and string. None if the USD file is not a local file."""
+        if cfg.usd_path is None or not os.path.isfile(cfg.usd_path):
+            return None
+
+        usd_stat = os.stat(cfg.usd_path)
+        key = hashlib.sha256()
+        key.update(f"{os.path.abspath(cfg.usd_path)}:{usd_stat.st_size}:{usd_stat.st_mtime_ns}".encode())
+        key.update(extra.encode())
+        duplicate_cfg_files = cfg.duplicate_cfg_file or []
+        if isinstance(duplicate_cfg_files, str):
+            duplicate_cfg_files = [duplicate_cfg_files]
+        for file in list(duplicate_cfg_files) + files:
+            if file is not None:
+                with open(file, "rb") as stream:
+                    key.update(stream.read())
+        return key.hexdigest()
 
     """ Modify Mesh """
 
@@ -170,16 +315,22 @@ class UnRealImporter(TerrainImporter):
                             curr_prim_path + f"_tr{translation_idx}_cp{copy_idx}" + value.get("suffix", "")
                         )
 
-                        success = omni.usd.duplicate_prim(
-                            stage=stage,
-                            prim_path=curr_prim_path,
-                            path_to=new_prim_path,
-                            duplicate_layers=True,
-                        )
-                        assert success, f"Failed to duplicate prim '{curr_prim_path}'"
-
-                        # get crosswalk prim
-                        prim = prim_utils.get_prim_at_path(new_prim_path)
+                        if self.cfg.duplicate_instanceable:
+                            # instanceable reference, shares the prototype (incl. semantics and collision) of the source
+                            prim = stage.DefinePrim(new_prim_path)
+                            prim.GetReferences().AddInternalReference(curr_prim_path)
+                            prim.SetInstanceable(True)
+                        else:
+                            success = omni.usd.duplicate_prim(
+                                stage=stage,
+                                prim_path=curr_prim_path,
+                                path_to=new_prim_path,
+                                duplicate_layers=True,
+                            )
+                            assert success, f"Failed to duplicate prim '{curr_prim_path}'"
+
+                            # get crosswalk prim
+                            prim = prim_utils.get_prim_at_path(new_prim_path)
                         xform = UsdGeom.Mesh(prim).AddTranslateOp()
                         xform.Set(
                             Gf.Vec3d(curr_translation[0], curr_translation[1], curr_translation[2]) * (copy_idx + 1)
@@ -25,16 +25,35 @@ class UnRealImporterCfg(TerrainImporterCfg):
 
     If set, semantic classes will be added to the scene. Default is None."""
 
+    semantics_cache: bool = True
+    """Save the resolved semantic classes next to the USD file (``<usd_name>.semantics.json``).
+
+    Later loads of the same USD file with the same mapping and duplication configurations apply the saved assignment
+    instead of matching all meshes again. Default is True."""
+
     duplicate_cfg_file: str | list | None = None
     """Configuration file(s) to duplicate prims in the scene.
 
     Selected prims are clone by the provoided factor and moved to the defined location. Default is None."""
 
+    duplicate_instanceable: bool = False
+    """Express the duplicates as instanceable references to the source prim instead of deep copies.
+
+    The duplicates share the prototype of the source prim, including its semantic labels and collision properties,
+    which reduces the stage size, load time and memory. Default is False."""
+
     people_config_file: str | None = None
     """Path to the people configuration file.
 
     If set, people define in the Nvidia Nuclues can be added to the scene. Default is None."""
 
+    bake_scene: bool = False
+    """Save the prepared scene (duplicated meshes, people and semantic labels) as flattened USD layer.
+
+    The layer is saved next to the USD file and named by the hash of the USD file and the duplication, people and
+    semantic mapping files. Later runs with the same inputs directly load the baked layer and skip the preparation.
+    Default is False."""
+
     # add Groundplane to the scene
     groundplane: bool = True
     # up axis
@@ -0,0 +1,96 @@
+# Copyright (c) 2024 ETH Zurich (Robotic Systems Lab)
+# Author: Pascal Roth, Ziqi Fan
+# All rights reserved.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+
+"""
+Utility to convert many OBJ files into USD format.
+
+The conversions run concurrently with the Asset Converter extension from Isaac Sim (``omni.kit.asset_converter``).
+Files whose content (OBJ file, material libraries and import settings) did not change since the last conversion are
+skipped. A manifest of the USD files, content hashes and errors is saved in the output directory.
+
+
+positional arguments:
+  input               OBJ files or directories of OBJ files.
+
+optional arguments:
+  -h, --help                Show this help message and exit
+  --output_dir              Directory to store the USD files and the manifest.
+  --max_concurrent          Maximum number of concurrent conversions.
+  --timeout                 Maximum duration of a conversion in seconds.
+  --force                   Convert all files, even if they did not change.
+  --no_recursive            Only convert the OBJ files directly in the input directories.
+
+"""
+
+"""Launch Isaac Sim Simulator first."""
+
+import argparse
+
+from omni.isaac.lab.app import AppLauncher
+
+# add argparse arguments
+parser = argparse.ArgumentParser(description="Utility to convert many OBJ files into USD format.")
+parser.add_argument("input", type=str, nargs="+", help="OBJ files or directories of OBJ files.")
+parser.add_argument("--output_dir", type=str, required=True, help="Directory to store the USD files and the manifest.")
+parser.add_argument("--max_concurrent", type=int, default=4, help="Maximum number of concurrent conversions.")
+parser.add_argument("--timeout", type=float, default=None, help="Maximum duration of a conversion in seconds.")
+parser.add_argument("--force", action="store_true", default=False, help="Convert all files, even if unchanged.")
+parser.add_argument("--no_recursive", action="store_true", default=False, help="Do not search subdirectories.")
+# append AppLauncher cli args
+AppLauncher.add_app_launcher_args(parser)
+# parse the arguments
+args_cli = parser.parse_args()
+
+# launch omniverse app
+app_launcher = AppLauncher(args_cli)
+simulation_app = app_launcher.app
+
+"""Rest everything follows."""
+
+import sys
+
+from omni.isaac.lab.utils.dict import print_dict
+from omni.viplanner.importer.utils.obj_converter import ObjBatchConverter
+from omni.viplanner.importer.utils.obj_converter_cfg import (
+    ObjBatchConverterCfg,
+    ObjConverterCfg,
+)
+
+
+def main() -> int:
+    # Create batch converter config
+    batch_cfg = ObjBatchConverterCfg(
+        input_paths=args_cli.input,
+        output_dir=args_cli.output_dir,
+        recursive=not args_cli.no_recursive,
+        max_concurrent=args_cli.max_concurrent,
+        timeout=args_cli.timeout,
+        force_conversion=args_cli.force,
+        obj_converter_cfg=ObjConverterCfg(asset_path=""),
+    )
+
+    # Print info
+    print("-" * 80)
+    print("-" * 80)
+    print("OBJ batch converter config:")
+    print_dict(batch_cfg.to_dict(), nesting=0)
+    print("-" * 80)
+    print("-" * 80)
+
+    # Convert the files
+    results = ObjBatchConverter(batch_cfg).convert()
+    failed = {obj_path: entry["error"] for obj_path, entry in results.items() if entry["status"] == "failed"}
+    for obj_path, error in failed.items():
+        print(f"[ERROR] {obj_path}: {error}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    # run the main function
+    exit_code = main()
+    # close sim app
+    simulation_app.close()
+    sys.exit(exit_code)
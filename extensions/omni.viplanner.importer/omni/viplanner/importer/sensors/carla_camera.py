@@ -6,6 +6,7 @@
 
 from __future__ import annotations
 
+import functools
 from typing import TYPE_CHECKING, Any
 
 import torch
@@ -16,14 +17,26 @@ from omni.viplanner.collectors.configs.viplanner_sem_meta import VIPlannerSemMet
 if TYPE_CHECKING:
     from .carla_camera_cfg import VIPlannerCarlaCameraCfg
 
-# initialize viplanner config
-VIPLANNER_SEM_META = VIPlannerSemMetaHandler()
+
+@functools.lru_cache(maxsize=1)
+def _viplanner_sem_meta() -> VIPlannerSemMetaHandler:
+    """VIPlanner semantic classes, initialized on first use instead of at import."""
+    return VIPlannerSemMetaHandler()
 
 
 class VIPlannerCarlaCamera(Camera):
 
     cfg: VIPlannerCarlaCameraCfg
 
+    def __init__(self, cfg: VIPlannerCarlaCameraCfg):
+        super().__init__(cfg)
+
+        # cached mapping from the semantic ids of the annotator to the VIPlanner colors
+        self._sem_signature: tuple | None = None
+        self._sem_id_to_color: dict = {}
+        self._sem_mapping: torch.Tensor | None = None
+        self._sem_buffer: torch.Tensor | None = None
+
     def _process_annotator_output(self, name: str, output: Any) -> tuple[torch.tensor, dict | None]:
         """Process the annotator output.
 
@@ -44,30 +57,24 @@ class VIPlannerCarlaCamera(Camera):
         #   so we need to convert them to uint8 4 channel images for colorized types
         height, width = self.image_shape
         if name == "semantic_segmentation":
-            info = info["idToLabels"]
-            # assign each key a color from the VIPlanner color space
-            info = {
-                int(k): (
-                    VIPLANNER_SEM_META.class_color["static"]
-                    if v["class"] in ("BACKGROUND", "UNLABELLED")
-                    else VIPLANNER_SEM_META.class_color[v["class"]]
-                )
-                for k, v in info.items()
-            }
-            # create recolored images
-            output = torch.zeros((*data.shape[:3], 3), device=self.device, dtype=torch.uint8)
-            # NOTE: the label_ids and the ids in the data might not be the same, label ids might not be continuous and
-            #       might not start from 0 as well as some data ids might not be present in the label ids
-            unique_data_ids = torch.unique(data).sort()[0]
-            mapping = torch.zeros(
-                (max(unique_data_ids.max() + 1, max(info.keys()) + 1), 3), dtype=torch.uint8, device=self.device
-            )
-            mapping[list(info.keys())] = torch.tensor(list(info.values()), dtype=torch.uint8, device=self.device)
-            output = mapping[data.long().squeeze(-1)]
+            # labels rarely change between frames, only rebuild the mapping when they do
+            signature = tuple((k, v["class"]) for k, v in info["idToLabels"].items())
+            if signature != self._sem_signature:
+                self._update_semantic_mapping(info["idToLabels"], signature)
+            info = self._sem_id_to_color
             if self.cfg.colorize_semantic_segmentation:
                 data = data.view(torch.uint8).reshape(height, width, -1)
             else:
-                data = output
+                # NOTE: the label_ids and the ids in the data might not be the same, label ids might not be continuous
+                #       and might not start from 0 as well as some data ids might not be present in the label ids.
+                #       Ids outside the mapping are clamped to its last row which is assigned to the "static" class.
+                ids = torch.clamp(data.view(-1), max=self._sem_mapping.shape[0] - 1).long()
+                if self._sem_buffer is None or self._sem_buffer.shape[0] != ids.shape[0]:
+                    self._sem_buffer = torch.empty(
+                        (ids.shape[0], self._sem_mapping.shape[1]), dtype=torch.uint8, device=self.device
+                    )
+                torch.index_select(self._sem_mapping, 0, ids, out=self._sem_buffer)
+                data = self._sem_buffer.view(height, width, -1)
         elif name == "instance_segmentation_fast":
             if self.cfg.colorize_instance_segmentation:
                 data = data.view(torch.uint8).reshape(height, width, -1)
@@ -91,3 +98,46 @@ class VIPlannerCarlaCamera(Camera):
 
         # return the data and info
         return data, info
+
+    """
+    Helper functions
+    """
+
+    def _update_semantic_mapping(self, id_to_labels: dict, signature: tuple):
+        """Update the cached mapping from the semantic ids of the annotator to the VIPlanner colors.
+
+        If :attr:`VIPlannerCarlaCameraCfg.semantic_class_ids` is set, the ids are mapped to the VIPlanner class ids
+        instead. Ids that are not part of the labels are assigned to the "static" class, which also covers everything
+        unknown. The mapping is only grown, i.e. ids of previous labels stay valid until they are reassigned."""
+        # assign each key a class from the VIPlanner classes
+        id_to_class = {
+            int(k): "static" if v["class"] in ("BACKGROUND", "UNLABELLED") else v["class"]
+            for k, v in id_to_labels.items()
+        }
+        self._sem_id_to_color = {k: _viplanner_sem_meta().class_color[v] for k, v in id_to_class.items()}
+        if self.cfg.semantic_class_ids:
+            values = [[_viplanner_sem_meta().class_id[v]] for v in id_to_class.values()]
+            fallback = [_viplanner_sem_meta().class_id["static"]]
+        else:
+            values = list(self._sem_id_to_color.values())
+            fallback = _viplanner_sem_meta().class_color["static"]
+
+        # ids not present in the labels (gaps and the last row for ids out of range) are mapped to the fallback
+        fallback = torch.tensor(fallback, dtype=torch.uint8, device=self.device)
+        size = max(id_to_class.keys()) + 2
+        if self._sem_mapping is None or self._sem_mapping.shape[0] < size:
+            mapping = fallback.repeat(size, 1)
+            if self._sem_mapping is not None:
+                mapping[: self._sem_mapping.shape[0] - 1] = self._sem_mapping[:-1]
+            self._sem_mapping = mapping
+        self._sem_mapping[list(id_to_class.keys())] = torch.tensor(values, dtype=torch.uint8, device=self.device)
+        self._sem_signature = signature
+
+    """
+    Properties
+    """
+
+    @property
+    def palette(self) -> torch.Tensor:
+        """Colors of the VIPlanner class ids, used when the semantics are given as class ids."""
+        return torch.tensor(_viplanner_sem_meta().colors, dtype=torch.uint8, device=self.device)
@@ -15,3 +15,8 @@ class VIPlannerCarlaCameraCfg(CameraCfg):
     """Configuration for a camera sensor."""
 
     class_type: type = VIPlannerCarlaCamera
+
+    semantic_class_ids: bool = False
+    """Output the semantic segmentation as uint8 class ids of shape (H, W, 1) instead of RGB colors.
+
+    The colors of the class ids are given by the ``palette`` of the camera. Default is False."""
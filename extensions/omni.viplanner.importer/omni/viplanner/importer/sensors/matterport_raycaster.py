@@ -12,9 +12,7 @@ from typing import TYPE_CHECKING, ClassVar
 
 import numpy as np
 import omni.physics.tensors.impl.api as physx
-import pandas as pd
 import torch
-import trimesh
 import warp as wp
 from omni.isaac.core.prims import XFormPrimView
 from omni.isaac.lab.sensors.ray_caster import RayCaster
@@ -62,6 +60,8 @@ class MatterportRayCaster(RayCaster):
         self._data = MatterportRayCasterData()
 
     def _initialize_impl(self):
+        import pandas as pd
+
         super()._initialize_impl()
 
         # load categort id to class mapping (name and id of mpcat40 redcued class set)
@@ -74,6 +74,8 @@ class MatterportRayCaster(RayCaster):
         self._data.ray_class_ids = torch.zeros(self._num_envs, self.num_rays, device=self._device, dtype=torch.long)
 
     def _initialize_warp_meshes(self):
+        import trimesh
+
         # check if mesh is already loaded
         assert len(self.cfg.mesh_prim_paths) == 1, "Currently only one Matterport Environment is supported."
 
@@ -13,9 +13,7 @@ from typing import ClassVar
 import carb
 import numpy as np
 import omni.isaac.lab.utils.math as math_utils
-import pandas as pd
 import torch
-import trimesh
 import warp as wp
 from omni.isaac.lab.sensors import RayCasterCamera, RayCasterCameraCfg
 from omni.isaac.lab.utils.warp import raycast_mesh
@@ -56,6 +54,8 @@ class MatterportRayCasterCamera(RayCasterCamera):
             )
 
     def _initialize_impl(self):
+        import pandas as pd
+
         super()._initialize_impl()
 
         # load categort id to class mapping (name and id of mpcat40 redcued class set)
@@ -66,6 +66,8 @@ class MatterportRayCasterCamera(RayCasterCamera):
         self._color_mapping()
 
     def _color_mapping(self):
+        import pandas as pd
+
         # load defined colors for mpcat40
         mapping_40 = pd.read_csv(DATA_DIR + "/matterport/mpcat40.tsv", sep="\t")
         color = mapping_40["hex"].to_numpy()
@@ -74,8 +76,13 @@ class MatterportRayCasterCamera(RayCasterCamera):
             device=self._device,
             dtype=torch.uint8,
         )
+        # class ids are the mpcat40 indices, the palette are their colors
+        self.class_ids = torch.arange(self.color.shape[0], device=self._device, dtype=torch.uint8)
+        self.palette = self.color
 
     def _initialize_warp_meshes(self):
+        import trimesh
+
         # only one mesh is supported
         assert len(self.cfg.mesh_prim_paths) == 1, "Currently only one Matterport Environment is supported."
 
@@ -171,10 +178,15 @@ class MatterportRayCasterCamera(RayCasterCamera):
             ]
             # map category index to reduced set
             face_id_mpcat40 = self.mapping_mpcat40[face_id.type(torch.long) - 1]
-            # get the color of the face
-            face_color = self.color[face_id_mpcat40]
-            # reshape and transpose to get the correct orientation
-            self._data.output["semantic_segmentation"][env_ids] = face_color.view(-1, *self.image_shape, 3)
+            if self.cfg.semantic_class_ids:
+                # get the class id of the face, colors are given by the palette
+                face_class_id = self.class_ids[face_id_mpcat40]
+                self._data.output["semantic_segmentation"][env_ids] = face_class_id.view(-1, *self.image_shape, 1)
+            else:
+                # get the color of the face
+                face_color = self.color[face_id_mpcat40]
+                # reshape and transpose to get the correct orientation
+                self._data.output["semantic_segmentation"][env_ids] = face_color.view(-1, *self.image_shape, 3)
 
     def _create_buffers(self):
         """Create the buffers to store data."""
@@ -200,7 +212,8 @@ class MatterportRayCasterCamera(RayCasterCamera):
                 shape = (self.cfg.pattern_cfg.height, self.cfg.pattern_cfg.width, 3)
                 dtype = torch.float32
             elif name in ["semantic_segmentation"]:
-                shape = (self.cfg.pattern_cfg.height, self.cfg.pattern_cfg.width, 3)
+                channels = 1 if self.cfg.semantic_class_ids else 3
+                shape = (self.cfg.pattern_cfg.height, self.cfg.pattern_cfg.width, channels)
                 dtype = torch.uint8
             else:
                 raise ValueError(f"Unknown data type: {name}")
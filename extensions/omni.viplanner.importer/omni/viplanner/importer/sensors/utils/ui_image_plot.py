@@ -4,6 +4,10 @@
 #
 # SPDX-License-Identifier: BSD-3-Clause
 
+from __future__ import annotations
+
+import time
+
 import numpy as np
 import omni.ui as ui
 from omni.isaac.ui.element_wrappers.base_ui_element_wrappers import UIWidgetWrapper
@@ -11,7 +15,16 @@ from omni.kit.window.property.templates import LABEL_WIDTH
 
 
 class ImagePlot(UIWidgetWrapper):
-    def __init__(self, image: np.ndarray = None, label: str = "", widget_height=200, show_min_max=True, unit=(1, "")):
+    def __init__(
+        self,
+        image: np.ndarray = None,
+        label: str = "",
+        widget_height=200,
+        show_min_max=True,
+        unit=(1, ""),
+        max_update_rate: float | None = 10.0,
+        sample_stride: int = 8,
+    ):
         """Create an XY plot UI Widget with axis scaling, legends, and support for multiple plots.
         Overlapping data is most accurately plotted when centered in the frame with reasonable axis scaling.
         Pressing down the mouse gives the x and y values of each function at an x coordinate.
@@ -21,12 +34,26 @@ class ImagePlot(UIWidgetWrapper):
             widget_height (int): Height of the plot in pixels
             show_min_max (bool): Whether to show the min and max values of the image
             unit (tuple): Tuple of (scale, name) for the unit of the image
+            max_update_rate (float): Maximum number of image updates per second, None for no limit
+            sample_stride (int): Pixel stride of the subsample used to estimate the value range of depth images
         """
 
         self._show_min_max = show_min_max
         self._unit_scale = unit[0]
         self._unit_name = unit[1]
 
+        # update throttling
+        self._min_update_period = 1.0 / max_update_rate if max_update_rate else 0.0
+        self._last_update = -np.inf
+        self._sample_stride = sample_stride
+
+        # preallocated buffers, reallocated when the image shape changes
+        self._rgba: np.ndarray | None = None
+        self._rgb: np.ndarray | None = None
+        self._scaled: np.ndarray | None = None
+        self._index: np.ndarray | None = None
+        self._colormap = self._get_colormap()
+
         self._has_built = False
 
         self._enabled = False
@@ -49,23 +76,47 @@ class ImagePlot(UIWidgetWrapper):
     def setEnabled(self, enabled: bool):
         self._enabled = enabled
 
-    def update_image(self, image: np.ndarray):
+    @property
+    def needs_update(self) -> bool:
+        """Whether the next image update would be displayed, used to skip fetching images that would be dropped."""
+        return self._enabled and time.perf_counter() - self._last_update >= self._min_update_period
+
+    def update_image(self, image: np.ndarray, force: bool = False) -> bool:
+        """Update the displayed image.
+
+        Single-channel float images (e.g. depth) are mapped with a colormap over their value range, estimated on a
+        subsample of the image. Updates faster than the maximum update rate are skipped unless forced.
+
+        Returns:
+            Whether the image has been updated.
+        """
         if not self._enabled:
-            return
+            return False
+        now = time.perf_counter()
+        if not force and now - self._last_update < self._min_update_period:
+            return False
+        self._last_update = now
+
+        if image.ndim == 3 and image.shape[2] == 1:
+            image = image[..., 0]
         height, width = image.shape[:2]
+        self._allocate_buffers(height, width)
 
         # convert image to 4-channel RGBA
-        if image.ndim == 2:
-            image = np.dstack((image, image, image, np.full((height, width, 1), 255, dtype=np.uint8)))
-        elif image.ndim == 3:
-            if image.shape[2] == 3:
-                image = np.dstack((image, np.full((height, width, 1), 255, dtype=np.uint8)))
+        if image.ndim == 2 and image.dtype != np.uint8:
+            self._colorize(image)
+        elif image.ndim == 2:
+            self._rgba[..., :3] = image[..., None]
+        else:
+            self._rgba[..., :3] = image[..., :3]
 
-        self._byte_provider.set_bytes_data(image.flatten().data, [width, height])
+        self._byte_provider.set_bytes_data(self._rgba.reshape(-1).data, [width, height])
+        return True
 
     def update_min_max(self, image: np.ndarray):
         if self._show_min_max and hasattr(self, "_min_max_label"):
-            non_inf = image[np.isfinite(image)].flatten()
+            # estimate on a subsample of the image
+            non_inf = self._get_finite_subsample(image)
             if len(non_inf) > 0:
                 self._min_max_label.text = self._get_unit_description(
                     np.min(non_inf), np.max(non_inf), np.median(non_inf)
@@ -73,6 +124,50 @@ class ImagePlot(UIWidgetWrapper):
             else:
                 self._min_max_label.text = self._get_unit_description(0, 0)
 
+    """
+    Helper functions - image conversion.
+    """
+
+    def _allocate_buffers(self, height: int, width: int):
+        if self._rgba is not None and self._rgba.shape[:2] == (height, width):
+            return
+        self._rgba = np.full((height, width, 4), 255, dtype=np.uint8)
+        self._rgb = np.empty((height, width, 3), dtype=np.uint8)
+        self._scaled = np.empty((height, width), dtype=np.float32)
+        self._index = np.empty((height, width), dtype=np.uint8)
+
+    def _get_finite_subsample(self, image: np.ndarray) -> np.ndarray:
+        subsample = image[:: self._sample_stride, :: self._sample_stride]
+        return subsample[np.isfinite(subsample)]
+
+    def _colorize(self, image: np.ndarray):
+        """Map a single-channel image into the preallocated RGBA buffer."""
+        finite = self._get_finite_subsample(image)
+        min_value, max_value = (float(finite.min()), float(finite.max())) if len(finite) > 0 else (0.0, 1.0)
+        scale = 255.0 / max(max_value - min_value, 1e-6)
+
+        np.subtract(image, min_value, out=self._scaled, casting="unsafe")
+        np.multiply(self._scaled, scale, out=self._scaled)
+        np.nan_to_num(self._scaled, copy=False, nan=0.0, posinf=255.0, neginf=0.0)
+        np.clip(self._scaled, 0, 255, out=self._scaled)
+        np.copyto(self._index, self._scaled, casting="unsafe")
+        np.take(self._colormap, self._index, axis=0, out=self._rgb)
+        self._rgba[..., :3] = self._rgb
+
+    @staticmethod
+    def _get_colormap() -> np.ndarray:
+        """Jet-like colormap with 256 entries."""
+        x = np.linspace(0, 1, 256)
+        colormap = np.stack(
+            (
+                np.clip(1.5 - np.abs(4 * x - 3), 0, 1),
+                np.clip(1.5 - np.abs(4 * x - 2), 0, 1),
+                np.clip(1.5 - np.abs(4 * x - 1), 0, 1),
+            ),
+            axis=1,
+        )
+        return (colormap * 255).astype(np.uint8)
+
     def _create_ui_widget(self):
         containing_frame = ui.Frame(build_fn=self._build_widget)
         return containing_frame
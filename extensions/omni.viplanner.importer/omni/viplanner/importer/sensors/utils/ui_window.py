@@ -18,6 +18,8 @@ from omni.isaac.lab.scene import InteractiveScene
 from omni.isaac.lab.sim import SimulationContext
 from omni.kit.window.extensions import SimpleCheckBox
 
+from .ui_image_plot import ImagePlot
+
 
 class SensorWindow:
     """Window manager for the ray caster camera window.
@@ -25,17 +27,31 @@ class SensorWindow:
     This class creates a window that is used to display an image of the camera feed.
     """
 
-    def __init__(self, sim: SimulationContext, scene: InteractiveScene, window_name: str = "MatterportExtension"):
+    def __init__(
+        self,
+        sim: SimulationContext,
+        scene: InteractiveScene,
+        window_name: str = "MatterportExtension",
+        preview_max_update_rate: float = 5.0,
+    ):
         """Initialize the window.
 
         Args:
             env: The environment object.
             window_name: The name of the window. Defaults to "Orbit".
+            preview_max_update_rate: Maximum number of updates per second of the camera image previews.
+                Defaults to 5.0.
         """
         # save scene
         self.scene = scene
         self.sim = sim
 
+        # image previews of the cameras, only enabled previews are fetched and updated
+        self._preview_max_update_rate = preview_max_update_rate
+        self._image_plots: dict[tuple[str, str], ImagePlot] = {}
+        self._preview_env_idx = 0
+        self._preview_handle = None
+
         # Listeners for environment selection changes
         self._env_selection_listeners: list = []
 
@@ -60,9 +76,22 @@ class SensorWindow:
                 self._build_viewer_frame()
                 # create collapsible frame for debug visualization
                 self._build_debug_vis_frame()
+                # create collapsible frame for the image previews
+                self._build_image_preview_frame()
+
+        # update the previews after every app update
+        self._preview_handle = (
+            omni.kit.app.get_app()
+            .get_post_update_event_stream()
+            .create_subscription_to_pop(lambda event, obj=weakref.proxy(self): obj._update_image_previews())
+        )
 
     def __del__(self):
         """Destructor for the window."""
+        # remove the preview subscription
+        if self._preview_handle is not None:
+            self._preview_handle.unsubscribe()
+            self._preview_handle = None
         # destroy the window
         if self.ui_window is not None:
             self.ui_window.visible = False
@@ -142,6 +171,29 @@ class SensorWindow:
                     if elem is not None:
                         self._create_debug_vis_ui_element(name, elem)
 
+    def _build_image_preview_frame(self):
+        """Builds the image preview frame for all camera sensors.
+
+        Every data type of a camera gets its own preview which is disabled by default.
+        """
+        self.ui_window_elements["preview_frame"] = omni.ui.CollapsableFrame(
+            title="Camera Previews",
+            width=omni.ui.Fraction(1),
+            height=0,
+            collapsed=True,
+            style=ui_utils.get_style(),
+            horizontal_scrollbar_policy=omni.ui.ScrollBarPolicy.SCROLLBAR_AS_NEEDED,
+            vertical_scrollbar_policy=omni.ui.ScrollBarPolicy.SCROLLBAR_ALWAYS_ON,
+        )
+        with self.ui_window_elements["preview_frame"]:
+            self.ui_window_elements["preview_vstack"] = omni.ui.VStack(spacing=5, height=0)
+            with self.ui_window_elements["preview_vstack"]:
+                for name, sensor in self.scene.sensors.items():
+                    if not hasattr(sensor.data, "output"):
+                        continue
+                    for data_type in sensor.cfg.data_types:
+                        self._create_image_preview_ui_element(name, data_type)
+
     """
     Helper functions - UI building.
     """
@@ -154,10 +206,48 @@ class SensorWindow:
             raise ValueError("Viewport camera controller is not initialized! Please check the rendering mode.")
         # store the desired env index, UI is 1-indexed
         vcc.set_view_env_index(model.as_int - 1)
+        self._preview_env_idx = model.as_int - 1
         # notify additional listeners
         for listener in self._env_selection_listeners:
             listener.set_env_selection(model.as_int - 1)
 
+    def _create_image_preview_ui_element(self, name: str, data_type: str):
+        """Create a checkbox and image plot for the preview of the given camera data type."""
+        label = f"{name.replace('_', ' ').title()} - {data_type}"
+        plot = ImagePlot(
+            label=label,
+            show_min_max="distance" in data_type or "depth" in data_type,
+            unit=(1, "m"),
+            max_update_rate=self._preview_max_update_rate,
+        )
+        with omni.ui.HStack():
+            omni.ui.Label(
+                "Show Preview",
+                width=ui_utils.LABEL_WIDTH - 12,
+                alignment=omni.ui.Alignment.LEFT_CENTER,
+                tooltip=f"Toggle the image preview of {label}.",
+            )
+            self.ui_window_elements[f"{name}_{data_type}_preview_cb"] = SimpleCheckBox(
+                model=omni.ui.SimpleBoolModel(),
+                enabled=True,
+                checked=False,
+                on_checked_fn=lambda value, p=plot: p.setEnabled(value),
+            )
+            ui_utils.add_line_rect_flourish()
+        self._image_plots[(name, data_type)] = plot
+
+    def _update_image_previews(self):
+        """Update the enabled image previews, images are only fetched for previews that are due for an update."""
+        for (name, data_type), plot in self._image_plots.items():
+            if not plot.needs_update:
+                continue
+            output = self.scene.sensors[name].data.output
+            if data_type not in output.keys():
+                continue
+            image = output[data_type][self._preview_env_idx].cpu().numpy()
+            plot.update_image(image)
+            plot.update_min_max(image)
+
     def _create_debug_vis_ui_element(self, name: str, elem: object):
         """Create a checkbox for toggling debug visualization for the given element."""
         with omni.ui.HStack():
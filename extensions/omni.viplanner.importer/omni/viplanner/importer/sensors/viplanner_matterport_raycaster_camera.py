@@ -22,3 +22,10 @@ class VIPlannerMatterportRayCasterCamera(MatterportRayCasterCamera):
             map_mpcat40_to_vip_sem = yaml.safe_load(file)
         color = viplanner_sem.get_colors_for_names(list(map_mpcat40_to_vip_sem.values()))
         self.color = torch.tensor(color, device=self._device, dtype=torch.uint8)
+        # class ids are the VIPlanner class ids, the palette are their colors
+        self.class_ids = torch.tensor(
+            viplanner_sem.get_ids_for_names(list(map_mpcat40_to_vip_sem.values())),
+            device=self._device,
+            dtype=torch.uint8,
+        )
+        self.palette = torch.tensor(viplanner_sem.colors, device=self._device, dtype=torch.uint8)
@@ -16,3 +16,8 @@ class VIPlannerMatterportRayCasterCameraCfg(RayCasterCameraCfg):
 
     class_type = VIPlannerMatterportRayCasterCamera
     """Name of the specific matterport ray caster camera class."""
+
+    semantic_class_ids: bool = False
+    """Output the semantic segmentation as uint8 class ids of shape (H, W, 1) instead of RGB colors.
+
+    The colors of the class ids are given by the ``palette`` of the camera. Default is False."""
@@ -7,16 +7,20 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
+import json
+import os
+import re
+import time
 
 import carb
 import omni.kit.commands
 import omni.usd
 from omni.isaac.core.utils.extensions import enable_extension
-from omni.isaac.lab.sim import SimulationCfg, SimulationContext
 from omni.isaac.lab.sim.converters.asset_converter_base import AssetConverterBase
 from pxr import Usd
 
-from .obj_converter_cfg import ObjConverterCfg
+from .obj_converter_cfg import ObjBatchConverterCfg, ObjConverterCfg
 
 # Enable asset converter extension
 enable_extension("omni.kit.asset_converter")
@@ -65,56 +69,23 @@ class ObjConverter(AssetConverterBase):
     def _convert_asset(self):
         """Calls underlying Omniverse command to convert obj to USD.
 
-        Args:
-            cfg: The obj conversion configuration.
+        Raises:
+            RuntimeError: If the conversion failed.
         """
-        # setup converter
-        self.task_manager = converter.extension.AssetImporterExtension()
-
-        self.success = False
-        print("START CONVERSION")
-        asyncio.ensure_future(self.convert_asset_to_usd)
-
-        # init the simulation context
-        print("START RENDERING")
-        sim = SimulationCfg(SimulationContext())
-        while not self.success:
-            sim.render()
-        print("END RENDERING")
-
-        # fix the issue that material paths are not relative
-        # note: This issue seems to have popped up in Isaac Sim 2023.1.1
-        stage = Usd.Stage.Open(self.usd_path)
-        # resolve all paths relative to layer path
-        source_layer = stage.GetRootLayer()
-        omni.usd.resolve_paths(source_layer.identifier, source_layer.identifier)
-        stage.Save()
-
-    async def convert_asset_to_usd(self):
-        # get config
-        print("GET CONFIG")
         import_config = self._get_obj_import_config(self.cfg)
-
-        # set task
-        print("CREATE CONVERTER TASK")
-        task = self.task_manager.create_converter_task(self.usd_path, asset_converter_context=import_config)
-        self.success = await task.wait_until_finished()
-
-        print("PROCESSES HAS FINISHED")
-        # print error
-        if not self.success:
-            detailed_status_code = task.get_status()
-            detailed_status_error_string = task.get_error_message()
-            carb.log_error(
-                f"Failed to convert {self.cfg.asset_path} to {self.usd_path} "
-                f"with status {detailed_status_code} and error {detailed_status_error_string}"
-            )
+        success, error = asyncio.get_event_loop().run_until_complete(
+            convert_obj_to_usd(self.cfg.asset_path, self.usd_path, import_config)
+        )
+        if not success:
+            raise RuntimeError(f"Failed to convert {self.cfg.asset_path} to {self.usd_path}: {error}")
+        resolve_material_paths(self.usd_path)
 
     """
     Helper methods.
     """
 
-    def _get_obj_import_config(self, cfg: ObjConverterCfg) -> converter.AssetConverterContext:
+    @staticmethod
+    def _get_obj_import_config(cfg: ObjConverterCfg) -> converter.AssetConverterContext:
         """Create and fill AssetConverterContext with desired settings
 
         Args:
@@ -166,3 +137,200 @@ class ObjConverter(AssetConverterBase):
         # Only for FBX. It's to bake scales into meshes.
 
         return asset_converter_cfg
+
+
+class ObjBatchConverter:
+    """Converter for many OBJ files to USD files.
+
+    The conversions run concurrently on the event loop of the application, at most
+    :attr:`ObjBatchConverterCfg.max_concurrent` at a time. A file is skipped if the content hash of the OBJ file, its
+    material libraries and the import settings matches the hash of the previous conversion recorded in the manifest
+    and the USD file still exists.
+
+    The manifest (``<output_dir>/<manifest_file_name>``) maps each OBJ file to its USD file, content hash, status
+    (``"converted"``, ``"skipped"`` or ``"failed"``), conversion time and error message.
+    """
+
+    cfg: ObjBatchConverterCfg
+    """The configuration instance for the batch conversion."""
+
+    def __init__(self, cfg: ObjBatchConverterCfg):
+        """Initializes the class.
+
+        Args:
+            cfg: The configuration instance for the batch conversion.
+        """
+        self.cfg = cfg
+        self.manifest_path = os.path.join(os.path.abspath(cfg.output_dir), cfg.manifest_file_name)
+        self.manifest: dict[str, dict] = {}
+
+        # settings that change the output are part of the content hash
+        import_settings = cfg.obj_converter_cfg.to_dict()
+        for name in ("asset_path", "usd_dir", "usd_file_name", "force_usd_conversion"):
+            import_settings.pop(name, None)
+        self._settings_hash = json.dumps(import_settings, sort_keys=True)
+
+    def convert(self) -> dict[str, dict]:
+        """Convert all OBJ files and save the manifest.
+
+        Returns:
+            The manifest entries of the OBJ files of this run.
+        """
+        jobs = self._collect_jobs()
+        previous = self._load_manifest()
+        print(f"[INFO] Converting {len(jobs)} OBJ files to {os.path.abspath(self.cfg.output_dir)}")
+
+        async def _convert_all():
+            semaphore = asyncio.Semaphore(self.cfg.max_concurrent)
+            return await asyncio.gather(*[self._convert_file(*job, previous, semaphore) for job in jobs])
+
+        entries = asyncio.get_event_loop().run_until_complete(_convert_all())
+        results = {obj_path: entry for (obj_path, _), entry in zip(jobs, entries)}
+
+        # keep the entries of files that are not part of this run
+        self.manifest = {**previous, **results}
+        os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+        with open(self.manifest_path, "w") as f:
+            json.dump({"files": self.manifest}, f, indent=2)
+
+        status = [entry["status"] for entry in entries]
+        print(
+            f"[INFO] Converted {status.count('converted')}, skipped {status.count('skipped')} and failed "
+            f"{status.count('failed')} OBJ files. Saved manifest to {self.manifest_path}"
+        )
+        return results
+
+    """
+    Helper methods.
+    """
+
+    def _collect_jobs(self) -> list[tuple[str, str]]:
+        """OBJ files and their USD files, directories are mirrored below the output directory."""
+        input_paths = [self.cfg.input_paths] if isinstance(self.cfg.input_paths, str) else self.cfg.input_paths
+        output_dir = os.path.abspath(self.cfg.output_dir)
+
+        jobs = {}
+        for input_path in input_paths:
+            input_path = os.path.abspath(input_path)
+            if os.path.isdir(input_path):
+                for root, dirs, files in os.walk(input_path):
+                    if not self.cfg.recursive:
+                        dirs.clear()
+                    for file in sorted(files):
+                        if file.lower().endswith(".obj"):
+                            rel_path = os.path.relpath(os.path.join(root, file), input_path)
+                            jobs[os.path.join(root, file)] = os.path.join(
+                                output_dir, os.path.splitext(rel_path)[0] + ".usd"
+                            )
+            elif os.path.isfile(input_path):
+                jobs[input_path] = os.path.join(output_dir, os.path.splitext(os.path.basename(input_path))[0] + ".usd")
+            else:
+                raise ValueError(f"Invalid input path: {input_path}")
+
+        usd_paths = list(jobs.values())
+        duplicates = {usd_path for usd_path in usd_paths if usd_paths.count(usd_path) > 1}
+        if duplicates:
+            raise ValueError(f"Several OBJ files are converted to the same USD files: {sorted(duplicates)}")
+        return list(jobs.items())
+
+    def _load_manifest(self) -> dict[str, dict]:
+        if not os.path.isfile(self.manifest_path):
+            return {}
+        with open(self.manifest_path) as f:
+            return json.load(f)["files"]
+
+    def _content_hash(self, obj_path: str) -> str:
+        """Hash of the OBJ file, the material libraries it references and the import settings."""
+        key = hashlib.sha256(self._settings_hash.encode())
+        with open(obj_path, "rb") as f:
+            head = f.read(1 << 16)
+            key.update(head)
+            for chunk in iter(lambda: f.read(1 << 24), b""):
+                key.update(chunk)
+        # material libraries are declared at the top of the file
+        for mtl_name in re.findall(rb"^mtllib\s+(.+?)\s*$", head, flags=re.MULTILINE):
+            mtl_path = os.path.join(os.path.dirname(obj_path), mtl_name.decode())
+            if os.path.isfile(mtl_path):
+                with open(mtl_path, "rb") as f:
+                    key.update(f.read())
+        return key.hexdigest()
+
+    async def _convert_file(
+        self, obj_path: str, usd_path: str, previous: dict[str, dict], semaphore: asyncio.Semaphore
+    ) -> dict:
+        content_hash = self._content_hash(obj_path)
+        entry = {"usd_path": usd_path, "hash": content_hash, "status": "skipped", "time_s": 0.0, "error": None}
+
+        last_entry = previous.get(obj_path)
+        if (
+            not self.cfg.force_conversion
+            and last_entry is not None
+            and last_entry["status"] != "failed"
+            and last_entry["hash"] == content_hash
+            and os.path.isfile(usd_path)
+        ):
+            return entry
+
+        async with semaphore:
+            start = time.perf_counter()
+            os.makedirs(os.path.dirname(usd_path), exist_ok=True)
+            import_config = ObjConverter._get_obj_import_config(self.cfg.obj_converter_cfg)
+            # a failing file must not stop the other conversions
+            try:
+                success, error = await convert_obj_to_usd(obj_path, usd_path, import_config, timeout=self.cfg.timeout)
+                if success:
+                    resolve_material_paths(usd_path)
+            except Exception as e:
+                success, error = False, f"{type(e).__name__}: {e}"
+                carb.log_error(f"Failed to convert {obj_path} to {usd_path}. {error}")
+            entry["time_s"] = time.perf_counter() - start
+
+        entry["status"] = "converted" if success else "failed"
+        entry["error"] = error
+        print(f"[INFO] {entry['status'].capitalize()} {obj_path} in {entry['time_s']:.1f}s")
+        return entry
+
+
+"""
+Conversion functions.
+"""
+
+
+async def convert_obj_to_usd(
+    obj_path: str, usd_path: str, import_config: converter.AssetConverterContext, timeout: float | None = None
+) -> tuple[bool, str | None]:
+    """Convert an OBJ file to a USD file with the asset converter extension.
+
+    Args:
+        obj_path: Path of the OBJ file.
+        usd_path: Path of the USD file.
+        import_config: Settings of the asset converter.
+        timeout: Maximum duration of the conversion in seconds. Defaults to None, i.e. no limit.
+
+    Returns:
+        Whether the conversion succeeded and the error message if not.
+    """
+    task = converter.get_instance().create_converter_task(obj_path, usd_path, None, import_config)
+    try:
+        success = await asyncio.wait_for(task.wait_until_finished(), timeout)
+    except asyncio.TimeoutError:
+        task.cancel()
+        error = f"Timeout after {timeout}s"
+    else:
+        if success:
+            return True, None
+        error = f"Status {task.get_status()}: {task.get_error_message()}"
+    carb.log_error(f"Failed to convert {obj_path} to {usd_path}. {error}")
+    return False, error
+
+
+def resolve_material_paths(usd_path: str):
+    """Make the material paths of the converted USD file relative to the layer.
+
+    Note: This issue seems to have popped up in Isaac Sim 2023.1.1
+    """
+    stage = Usd.Stage.Open(usd_path)
+    # resolve all paths relative to layer path
+    source_layer = stage.GetRootLayer()
+    omni.usd.resolve_paths(source_layer.identifier, source_layer.identifier)
+    stage.Save()
@@ -4,6 +4,8 @@
 #
 # SPDX-License-Identifier: BSD-3-Clause
 
+from dataclasses import MISSING
+
 from omni.isaac.lab.sim.converters.asset_converter_base_cfg import AssetConverterBaseCfg
 from omni.isaac.lab.utils import configclass
 
@@ -51,3 +53,28 @@ class ObjConverterCfg(AssetConverterBaseCfg):
     """By default, only visible props will be exported from USD exporter."""
     baking_scales: bool = False
     """Only for FBX. It's to bake scales into meshes."""
+
+
+@configclass
+class ObjBatchConverterCfg:
+    """The configuration class for ObjBatchConverter."""
+
+    input_paths: str | list[str] = MISSING
+    """OBJ files and directories of OBJ files to convert."""
+    output_dir: str = MISSING
+    """Directory of the USD files and the manifest.
+
+    The USD file of an OBJ file in an input directory is saved at the same relative path below the output directory,
+    the USD file of a single OBJ file directly in the output directory."""
+    recursive: bool = True
+    """Search the input directories recursively for OBJ files. Default is True."""
+    max_concurrent: int = 4
+    """Maximum number of concurrent conversions. Default is 4."""
+    timeout: float | None = None
+    """Maximum duration of a conversion in seconds. Default is None, i.e. no limit."""
+    force_conversion: bool = False
+    """Convert all files, even if the content hash matches the previous conversion. Default is False."""
+    manifest_file_name: str = "conversion_manifest.json"
+    """File name of the manifest in the output directory. Default is "conversion_manifest.json"."""
+    obj_converter_cfg: ObjConverterCfg = ObjConverterCfg(asset_path="")
+    """Import settings of the conversions, the asset and output paths are set per file."""
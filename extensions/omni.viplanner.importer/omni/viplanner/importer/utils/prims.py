@@ -4,43 +4,157 @@
 #
 # SPDX-License-Identifier: BSD-3-Clause
 
-import omni.isaac.core.utils.prims as prim_utils
-from pxr import Usd
+from __future__ import annotations
 
+from collections import defaultdict
+from collections.abc import Callable
+from typing import ClassVar
 
-def get_all_meshes(env_prim: str) -> tuple[list[Usd.Prim], list[str]]:
-    def recursive_mesh_search(start_prim: str, mesh_prims: list):
-        for curr_prim in prim_utils.get_prim_at_path(start_prim).GetChildren():
-            if curr_prim.GetTypeName() == "Mesh":
-                mesh_prims.append(curr_prim)
+import omni.isaac.core.utils.stage as stage_utils
+from pxr import Tf, Usd
+
+
+class StageIndex:
+    """Index of all prims of a stage, built with a single traversal.
+
+    The prims are stored in pre-order together with the end of their subtree, i.e. the descendants of the prim at
+    index ``i`` are at the indices ``i + 1`` to ``subtree_end[i] - 1``. Queries therefore run from memory and skip
+    whole subtrees without any call to USD. The index is invalidated when prims are added or removed (resync notices
+    of the stage) and rebuilt on the next :meth:`get`.
+
+    The descendants of instances (instance proxies) are not part of the index, they are represented by the instance.
+    """
+
+    _current: ClassVar[StageIndex | None] = None
+
+    def __init__(self, stage: Usd.Stage):
+        self.stage = stage
+        self.valid = True
+
+        self.prims: list[Usd.Prim] = []
+        self.paths_lower: list[str] = []
+        self.type_names: list[str] = []
+        self.instances: list[bool] = []
+        self.subtree_end: list[int] = []
+        self.path_to_idx: dict[str, int] = {}
+        self.type_to_idx: dict[str, list[int]] = defaultdict(list)
+        self.name_to_idx: dict[str, list[int]] = defaultdict(list)
+        self._build()
+
+        # rebuild when the structure of the stage changes
+        self._listener = Tf.Notice.Register(Usd.Notice.ObjectsChanged, self._on_objects_changed, stage)
+
+    @classmethod
+    def get(cls, stage: Usd.Stage | None = None) -> StageIndex:
+        """Index of the stage (default: current stage), only rebuilt if the stage changed."""
+        stage = stage if stage is not None else stage_utils.get_current_stage()
+        if cls._current is None or not cls._current.valid or cls._current.stage != stage:
+            if cls._current is not None:
+                cls._current.invalidate()
+            cls._current = cls(stage)
+        return cls._current
+
+    def invalidate(self):
+        self.valid = False
+        if self._listener is not None:
+            self._listener.Revoke()
+            self._listener = None
+
+    """
+    Queries
+    """
+
+    def has_path(self, prim_path: str) -> bool:
+        return prim_path in self.path_to_idx
+
+    def find(
+        self,
+        root_path: str,
+        collect: Callable[[int], bool],
+        descend: Callable[[int], bool] | None = None,
+    ) -> list[Usd.Prim]:
+        """Top-most prims below the root for which ``collect`` is true.
+
+        Args:
+            root_path: Path of the prim below which is searched.
+            collect: Whether to collect the prim at an index, the subtree of a collected prim is not searched.
+            descend: Whether to search the subtree of a prim that is not collected. Defaults to None, i.e. all
+                subtrees are searched.
+        """
+        root_idx = self.path_to_idx[root_path]
+        found, idx, end = [], root_idx + 1, self.subtree_end[root_idx]
+        while idx < end:
+            if collect(idx):
+                found.append(self.prims[idx])
+                idx = self.subtree_end[idx]
+            elif descend is None or descend(idx):
+                idx += 1
             else:
-                mesh_prims = recursive_mesh_search(start_prim=curr_prim.GetPath().pathString, mesh_prims=mesh_prims)
+                idx = self.subtree_end[idx]
+        return found
+
+    def prims_of_type(self, type_name: str, root_path: str | None = None) -> list[Usd.Prim]:
+        """All prims of the type, optionally only below the root."""
+        indices = self.type_to_idx.get(type_name, [])
+        if root_path is not None:
+            root_idx = self.path_to_idx[root_path]
+            indices = [idx for idx in indices if root_idx < idx < self.subtree_end[root_idx]]
+        return [self.prims[idx] for idx in indices]
 
-        return mesh_prims
+    def prims_with_name(self, name: str) -> list[Usd.Prim]:
+        return [self.prims[idx] for idx in self.name_to_idx.get(name, [])]
 
-    assert prim_utils.is_prim_path_valid(env_prim), f"Prim path '{env_prim}' is not valid"
+    """
+    Helper functions
+    """
+
+    def _build(self):
+        prim_range = Usd.PrimRange.PreAndPostVisit(self.stage.GetPseudoRoot())
+        open_idx = []
+        iterator = iter(prim_range)
+        for prim in iterator:
+            if iterator.IsPostVisit():
+                self.subtree_end[open_idx.pop()] = len(self.prims)
+                continue
+            idx = len(self.prims)
+            path = prim.GetPath().pathString
+            self.prims.append(prim)
+            self.paths_lower.append(path.lower())
+            self.type_names.append(prim.GetTypeName())
+            self.instances.append(prim.IsInstance())
+            self.subtree_end.append(idx + 1)
+            self.path_to_idx[path] = idx
+            self.type_to_idx[self.type_names[-1]].append(idx)
+            self.name_to_idx[prim.GetName()].append(idx)
+            open_idx.append(idx)
+
+    def _on_objects_changed(self, notice: Usd.Notice.ObjectsChanged, stage: Usd.Stage):
+        # only added, removed or re-composed prims change the index, attribute changes do not
+        if any(path.IsAbsoluteRootOrPrimPath() for path in notice.GetResyncedPaths()):
+            self.invalidate()
 
-    mesh_prims = recursive_mesh_search(env_prim, [])
 
-    # mesh_prims: dict = prim_utils.get_prim_at_path(self.cfg.prim_path + "/" + self.cfg.usd_name.split(".")[0]).GetChildren()
+def get_all_meshes(env_prim: str) -> tuple[list[Usd.Prim], list[str]]:
+    index = StageIndex.get()
+    assert index.has_path(env_prim), f"Prim path '{env_prim}' is not valid"
+
+    # instances are collected as a whole, their meshes are shared with the prototype
+    mesh_prims = index.find(env_prim, collect=lambda idx: index.type_names[idx] == "Mesh" or index.instances[idx])
     mesh_prims_name = [mesh_prim_single.GetName() for mesh_prim_single in mesh_prims]
 
     return mesh_prims, mesh_prims_name
 
 
 def get_mesh_prims(env_prim: str) -> tuple[list[Usd.Prim], list[str]]:
-    def recursive_search_mesh(start_prim: str, mesh_prims: list):
-        for curr_prim in prim_utils.get_prim_at_path(start_prim).GetChildren():
-            if curr_prim.GetTypeName() == "Xform" or curr_prim.GetTypeName() == "Mesh":
-                mesh_prims.append(curr_prim)
-            elif curr_prim.GetTypeName() == "Scope":
-                mesh_prims = recursive_search_mesh(start_prim=curr_prim.GetPath().pathString, mesh_prims=mesh_prims)
-
-        return mesh_prims
-
-    assert prim_utils.is_prim_path_valid(env_prim), f"Prim path '{env_prim}' is not valid"
-
-    mesh_prims = recursive_search_mesh(env_prim, [])
+    index = StageIndex.get()
+    assert index.has_path(env_prim), f"Prim path '{env_prim}' is not valid"
+
+    # xforms and meshes are collected, only scopes are searched further
+    mesh_prims = index.find(
+        env_prim,
+        collect=lambda idx: index.type_names[idx] in ("Xform", "Mesh"),
+        descend=lambda idx: index.type_names[idx] == "Scope",
+    )
     mesh_prims_name = [mesh_prim_single.GetName() for mesh_prim_single in mesh_prims]
 
     return mesh_prims, mesh_prims_name
@@ -49,7 +163,8 @@ def get_mesh_prims(env_prim: str) -> tuple[list[Usd.Prim], list[str]]:
 def get_all_prims_including_str(start_prim: str, path: str) -> list[Usd.Prim]:
     """Get all prims that include the given path str.
 
-    This function recursively searches for all prims that include the given path str.
+    This function searches for all prims below the start prim whose path includes the given path str (case
+    insensitive). The subtree of a found prim is not searched further.
 
     Args:
         start_prim: The environment prim path from which to begin the search.
@@ -58,19 +173,9 @@ def get_all_prims_including_str(start_prim: str, path: str) -> list[Usd.Prim]:
     Returns:
         A list of all prims that include the given path str.
     """
-
-    def recursive_search(start_prim: Usd.Prim, prim_name: str, found_prims: list) -> list[Usd.Prim]:
-        for curr_prim in start_prim.GetChildren():
-            if prim_name.lower() in curr_prim.GetPath().pathString.lower():
-                found_prims.append(curr_prim)
-            else:
-                found_prims = recursive_search(start_prim=curr_prim, prim_name=prim_name, found_prims=found_prims)
-
-        return found_prims
-
+    index = StageIndex.get()
     # Raise error if the start prim is not valid
-    assert prim_utils.is_prim_path_valid(start_prim), f"Prim path '{start_prim}' is not valid"
+    assert index.has_path(start_prim), f"Prim path '{start_prim}' is not valid"
 
-    start_prim = prim_utils.get_prim_at_path(start_prim)
-    final_prim = recursive_search(start_prim=start_prim, prim_name=path, found_prims=[])
-    return final_prim
+    path = path.lower()
+    return index.find(start_prim, collect=lambda idx: path in index.paths_lower[idx])
@@ -0,0 +1,164 @@
+# Copyright (c) 2024 ETH Zurich (Robotic Systems Lab)
+# Author: Pascal Roth, Ziqi Fan
+# All rights reserved.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+
+"""
+This script benchmarks the import time of the extension packages.
+
+Every module is imported in a fresh process (``python -X importtime``) after the simulator has been launched, i.e. only
+the cost of the module itself is measured. The import time, the slowest nested imports and the heavy dependencies
+(networkx, scipy, open3d, ...) that the import loaded are reported. Heavy dependencies have to be imported on first use,
+the script exits with an error if an import loads one of them or if the import time regressed against the baseline.
+
+Examples:
+    # record a baseline
+    python benchmark_import_time.py --output baseline.json
+    # compare against the baseline
+    python benchmark_import_time.py --output results.json --baseline baseline.json
+"""
+
+import argparse
+import importlib
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+# add argparse arguments
+parser = argparse.ArgumentParser(description="This script benchmarks the import time of the extension packages.")
+parser.add_argument("--output", type=str, default="import_time_benchmark.json", help="Result file.")
+parser.add_argument("--baseline", type=str, default=None, help="Baseline result file to compare against.")
+parser.add_argument(
+    "--modules",
+    type=str,
+    nargs="+",
+    default=[
+        "omni.viplanner.collectors.collectors",
+        "omni.viplanner.collectors.configs",
+        "omni.viplanner.collectors.collectors.terrain_analysis",
+        "omni.viplanner.importer.importer",
+        "omni.viplanner.importer.sensors",
+    ],
+    help="Modules to import.",
+)
+parser.add_argument(
+    "--heavy",
+    type=str,
+    nargs="+",
+    default=[
+        "networkx",
+        "scipy.spatial",
+        "scipy.stats",
+        "skimage",
+        "cv2",
+        "open3d",
+        "pandas",
+        "trimesh",
+        "omni.kit.asset_converter",
+    ],
+    help="Dependencies that must not be loaded by the imports.",
+)
+parser.add_argument("--repeats", type=int, default=3, help="Processes per module, the minimum time is reported.")
+parser.add_argument("--top", type=int, default=10, help="Number of slowest nested imports to report.")
+parser.add_argument("--time_tolerance", type=float, default=0.2, help="Allowed relative increase of the time.")
+parser.add_argument("--child", type=str, default=None, help=argparse.SUPPRESS)
+args_cli = parser.parse_args()
+
+MARKER = "[IMPORT BENCHMARK]"
+
+"""
+Child process
+"""
+
+
+def measure_import(module: str):
+    """Launch the simulator, import the module and print the result as json line."""
+    from omni.isaac.lab.app import AppLauncher
+
+    simulation_app = AppLauncher(headless=True).app
+
+    loaded_before = set(sys.modules.keys())
+    # the import time output of the module starts after the marker
+    print(MARKER, file=sys.stderr, flush=True)
+    start = time.perf_counter()
+    importlib.import_module(module)
+    import_time = time.perf_counter() - start
+    print(MARKER, file=sys.stderr, flush=True)
+
+    heavy = [name for name in args_cli.heavy if name in sys.modules and name not in loaded_before]
+    print(MARKER + json.dumps({"time_s": import_time, "heavy": heavy}), flush=True)
+    simulation_app.close()
+
+
+"""
+Main
+"""
+
+
+def parse_importtime(stderr: str) -> list[tuple[str, float, float]]:
+    """Nested imports (package, self time [s], cumulative time [s]) of the ``-X importtime`` output of the module."""
+    sections = stderr.split(MARKER)
+    if len(sections) < 3:
+        return []
+    imports = []
+    for match in re.finditer(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s+(.+)$", sections[1], flags=re.MULTILINE):
+        imports.append((match.group(3).rstrip(), int(match.group(1)) * 1e-6, int(match.group(2)) * 1e-6))
+    return imports
+
+
+def run_module(module: str) -> dict:
+    times, heavy, imports = [], [], []
+    for _ in range(args_cli.repeats):
+        command = [sys.executable, "-X", "importtime", os.path.abspath(__file__), "--child", module]
+        command += ["--heavy"] + args_cli.heavy
+        process = subprocess.run(command, capture_output=True, text=True)
+        result = [line for line in process.stdout.splitlines() if line.startswith(MARKER)]
+        if process.returncode != 0 and not result:
+            raise RuntimeError(f"Import of {module} failed:\n{process.stderr[-2000:]}")
+        result = json.loads(result[-1][len(MARKER) :])
+        times.append(result["time_s"])
+        heavy = result["heavy"]
+        imports = parse_importtime(process.stderr)
+
+    print(f"[INFO] {module}: {min(times):.3f}s")
+    for package, self_time, cumulative in sorted(imports, key=lambda entry: entry[1], reverse=True)[: args_cli.top]:
+        print(f"  {package:<70}{self_time:>10.3f}s self{cumulative:>10.3f}s cumulative")
+    return {
+        "params": {"module": module},
+        "stages": {"import": {"time_s": min(times)}},
+        "metrics": {"heavy modules loaded": len(heavy)},
+        "heavy": heavy,
+    }
+
+
+def main():
+    from omni.viplanner.collectors.utils.benchmarking import (
+        compare_to_baseline,
+        format_runs,
+        load_results,
+        save_results,
+    )
+
+    runs = [run_module(module) for module in args_cli.modules]
+    print(format_runs(runs, ["module"]))
+    save_results(args_cli.output, "import_time", runs)
+
+    errors = [f"{run['params']['module']} loads {', '.join(run['heavy'])}" for run in runs if run["heavy"]]
+    if args_cli.baseline is not None:
+        errors += compare_to_baseline(runs, load_results(args_cli.baseline), time_tolerance=args_cli.time_tolerance)
+    if errors:
+        print("[ERROR] Import time regressed:\n  " + "\n  ".join(errors))
+        return 1
+    print("[INFO] No heavy dependency is loaded at import and no regression against the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    if args_cli.child is not None:
+        measure_import(args_cli.child)
+    else:
+        sys.exit(main())
@@ -0,0 +1,167 @@
+# Copyright (c) 2024 ETH Zurich (Robotic Systems Lab)
+# Author: Pascal Roth, Ziqi Fan
+# All rights reserved.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+
+"""
+This script benchmarks the depth and semantic reconstruction on synthetic image sets.
+
+Images/s, peak memory and the number of output points are recorded for a sweep of the point cloud batch size, voxel
+size, image resolution and scene type. A json result file and a markdown report are written.
+
+Examples:
+    # record a baseline
+    python benchmark_reconstruction.py --output baseline.json
+    # compare against the baseline, exits with an error if a stage regressed
+    python benchmark_reconstruction.py --output results.json --baseline baseline.json
+"""
+
+"""Launch Isaac Sim Simulator first."""
+
+import argparse
+
+# omni-isaac-orbit
+from omni.isaac.lab.app import AppLauncher
+
+# add argparse arguments
+parser = argparse.ArgumentParser(description="This script benchmarks the environment reconstruction.")
+parser.add_argument("--headless", action="store_true", default=True, help="Force display off at all times.")
+parser.add_argument("--output", type=str, default="reconstruction_benchmark.json", help="Result file.")
+parser.add_argument("--baseline", type=str, default=None, help="Baseline result file to compare against.")
+parser.add_argument("--data_dir", type=str, default=None, help="Directory of the image sets, default: temporary.")
+parser.add_argument("--num_images", type=int, default=200, help="Number of images per image set.")
+parser.add_argument("--point_cloud_batch_size", type=int, nargs="+", default=[200, 50, 500], help="Batch sizes.")
+parser.add_argument("--voxel_size", type=float, nargs="+", default=[0.05, 0.1, 0.2], help="Voxel sizes [m].")
+parser.add_argument("--resolution", type=str, nargs="+", default=["480x640", "240x320", "720x1280"], help="HxW.")
+parser.add_argument("--scene", type=str, nargs="+", default=["room", "hall"], help="Scene types.")
+parser.add_argument("--full_grid", action="store_true", default=False, help="Run all parameter combinations.")
+parser.add_argument("--time_tolerance", type=float, default=0.2, help="Allowed relative increase of the time.")
+parser.add_argument("--memory_tolerance", type=float, default=0.2, help="Allowed relative increase of the memory.")
+args_cli = parser.parse_args()
+
+# launch omniverse app
+app_launcher = AppLauncher(headless=args_cli.headless)
+simulation_app = app_launcher.app
+
+"""Rest everything follows."""
+
+import os
+import sys
+import tempfile
+
+from omni.viplanner.collectors.utils.benchmarking import (
+    compare_to_baseline,
+    format_runs,
+    load_results,
+    save_results,
+    sweep_params,
+)
+from omni.viplanner.collectors.utils.environment3d_reconstruction import (
+    EnvironmentReconstruction,
+)
+from omni.viplanner.collectors.utils.environment3d_reconstruction_cfg import (
+    ReconstructionCfg,
+)
+from omni.viplanner.collectors.utils.profiling import PROFILER
+from omni.viplanner.collectors.utils.synthetic_images import write_synthetic_dataset
+
+"""
+Main
+"""
+
+SWEPT_PARAMS = ["point_cloud_batch_size", "voxel_size", "resolution", "scene"]
+
+
+def get_image_set(params: dict, root_dir: str) -> str:
+    """Generate the image set of the scene and resolution, image sets are cached across the runs."""
+    data_dir = os.path.join(root_dir, f"{params['scene']}_{params['resolution']}_{args_cli.num_images}")
+    if not os.path.isfile(os.path.join(data_dir, "camera_poses.txt")):
+        height, width = (int(value) for value in params["resolution"].split("x"))
+        write_synthetic_dataset(
+            data_dir, num_images=args_cli.num_images, resolution=(height, width), scene=params["scene"]
+        )
+    return data_dir
+
+
+def run_reconstruction(params: dict, root_dir: str) -> dict:
+    cfg = ReconstructionCfg(
+        data_dir=get_image_set(params, root_dir),
+        voxel_size=params["voxel_size"],
+        point_cloud_batch_size=params["point_cloud_batch_size"],
+        max_images=None,
+    )
+    reconstruction = EnvironmentReconstruction(cfg)
+    reconstruction.depth_reconstruction()
+
+    results = PROFILER.results()
+    stages = {
+        name: {"time_s": span["total_s"], "peak_memory_mb": span.get("peak_memory_mb", 0.0)}
+        for name, span in results["spans"].items()
+    }
+    total = stages["reconstruction"]
+    metrics = {
+        "images/s": results["counters"]["images integrated"] / total["time_s"],
+        "peak memory increase [MB]": total["peak_memory_mb"],
+        "output points": len(reconstruction.pcd.points),
+    }
+    return {"params": params, "stages": stages, "metrics": metrics}
+
+
+def write_report(file_path: str, runs: list[dict]):
+    """Markdown report with one row per run."""
+    metric_names = list(runs[0]["metrics"].keys())
+    lines = [
+        "# Reconstruction benchmark",
+        "",
+        f"{args_cli.num_images} images per run.",
+        "",
+        "| " + " | ".join(SWEPT_PARAMS + metric_names) + " |",
+        "|" + "---|" * (len(SWEPT_PARAMS) + len(metric_names)),
+    ]
+    for run in runs:
+        values = [str(run["params"][name]) for name in SWEPT_PARAMS]
+        values += [f"{run['metrics'][name]:.1f}" for name in metric_names]
+        lines.append("| " + " | ".join(values) + " |")
+    with open(file_path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+    print(f"[INFO] Saved benchmark report to {file_path}")
+
+
+def main():
+    PROFILER.enable(track_memory=True)
+
+    defaults = {name: getattr(args_cli, name)[0] for name in SWEPT_PARAMS}
+    sweeps = {name: getattr(args_cli, name) for name in SWEPT_PARAMS}
+
+    runs = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        root_dir = args_cli.data_dir if args_cli.data_dir is not None else tmp_dir
+        for params in sweep_params(defaults, sweeps, full_grid=args_cli.full_grid):
+            print(f"[INFO] Benchmarking reconstruction with {params}")
+            runs.append(run_reconstruction(params, root_dir))
+
+    print(format_runs(runs, SWEPT_PARAMS))
+    save_results(args_cli.output, "reconstruction", runs)
+    write_report(os.path.splitext(args_cli.output)[0] + ".md", runs)
+
+    if args_cli.baseline is not None:
+        regressions = compare_to_baseline(
+            runs,
+            load_results(args_cli.baseline),
+            time_tolerance=args_cli.time_tolerance,
+            memory_tolerance=args_cli.memory_tolerance,
+        )
+        if regressions:
+            print("[ERROR] Reconstruction regressed against the baseline:\n  " + "\n  ".join(regressions))
+            return 1
+        print("[INFO] No regression against the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    # Run the main function
+    exit_code = main()
+    # Close the simulator
+    simulation_app.close()
+    sys.exit(exit_code)
@@ -0,0 +1,139 @@
+# Copyright (c) 2024 ETH Zurich (Robotic Systems Lab)
+# Author: Pascal Roth, Ziqi Fan
+# All rights reserved.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+
+"""
+This script benchmarks the scaling of the terrain analysis on procedural synthetic scenes.
+
+The time and peak memory of every stage (point sampling, each point and edge filter, graph construction and the
+shortest paths) are recorded for a sweep of the number of sampled points, connections, grid resolution and map size.
+The scenes are ray cast through the :class:`SyntheticScene` stand-in, i.e. Isaac Sim is not launched and the
+benchmark runs on a CPU-only machine with Isaac Lab installed.
+
+Examples:
+    # record a baseline
+    python benchmark_terrain_analysis.py --output baseline.json
+    # compare against the baseline, exits with an error if a stage regressed
+    python benchmark_terrain_analysis.py --output results.json --baseline baseline.json
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+from omni.viplanner.collectors.collectors import TerrainAnalysis, TerrainAnalysisCfg
+from omni.viplanner.collectors.configs import MatterportSemanticCostMapping
+from omni.viplanner.collectors.utils.benchmarking import (
+    compare_to_baseline,
+    format_runs,
+    load_results,
+    save_results,
+    sweep_params,
+)
+from omni.viplanner.collectors.utils.profiling import PROFILER
+from omni.viplanner.collectors.utils.synthetic_scene import (
+    SyntheticScene,
+    SyntheticSceneCfg,
+    SyntheticSceneGenerator,
+)
+
+# add argparse arguments
+parser = argparse.ArgumentParser(description="This script benchmarks the terrain analysis.")
+parser.add_argument("--output", type=str, default="terrain_analysis_benchmark.json", help="Result file.")
+parser.add_argument("--baseline", type=str, default=None, help="Baseline result file to compare against.")
+parser.add_argument("--scene_type", type=str, default="indoor", choices=["indoor", "outdoor"], help="Scene type.")
+parser.add_argument("--device", type=str, default="cpu", help="Device of the ray casting meshes.")
+parser.add_argument("--sample_points", type=int, nargs="+", default=[1000, 5000, 20000], help="Sampled points.")
+parser.add_argument("--num_connections", type=int, nargs="+", default=[5, 10, 20], help="Connections per point.")
+parser.add_argument("--grid_resolution", type=float, nargs="+", default=[0.1, 0.05], help="Grid resolution [m].")
+parser.add_argument(
+    "--map_size",
+    type=float,
+    nargs="+",
+    default=None,
+    help="Map size, rooms per side of the corridor for indoor and side length [m] for outdoor scenes.",
+)
+parser.add_argument("--full_grid", action="store_true", default=False, help="Run all parameter combinations.")
+parser.add_argument("--repeats", type=int, default=3, help="Repetitions per run, the minimum time is reported.")
+parser.add_argument("--time_tolerance", type=float, default=0.2, help="Allowed relative increase of the time.")
+parser.add_argument("--memory_tolerance", type=float, default=0.2, help="Allowed relative increase of the memory.")
+args_cli = parser.parse_args()
+if args_cli.map_size is None:
+    args_cli.map_size = [4, 8, 16] if args_cli.scene_type == "indoor" else [25.0, 50.0, 100.0]
+
+"""
+Main
+"""
+
+SWEPT_PARAMS = ["sample_points", "num_connections", "grid_resolution", "map_size"]
+
+
+def generate_scene(map_size: float, scene_dir: str) -> str:
+    """Generate the synthetic scene of the given size, scenes are cached across the runs."""
+    file_path = os.path.join(scene_dir, f"{args_cli.scene_type}_{map_size}.ply")
+    if not os.path.exists(file_path):
+        if args_cli.scene_type == "indoor":
+            cfg = SyntheticSceneCfg(scene_type="indoor", rooms_per_side=int(map_size))
+        else:
+            cfg = SyntheticSceneCfg(scene_type="outdoor", outdoor_size=map_size)
+        SyntheticSceneGenerator(cfg).save(file_path)
+    return file_path
+
+
+def run_terrain_analysis(params: dict, scene_dir: str) -> dict:
+    scene = SyntheticScene(generate_scene(params["map_size"], scene_dir), device=args_cli.device)
+    cfg = TerrainAnalysisCfg(
+        sample_points=params["sample_points"],
+        num_connections=params["num_connections"],
+        grid_resolution=params["grid_resolution"],
+        raycaster_sensor="raycaster",
+        semantic_cost_mapping=MatterportSemanticCostMapping(),
+        viz_graph=False,
+    )
+
+    stages, metrics = {}, {}
+    for _ in range(args_cli.repeats):
+        TerrainAnalysis(cfg, scene).analyse()
+        results = PROFILER.results()
+        for name, span in results["spans"].items():
+            stage = stages.setdefault(name, {"time_s": float("inf"), "peak_memory_mb": 0.0})
+            stage["time_s"] = min(stage["time_s"], span["total_s"])
+            stage["peak_memory_mb"] = max(stage["peak_memory_mb"], span.get("peak_memory_mb", 0.0))
+        metrics = results["counters"]
+    return {"params": params, "stages": stages, "metrics": metrics}
+
+
+def main():
+    PROFILER.enable(track_memory=True)
+
+    defaults = {name: getattr(args_cli, name)[0] for name in SWEPT_PARAMS}
+    sweeps = {name: getattr(args_cli, name) for name in SWEPT_PARAMS}
+
+    runs = []
+    with tempfile.TemporaryDirectory() as scene_dir:
+        for params in sweep_params(defaults, sweeps, full_grid=args_cli.full_grid):
+            print(f"[INFO] Benchmarking terrain analysis with {params}")
+            runs.append(run_terrain_analysis(params, scene_dir))
+
+    print(format_runs(runs, SWEPT_PARAMS))
+    save_results(args_cli.output, "terrain_analysis", runs)
+
+    if args_cli.baseline is not None:
+        regressions = compare_to_baseline(
+            runs,
+            load_results(args_cli.baseline),
+            time_tolerance=args_cli.time_tolerance,
+            memory_tolerance=args_cli.memory_tolerance,
+        )
+        if regressions:
+            print("[ERROR] Terrain analysis regressed against the baseline:\n  " + "\n  ".join(regressions))
+            return 1
+        print("[INFO] No regression against the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,44 @@
+# Copyright (c) 2024 ETH Zurich (Robotic Systems Lab)
+# Author: Pascal Roth, Ziqi Fan
+# All rights reserved.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+
+"""
+This script demonstrates how to build a semantic cost map from a reconstructed point cloud.
+"""
+
+"""Launch Isaac Sim Simulator first."""
+
+import argparse
+
+# omni-isaac-orbit
+from omni.isaac.lab.app import AppLauncher
+
+# add argparse arguments
+parser = argparse.ArgumentParser(description="This script builds a cost map from a semantic point cloud.")
+parser.add_argument("--headless", action="store_true", default=True, help="Force display off at all times.")
+parser.add_argument("--inflation_radius", type=float, default=0.0, help="Radius of the obstacle inflation.")
+args_cli = parser.parse_args()
+
+# launch omniverse app
+app_launcher = AppLauncher(headless=args_cli.headless)
+simulation_app = app_launcher.app
+
+"""Rest everything follows."""
+
+import os
+
+from omni.viplanner.collectors.utils.cost_map_builder import CostMapBuilder
+from omni.viplanner.collectors.utils.cost_map_builder_cfg import CostMapBuilderCfg
+
+DATA_DIR = ""
+
+if __name__ == "__main__":
+    cfg = CostMapBuilderCfg()
+    cfg.inflation_radius = args_cli.inflation_radius
+
+    # build the cost map from the reconstructed cloud
+    builder = CostMapBuilder(cfg)
+    builder.build_from_file(os.path.join(DATA_DIR, "cloud.ply"))
+    builder.save(os.path.join(DATA_DIR, "cost_map.npz"))
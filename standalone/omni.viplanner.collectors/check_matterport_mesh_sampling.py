@@ -0,0 +1,51 @@
+# Copyright (c) 2024 ETH Zurich (Robotic Systems Lab)
+# Author: Pascal Roth, Ziqi Fan
+# All rights reserved.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+
+"""
+This script demonstrates how to generate a semantic point cloud directly from the Matterport ply mesh.
+"""
+
+"""Launch Isaac Sim Simulator first."""
+
+import argparse
+
+# omni-isaac-orbit
+from omni.isaac.lab.app import AppLauncher
+
+# add argparse arguments
+parser = argparse.ArgumentParser(description="This script generates a semantic point cloud from a Matterport mesh.")
+parser.add_argument("--headless", action="store_true", default=True, help="Force display off at all times.")
+parser.add_argument("--visibility", action="store_true", default=False, help="Only sample visible faces.")
+args_cli = parser.parse_args()
+
+# launch omniverse app
+app_launcher = AppLauncher(headless=args_cli.headless)
+simulation_app = app_launcher.app
+
+"""Rest everything follows."""
+
+from omni.viplanner.collectors.utils.mesh_semantic_sampling import MeshSemanticSampling
+from omni.viplanner.collectors.utils.mesh_semantic_sampling_cfg import (
+    MeshSemanticSamplingCfg,
+)
+
+PLY_PATH = ""
+DATA_DIR = ""
+
+if __name__ == "__main__":
+    cfg = MeshSemanticSamplingCfg()
+    cfg.ply_path = PLY_PATH
+    cfg.data_dir = DATA_DIR
+    cfg.visibility_filter = args_cli.visibility
+    # viewpoints of a previous viewpoint sampling
+    cfg.viewpoint_file = DATA_DIR + "/camera_poses.txt"
+
+    # sample the point cloud from the mesh surface
+    mesh_sampler = MeshSemanticSampling(cfg)
+    mesh_sampler.sample()
+
+    mesh_sampler.save_pcd()
+    mesh_sampler.show_pcd()
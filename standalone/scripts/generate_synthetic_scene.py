@@ -0,0 +1,37 @@
+# Copyright (c) 2024 ETH Zurich (Robotic Systems Lab)
+# Author: Pascal Roth, Ziqi Fan
+# All rights reserved.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+
+"""
+Generate procedural synthetic scenes (PLY with per-face Matterport category ids) without Isaac Sim.
+
+Examples:
+    # indoor scene with 3 levels and 6 rooms on each side of the corridor
+    python generate_synthetic_scene.py synthetic_indoor.ply --levels 3 --rooms_per_side 6
+    # outdoor scene of 100m x 100m
+    python generate_synthetic_scene.py synthetic_outdoor.ply --scene_type outdoor --outdoor_size 100
+"""
+
+import argparse
+import dataclasses
+
+from omni.viplanner.collectors.utils.synthetic_scene import (
+    SyntheticSceneCfg,
+    SyntheticSceneGenerator,
+)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a procedural synthetic scene as PLY file.")
+    parser.add_argument("file_path", type=str, help="Output PLY file.")
+    # expose all scalar fields of the configuration
+    for cfg_field in dataclasses.fields(SyntheticSceneCfg):
+        if isinstance(cfg_field.default, (int, float, str)):
+            parser.add_argument(
+                f"--{cfg_field.name}", type=type(cfg_field.default), default=cfg_field.default, help=cfg_field.name
+            )
+    args = parser.parse_args()
+
+    cfg = SyntheticSceneCfg(**{name: value for name, value in vars(args).items() if name != "file_path"})
+    SyntheticSceneGenerator(cfg).save(args.file_path)
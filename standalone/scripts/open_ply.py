@@ -4,20 +4,46 @@
 #
 # SPDX-License-Identifier: Apache-2.0
 
+import os
 import sys
 
 import open3d as o3d
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python script.py <filename.ply>")
+    if len(sys.argv) < 2 or len(sys.argv) > 3:
+        print("Usage: python script.py <filename.ply | chunked_cloud_dir> [max_points]")
         sys.exit(1)
 
     file_path = sys.argv[1]
+    max_points = int(sys.argv[2]) if len(sys.argv) > 2 else None
 
     try:
-        pcd = o3d.io.read_point_cloud(file_path)
-        print(f"Successfully loaded point cloud: {file_path}")
+        if os.path.isdir(file_path):
+            # chunked point cloud, only read the level-of-detail
+            from omni.viplanner.collectors.utils.chunked_point_cloud import (
+                ChunkedPointCloud,
+            )
+
+            cloud = ChunkedPointCloud(file_path)
+            points, colors = cloud.read_lod(max_points=max_points)
+            pcd = o3d.geometry.PointCloud(o3d.utility.Vector3dVector(points.astype(float)))
+            if colors is not None:
+                pcd.colors = o3d.utility.Vector3dVector(colors / 255.0)
+            print(f"Successfully loaded {points.shape[0]} of {cloud.num_points} points: {file_path}")
+        elif max_points is not None:
+            # decimated preview of the ply file
+            from omni.viplanner.collectors.utils.chunked_point_cloud import (
+                read_ply_preview,
+            )
+
+            points, colors = read_ply_preview(file_path, max_points)
+            pcd = o3d.geometry.PointCloud(o3d.utility.Vector3dVector(points))
+            if colors is not None:
+                pcd.colors = o3d.utility.Vector3dVector(colors)
+            print(f"Successfully loaded preview of {points.shape[0]} points: {file_path}")
+        else:
+            pcd = o3d.io.read_point_cloud(file_path)
+            print(f"Successfully loaded point cloud: {file_path}")
     except Exception as e:
         print(f"Error reading the file {file_path}: {e}")
         sys.exit(1)
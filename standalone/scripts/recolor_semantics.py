@@ -0,0 +1,69 @@
+# Copyright (c) 2024 ETH Zurich (Robotic Systems Lab)
+# Author: Pascal Roth, Ziqi Fan
+# All rights reserved.
+#
+# SPDX-License-Identifier: BSD-3-Clause
+
+"""
+Recolor or remap the semantic images of a rendered dataset without re-rendering it.
+
+The ``palette.txt`` of the output camera directory is updated: it is removed if the images are saved as colors and
+rewritten with the remapped colors if the images stay class ids.
+
+Examples:
+    # convert class id images to RGB images with the palette saved by the viewpoint rendering
+    python recolor_semantics.py <data_dir>/camera_0 --palette <data_dir>/camera_0/palette.txt
+    # remap class ids, keep the single-channel images
+    python recolor_semantics.py <data_dir>/camera_0 --id_mapping mapping.yml
+"""
+
+import argparse
+import os
+
+import yaml
+from omni.viplanner.collectors.utils.semantic_recoloring import (
+    build_lut,
+    load_palette,
+    recolor_dataset,
+    remap_palette,
+    save_palette,
+)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recolor or remap semantic images through a lookup table.")
+    parser.add_argument("camera_dir", type=str, help="Camera directory with the semantic_segmentation images.")
+    parser.add_argument("--out_dir", type=str, default=None, help="Output camera directory, default: overwrite.")
+    parser.add_argument("--palette", type=str, default=None, help="Palette (colors of the class ids) of the output.")
+    parser.add_argument("--src_palette", type=str, default=None, help="Palette of RGB source images.")
+    parser.add_argument("--id_mapping", type=str, default=None, help="Yaml file with the mapping old id: new id.")
+    parser.add_argument("--num_workers", type=int, default=8, help="Number of parallel workers.")
+    args = parser.parse_args()
+
+    id_mapping = None
+    if args.id_mapping is not None:
+        with open(args.id_mapping) as file:
+            id_mapping = {int(k): int(v) for k, v in yaml.safe_load(file).items()}
+
+    palette = load_palette(args.palette) if args.palette is not None else None
+    src_palette = load_palette(args.src_palette) if args.src_palette is not None else None
+    # palette of the source class ids, loaded before it is updated in place
+    src_palette_path = os.path.join(args.camera_dir, "palette.txt")
+    if src_palette is None and os.path.isfile(src_palette_path):
+        id_palette = load_palette(src_palette_path)
+    else:
+        id_palette = src_palette
+
+    out_dir = args.out_dir if args.out_dir is not None else args.camera_dir
+    recolor_dataset(
+        os.path.join(args.camera_dir, "semantic_segmentation"),
+        os.path.join(out_dir, "semantic_segmentation"),
+        build_lut(palette=palette, id_mapping=id_mapping),
+        palette=src_palette,
+        num_workers=args.num_workers,
+    )
+
+    # images saved as colors have no palette, class id images get the colors of the remapped ids
+    if palette is None and id_palette is not None:
+        save_palette(out_dir, remap_palette(id_palette, id_mapping))
+    else:
+        save_palette(out_dir, None)